@@ -0,0 +1,81 @@
+"""
+Ajustement du filtre de vérifiabilité: régression logistique sur le jeu annoté et choix du seuil
+
+Usage:
+    python benchmarks/check_worthiness.py
+    python benchmarks/check_worthiness.py --epochs 5000 --l2 0.01
+"""
+import argparse
+import json
+import math
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.check_worthiness import WEIGHTS, CheckWorthinessScorer
+
+FIXTURES = ROOT / "benchmarks" / "fixtures" / "check_worthiness.json"
+
+
+def load_fixtures(path: Path) -> list:
+    """Affirmations annotées (vérifiable ou non)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def fit(features: list, labels: list, epochs: int, learning_rate: float, l2: float) -> dict:
+    """Descente de gradient sur la log-vraisemblance régularisée (biais non régularisé)"""
+    weights = {name: 0.0 for name in WEIGHTS}
+    for _ in range(epochs):
+        gradient = {name: 0.0 for name in weights}
+        for row, label in zip(features, labels):
+            logit = sum(weights[name] * value for name, value in row.items())
+            error = 1 / (1 + math.exp(-logit)) - label
+            for name, value in row.items():
+                gradient[name] += error * value
+        for name in weights:
+            penalty = 0.0 if name == 'bias' else l2 * weights[name]
+            weights[name] -= learning_rate * (gradient[name] / len(features) + penalty)
+    return {name: round(value, 2) for name, value in weights.items()}
+
+
+def best_threshold(scores: list, labels: list) -> float:
+    """Seuil de meilleure exactitude; à égalité le plus bas, pour écarter le moins d'affirmations"""
+    candidates = [round(0.05 * i, 2) for i in range(1, 20)]
+    return max(candidates, key=lambda t: (sum((s >= t) == bool(l) for s, l in zip(scores, labels)), -t))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES, help="Fichier JSON des affirmations annotées")
+    parser.add_argument("--epochs", type=int, default=3000, help="Nombre de passes de descente de gradient")
+    parser.add_argument("--learning-rate", type=float, default=0.5, help="Pas de la descente de gradient")
+    parser.add_argument("--l2", type=float, default=0.01, help="Régularisation L2 des poids")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    scorer = CheckWorthinessScorer()
+    features = [scorer.features(fixture['claim']) for fixture in fixtures]
+    labels = [float(fixture['checkable']) for fixture in fixtures]
+
+    weights = fit(features, labels, args.epochs, args.learning_rate, args.l2)
+    scores = [1 / (1 + math.exp(-sum(weights[name] * value for name, value in row.items())))
+              for row in features]
+    threshold = best_threshold(scores, labels)
+
+    print("Poids ajustés:")
+    for name, value in weights.items():
+        print(f"    '{name}': {value},")
+    print(f"Seuil: {threshold}")
+
+    errors = [(fixture, score) for fixture, score in zip(fixtures, scores)
+              if (score >= threshold) != fixture['checkable']]
+    print(f"Exactitude: {len(fixtures) - len(errors)}/{len(fixtures)}")
+    for fixture, score in errors:
+        print(f"  ERR {score:.3f} {'vérifiable' if fixture['checkable'] else 'opinion':<10} {fixture['claim'][:60]}")
+
+
+if __name__ == "__main__":
+    main()
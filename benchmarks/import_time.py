@@ -0,0 +1,93 @@
+"""
+Mesure du temps de démarrage: imports du package src et délai jusqu'au premier téléchargement
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --url https://www.tiktok.com/@user/video/123
+"""
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Imports effectués par le notebook (cellule 1)
+NOTEBOOK_IMPORTS = """
+from src.config import Config
+from src.downloader import TikTokDownloader
+from src.transcriber import AudioTranscriber
+from src.analyzer import LLMAnalyzer
+from src.fact_checker import FactChecker
+from src.visualizer import ResultVisualizer
+from src.storage import ResultStorage
+"""
+
+FIRST_DOWNLOAD = """
+import time
+start = time.perf_counter()
+{imports}
+from src.downloader import TikTokDownloader
+downloader = TikTokDownloader()
+ready = time.perf_counter()
+url = {url!r}
+if url:
+    downloader.download_video(url)
+done = time.perf_counter()
+print(f"imports + initialisation: {{(ready - start) * 1000:.1f}} ms")
+if url:
+    print(f"premier téléchargement terminé: {{(done - start) * 1000:.1f}} ms")
+"""
+
+
+def import_profile(code: str) -> list:
+    """
+    Exécute le code dans un interpréteur neuf avec -X importtime
+
+    Returns:
+        Liste de tuples (module, temps cumulé en microsecondes)
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr.strip().splitlines()[-1])
+
+    profile = []
+    for line in process.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)", line)
+        if match:
+            profile.append((match.group(3), int(match.group(1)), len(match.group(2))))
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="", help="URL TikTok pour mesurer le premier téléchargement")
+    parser.add_argument("--top", type=int, default=15, help="Nombre de modules les plus lents à afficher")
+    args = parser.parse_args()
+
+    profile = import_profile(NOTEBOOK_IMPORTS)
+    src_modules = [(name, cumulative) for name, cumulative, _ in profile if name.startswith("src.")]
+    top_level = [(name, cumulative) for name, cumulative, depth in profile if depth == 1]
+
+    print("Temps d'import cumulé des modules src:")
+    for name, cumulative in src_modules:
+        print(f"  {name:<24} {cumulative / 1000:8.1f} ms")
+
+    print(f"\nImports de premier niveau les plus lents (top {args.top}):")
+    for name, cumulative in sorted(top_level, key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<24} {cumulative / 1000:8.1f} ms")
+
+    print("\nDémarrage à froid jusqu'au premier téléchargement:")
+    process = subprocess.run(
+        [sys.executable, "-c", FIRST_DOWNLOAD.format(imports=NOTEBOOK_IMPORTS, url=args.url)],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    print(process.stdout.strip() or process.stderr.strip())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Mesure de la notation des affirmations: exactitude sur le jeu de référence et temps en lot
+
+Usage:
+    python benchmarks/scoring.py
+    python benchmarks/scoring.py --sizes 1000 10000 100000
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.scoring import EvidenceScorer
+
+FIXTURES = ROOT / "benchmarks" / "fixtures" / "fact_checks.json"
+
+
+def load_fixtures(path: Path) -> list:
+    """Affirmations annotées (résultats de recherche et verdict attendu)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def time_scoring(scorer: EvidenceScorer, results: list, repeat: int) -> float:
+    """Meilleur temps de notation du lot en millisecondes"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        scorer.score_many(results)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES, help="Fichier JSON des affirmations annotées")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000],
+                        help="Nombres d'affirmations notées en un lot")
+    parser.add_argument("--repeat", type=int, default=3, help="Nombre de mesures par taille")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    scorer = EvidenceScorer()
+
+    scored = scorer.score_many(fixtures)
+    correct = 0
+    print("Jeu de référence:")
+    for fixture, result in zip(fixtures, scored):
+        ok = result['verdict'] == fixture['expected']
+        correct += ok
+        print(f"  {'ok ' if ok else 'ERR'} {result['verdict']:<19} {result['credibility_score']:3d}  "
+              f"{fixture['claim'][:60]}")
+    print(f"Exactitude: {correct}/{len(fixtures)}")
+
+    print("\nTemps de notation en lot:")
+    for size in args.sizes:
+        batch = [fixtures[i % len(fixtures)] for i in range(size)]
+        pairs = sum(len(item.get(bucket, [])) for item in batch for bucket in
+                    ('fact_checking_results', 'scientific_results', 'news_results', 'sources'))
+        elapsed = time_scoring(scorer, batch, args.repeat)
+        print(f"  {size:>7} affirmations ({pairs:>7} résultats): {elapsed:9.1f} ms "
+              f"({elapsed * 1000 / size:6.1f} µs/affirmation)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Manifeste par compte: étapes terminées par vidéo et statistiques cumulées (mode incrémental)
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from src.config import Config
+
+
+class AccountManifest:
+    """
+    État persistant des analyses d'un compte (fichier JSON réécrit atomiquement)
+
+    Chaque vidéo, identifiée par son ID TikTok, garde les étapes qu'elle a
+    terminées et son statut ('done' ou 'failed'). Les statistiques du compte
+    sont cumulées vidéo par vidéo: une nouvelle vidéo met à jour les
+    agrégats sans relire les précédentes.
+    """
+
+    def __init__(self, path: Path, account: str = ''):
+        self.path = path
+        self._lock = threading.Lock()
+        self.state = {'account': account, 'videos': {}, 'aggregate': _empty_aggregate(), 'runs': []}
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+
+    @classmethod
+    def for_account(cls, username: str, manifest_dir: Optional[Path] = None) -> 'AccountManifest':
+        """Manifeste d'un compte (défaut: OUTPUT_DIR/accounts/<username>.json)"""
+        return cls((manifest_dir or Config.OUTPUT_DIR / "accounts") / f"{username}.json", account=username)
+
+    @property
+    def videos(self) -> Dict[str, Dict]:
+        """Entrées par identifiant de vidéo"""
+        return self.state['videos']
+
+    def pending(self, entries: List[Dict]) -> List[Dict]:
+        """
+        Entrées à traiter: vidéos nouvelles ou dont une étape a échoué
+
+        Args:
+            entries: Vidéos listées ({'id', ...}, voir TikTokDownloader.list_user_videos)
+
+        Returns:
+            Entrées dont la vidéo n'est pas encore terminée, dans le même ordre
+        """
+        return [entry for entry in entries if self.videos.get(entry['id'], {}).get('status') != 'done']
+
+    def record_stage(self, video_id: str, stage: str):
+        """Enregistre la fin d'une étape pour une vidéo"""
+        with self._lock:
+            video = self._entry(video_id)
+            video['stages'][stage] = time.time()
+            video.pop('error', None)
+            if video['status'] == 'failed':
+                video['status'] = 'in_progress'
+            self._save()
+
+    def record_failure(self, video_id: str, stage: str, error):
+        """Enregistre l'échec d'une étape: la vidéo sera retraitée au prochain passage"""
+        with self._lock:
+            video = self._entry(video_id)
+            video.update(status='failed', failed_stage=stage, error=str(error))
+            self._save()
+
+    def record_result(self, video_id: str, video_result: Dict):
+        """
+        Enregistre le résultat d'une vidéo terminée et l'ajoute aux agrégats
+
+        Args:
+            video_id: Identifiant de la vidéo
+            video_result: Résultat de la vidéo (voir pipeline.build_video_result)
+        """
+        fact_checking = video_result['fact_checking']
+        with self._lock:
+            video = self._entry(video_id)
+            aggregate = self.state['aggregate']
+            # Une vidéo retraitée remplace sa contribution précédente
+            if video['status'] == 'done':
+                _add_to_aggregate(aggregate, video['credibility_score'], video['verdict'], -1)
+            _add_to_aggregate(aggregate, fact_checking['credibility_score'], fact_checking['verdict'], 1)
+            video.update(
+                status='done',
+                title=video_result.get('title', ''),
+                upload_date=video_result.get('metadata', {}).get('upload_date', ''),
+                credibility_score=fact_checking['credibility_score'],
+                verdict=fact_checking['verdict'],
+                claim_count=len(fact_checking.get('claims', {})),
+                completed_at=time.time()
+            )
+            video.pop('failed_stage', None)
+            video.pop('error', None)
+            self._save()
+
+    def record_run(self, video_ids: List[str], files: Optional[Dict[str, Path]] = None):
+        """Rattache un passage (vidéos traitées, fichiers de résultats) à l'historique du compte"""
+        with self._lock:
+            self.state['runs'].append({
+                'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'videos': list(video_ids),
+                'files': {kind: str(path) for kind, path in (files or {}).items()}
+            })
+            self._save()
+
+    def statistics(self) -> Dict:
+        """Statistiques cumulées du compte (même format que pipeline.compute_statistics)"""
+        with self._lock:
+            aggregate = self.state['aggregate']
+            count = aggregate['video_count']
+            return {
+                'average_credibility': aggregate['score_sum'] / count if count else 0,
+                'video_count': count,
+                'verified_count': aggregate['verified_count'],
+                'unverified_count': aggregate['unverified_count'],
+                'verdict_distribution': {k: v for k, v in aggregate['verdict_distribution'].items() if v}
+            }
+
+    def _entry(self, video_id: str) -> Dict:
+        """Entrée d'une vidéo (créée au besoin)"""
+        return self.videos.setdefault(video_id, {'status': 'in_progress', 'stages': {}})
+
+    def _save(self):
+        """Écrit le manifeste sur disque"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def _empty_aggregate() -> Dict:
+    """Agrégats d'un compte sans vidéo"""
+    return {'video_count': 0, 'score_sum': 0, 'verified_count': 0, 'unverified_count': 0,
+            'verdict_distribution': {}}
+
+
+def _add_to_aggregate(aggregate: Dict, score: int, verdict: str, sign: int):
+    """Ajoute (sign=1) ou retire (sign=-1) une vidéo des agrégats"""
+    aggregate['video_count'] += sign
+    aggregate['score_sum'] += sign * score
+    aggregate['unverified_count' if verdict == 'non_verifie' else 'verified_count'] += sign
+    distribution = aggregate['verdict_distribution']
+    distribution[verdict] = distribution.get(verdict, 0) + sign
@@ -1,36 +1,190 @@
 """
 Module d'analyse LLM avec support multi-providers
 """
-from typing import Dict, Optional
-from openai import OpenAI
-import anthropic
-import requests
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+from src.cache import ResultCache
 from src.config import Config
+from src.ratelimit import RateLimiter
+
+# Modèle utilisé par défaut pour chaque provider
+DEFAULT_MODELS = {
+    'openai': "gpt-4",
+    'anthropic': "claude-3-opus-20240229",
+    'local': Config.LOCAL_LLM_MODEL,
+}
+
+# Prix en dollars par million de tokens (entrée, sortie), pour estimer les économies du cache
+MODEL_PRICES = {
+    'gpt-4': (30.0, 60.0),
+    'claude-3-opus-20240229': (15.0, 75.0),
+}
+
+SYSTEM_PROMPT = "Tu es un expert en analyse de contenu et vérification de faits."
+
+# Début d'une section numérotée de l'analyse ("1. **Résumé**", "## 2. Affirmations", ...)
+SECTION_HEADING = re.compile(r'(?m)^[ \t]*(?:#{1,4}[ \t]*)?(?:\*\*)?(\d+)[.)]')
+
+
+def extract_claims_from_analysis(analysis_text: str) -> List[str]:
+    """
+    Extrait les affirmations d'une analyse LLM en texte libre
+    
+    Args:
+        analysis_text: Texte de l'analyse
+        
+    Returns:
+        Liste d'au plus 10 affirmations
+    """
+    patterns = [
+        r'(?:affirme|dit|prétend|soutient|déclare|assure)[^.]*\.',
+        r'(?:selon|d\'après|selon les)[^.]*\.',
+    ]
+    
+    claims = []
+    for pattern in patterns:
+        matches = re.findall(pattern, analysis_text, re.IGNORECASE)
+        claims.extend(matches)
+    
+    if not claims:
+        sentences = re.split(r'[.!?]+', analysis_text)
+        claims = [s.strip() for s in sentences if len(s.strip()) > 20][:5]
+    
+    return claims[:10]
+
+
+def analysis_claims(llm_analysis: Dict) -> List[str]:
+    """
+    Affirmations d'une analyse: celles déjà extraites si disponibles, sinon extraction du texte
+    
+    Args:
+        llm_analysis: Résultat de LLMAnalyzer
+        
+    Returns:
+        Liste des affirmations
+    """
+    if 'claims' in llm_analysis:
+        return [claim['claim'] for claim in llm_analysis['claims']]
+    return extract_claims_from_analysis(llm_analysis.get('analysis', ''))
+
+
+def extract_score_from_analysis(analysis_text: str) -> Optional[int]:
+    """Extrait le score de crédibilité initial (0-100) d'une analyse en texte libre"""
+    match = re.search(r'score[^\n\d]{0,80}?(\d{1,3})', analysis_text, re.IGNORECASE)
+    if match and int(match.group(1)) <= 100:
+        return int(match.group(1))
+    return None
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimation grossière du nombre de tokens (environ 4 caractères par token)"""
+    return len(text) // 4 + 1
+
+
+def chunk_segments(segments: List[Dict], max_tokens: int) -> List[Dict]:
+    """
+    Regroupe des segments Whisper consécutifs en fenêtres d'au plus max_tokens
+    
+    Args:
+        segments: Segments de transcription ({'start', 'end', 'text'})
+        max_tokens: Budget de tokens par fenêtre
+        
+    Returns:
+        Liste de fenêtres {'start', 'end', 'text'}
+    """
+    chunks = []
+    current = []
+    tokens = 0
+    for segment in segments:
+        segment_tokens = estimate_tokens(segment.get('text', ''))
+        if current and tokens + segment_tokens > max_tokens:
+            chunks.append(current)
+            current, tokens = [], 0
+        current.append(segment)
+        tokens += segment_tokens
+    if current:
+        chunks.append(current)
+    
+    return [
+        {
+            'start': chunk[0].get('start', 0),
+            'end': chunk[-1].get('end', 0),
+            'text': ' '.join(segment.get('text', '').strip() for segment in chunk)
+        }
+        for chunk in chunks
+    ]
+
 
 class LLMAnalyzer:
     """Analyseur LLM avec support pour plusieurs providers"""
     
-    def __init__(self, provider: Optional[str] = None):
+    def __init__(self, provider: Optional[str] = None, model: Optional[str] = None,
+                 temperature: float = 0.7, max_tokens: int = 2000, cache_mode: str = "exact",
+                 structured: bool = False):
         """
         Initialise l'analyseur avec un provider spécifique
         
         Args:
             provider: 'openai', 'anthropic', ou 'local'
+            model: Nom du modèle (défaut: modèle par défaut du provider)
+            temperature: Température d'échantillonnage
+            max_tokens: Nombre maximum de tokens générés
+            cache_mode: Cache des réponses: 'exact' (toujours), 'deterministic'
+                        (seulement si temperature == 0) ou 'off'
+            structured: Demander une réponse JSON validée (VideoAnalysis) au lieu
+                        d'un texte libre: mode JSON (OpenAI), appel d'outil
+                        (Anthropic) ou paramètre format (Ollama)
         """
         self.provider = provider or Config.DEFAULT_LLM_PROVIDER
         
+        # Seul le SDK du provider choisi est importé
         if self.provider == "openai":
             if not Config.OPENAI_API_KEY:
                 raise ValueError("OPENAI_API_KEY non configurée")
-            self.client = OpenAI(api_key=Config.OPENAI_API_KEY)
+            from openai import OpenAI
+            self.client = OpenAI(api_key=Config.OPENAI_API_KEY, timeout=Config.LLM_TIMEOUT)
         elif self.provider == "anthropic":
             if not Config.ANTHROPIC_API_KEY:
                 raise ValueError("ANTHROPIC_API_KEY non configurée")
-            self.client = anthropic.Anthropic(api_key=Config.ANTHROPIC_API_KEY)
+            import anthropic
+            self.client = anthropic.Anthropic(api_key=Config.ANTHROPIC_API_KEY, timeout=Config.LLM_TIMEOUT)
         elif self.provider == "local":
-            self.client = None  # Utiliser requests pour les appels locaux
+            # Session HTTP avec keep-alive partagée par tous les appels Ollama
+            import requests
+            from requests.adapters import HTTPAdapter
+            self.client = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=Config.LLM_CONCURRENCY)
+            self.client.mount("http://", adapter)
+            self.client.mount("https://", adapter)
         else:
             raise ValueError(f"Provider non supporté: {self.provider}")
+        
+        self.model = model or DEFAULT_MODELS[self.provider]
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.structured = structured
+        self.rate_limiter = RateLimiter.per_minute(Config.LLM_RATE_LIMITS.get(self.provider))
+        # Métriques du dernier appel en streaming
+        self.last_metrics = {}
+        
+        if cache_mode not in ("exact", "deterministic", "off"):
+            raise ValueError(f"Mode de cache non supporté: {cache_mode}")
+        self.cache_mode = cache_mode
+        self.cache = None
+        if cache_mode != "off":
+            self.cache = ResultCache(
+                Config.CACHE_DIR / "llm.sqlite",
+                ttl=Config.LLM_CACHE_TTL,
+                max_entries=Config.LLM_CACHE_MAX_ENTRIES
+            )
+        # Appels évités grâce au cache depuis la création de l'analyseur
+        self.cache_savings = {'hits': 0, 'input_tokens': 0, 'output_tokens': 0, 'cost_usd': 0.0}
+        self._savings_lock = threading.Lock()
     
     def analyze_content(self, transcription: str, video_metadata: Optional[Dict] = None) -> Dict:
         """
@@ -44,16 +198,407 @@ class LLMAnalyzer:
             Dictionnaire avec l'analyse qualitative et quantitative
         """
         prompt = self._build_analysis_prompt(transcription, video_metadata)
+        cached = self._cache_lookup(prompt)
+        if cached is not None:
+            return cached
+        
+        self.rate_limiter.acquire()
         
         if self.provider == "openai":
-            return self._analyze_openai(prompt)
+            result = self._analyze_openai(prompt)
         elif self.provider == "anthropic":
-            return self._analyze_anthropic(prompt)
+            result = self._analyze_anthropic(prompt)
         elif self.provider == "local":
-            return self._analyze_local(prompt)
+            result = self._analyze_local(prompt)
+        
+        self._cache_store(prompt, result)
+        return result
+    
+    def analyze_segments(self, segments: List[Dict], video_metadata: Optional[Dict] = None,
+                         max_chunk_tokens: int = 1500, concurrency: Optional[int] = None) -> Dict:
+        """
+        Analyse une longue transcription par fenêtres (map-reduce)
+        
+        La transcription est découpée aux frontières des segments Whisper en
+        fenêtres de max_chunk_tokens, analysées en parallèle, puis les
+        affirmations et les scores sont fusionnés.
+        
+        Args:
+            segments: Segments de la transcription (AudioTranscriber)
+            video_metadata: Métadonnées de la vidéo (optionnel)
+            max_chunk_tokens: Budget de tokens de transcription par fenêtre
+            concurrency: Nombre maximum d'analyses simultanées
+            
+        Returns:
+            Dictionnaire d'analyse enrichi de 'chunks' (analyse par fenêtre),
+            'claims' (affirmations horodatées) et 'credibility_score'. Les
+            fenêtres en échec sont listées dans 'chunk_errors'; si toutes ont
+            échoué, l'analyse porte une clé 'error'
+        """
+        chunks = chunk_segments(segments, max_chunk_tokens)
+        chunk_metadata = [
+            dict(video_metadata or {}, extrait=f"{_timestamp(chunk['start'])} - {_timestamp(chunk['end'])}")
+            for chunk in chunks
+        ]
+        if len(chunks) == 1:
+            analyses = [self.analyze_content(chunks[0]['text'], video_metadata)]
+        else:
+            analyses = self.analyze_many([chunk['text'] for chunk in chunks], chunk_metadata, concurrency)
+        return self._reduce_chunks(chunks, analyses)
+    
+    def _reduce_chunks(self, chunks: List[Dict], analyses: List[Dict]) -> Dict:
+        """Fusionne les analyses par fenêtre en une analyse unique"""
+        from src.claim_index import ClaimIndex
+        
+        claims = []
+        chunk_results = []
+        weighted_score = 0.0
+        scored_duration = 0.0
+        for chunk, analysis in zip(chunks, analyses):
+            score = analysis.get('credibility_score')
+            if score is None:
+                score = extract_score_from_analysis(analysis.get('analysis', ''))
+            chunk_results.append({
+                'start': chunk['start'],
+                'end': chunk['end'],
+                'analysis': analysis.get('analysis', ''),
+                'credibility_score': score,
+                'error': analysis.get('error')
+            })
+            if score is not None:
+                duration = max(chunk['end'] - chunk['start'], 1.0)
+                weighted_score += score * duration
+                scored_duration += duration
+            for claim in analysis_claims(analysis):
+                claims.append({'claim': claim, 'start': chunk['start'], 'end': chunk['end']})
+        
+        # Une même affirmation répétée dans plusieurs fenêtres n'est gardée qu'une fois
+        by_text = {claim['claim']: claim for claim in reversed(claims)}
+        clusters = ClaimIndex().cluster([claim['claim'] for claim in claims])
+        merged_claims = [by_text[representative] for representative in clusters]
+        
+        analysis_text = "\n\n".join(
+            f"### Extrait {_timestamp(result['start'])} - {_timestamp(result['end'])}\n\n{result['analysis']}"
+            for result in chunk_results
+        )
+        usage = {
+            'input_tokens': sum(a.get('usage', {}).get('input_tokens', 0) for a in analyses),
+            'output_tokens': sum(a.get('usage', {}).get('output_tokens', 0) for a in analyses)
+        }
+        
+        result = {
+            'provider': self.provider,
+            'analysis': analysis_text,
+            'usage': usage,
+            'chunks': chunk_results,
+            'claims': merged_claims,
+            'credibility_score': round(weighted_score / scored_duration) if scored_duration else None
+        }
+        
+        # Fenêtres en échec: résumé par fenêtre, et erreur globale si aucune n'a abouti
+        failed = [
+            {'start': r['start'], 'end': r['end'], 'error': r['error']}
+            for r in chunk_results if r['error']
+        ]
+        if failed:
+            result['chunk_errors'] = failed
+        if failed and len(failed) == len(chunk_results):
+            result['error'] = f"Échec de l'analyse des {len(failed)} fenêtre(s): {failed[0]['error']}"
+        return result
+    
+    def _cache_key(self, prompt: str) -> str:
+        """Clé de cache: prompt complet, provider, modèle et paramètres d'échantillonnage"""
+        payload = json.dumps([prompt, SYSTEM_PROMPT, self.provider, self.model,
+                              self.temperature, self.max_tokens], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def _cache_enabled(self) -> bool:
+        """Le cache s'applique-t-il avec les paramètres actuels ?"""
+        if self.cache is None:
+            return False
+        return self.cache_mode == "exact" or self.temperature == 0
+    
+    def _cache_lookup(self, prompt: str) -> Optional[Dict]:
+        """Retourne l'analyse en cache et comptabilise l'appel évité"""
+        if not self._cache_enabled():
+            return None
+        cached = self.cache.get(self._cache_key(prompt))
+        if cached is None:
+            return None
+        
+        usage = cached.get('usage', {})
+        input_price, output_price = MODEL_PRICES.get(cached.get('model', self.model), (0.0, 0.0))
+        with self._savings_lock:
+            self.cache_savings['hits'] += 1
+            self.cache_savings['input_tokens'] += usage.get('input_tokens', 0)
+            self.cache_savings['output_tokens'] += usage.get('output_tokens', 0)
+            self.cache_savings['cost_usd'] += (usage.get('input_tokens', 0) * input_price
+                                               + usage.get('output_tokens', 0) * output_price) / 1e6
+        return dict(cached, cached=True)
+    
+    def _cache_store(self, prompt: str, result: Dict):
+        """Enregistre la forme compacte d'une analyse (sans la réponse brute)"""
+        if not self._cache_enabled() or result.get('error'):
+            return
+        compact = {key: value for key, value in result.items() if key not in ('raw_response', 'metrics')}
+        compact['model'] = self.model
+        self.cache.set(self._cache_key(prompt), compact)
+    
+    def analyze_content_stream(self, transcription: str,
+                               video_metadata: Optional[Dict] = None) -> Iterator[Dict]:
+        """
+        Analyse le contenu en streaming, au fil de la génération
+        
+        Args:
+            transcription: Texte transcrit de la vidéo
+            video_metadata: Métadonnées de la vidéo (optionnel)
+            
+        Yields:
+            Événements successifs:
+            - {'type': 'delta', 'text': ...} pour chaque fragment reçu
+            - {'type': 'section', 'number': ..., 'text': ...} dès qu'une section numérotée est complète
+              (pas de sections en mode structuré)
+            - {'type': 'done', 'result': ...} en dernier, avec l'analyse complète et ses métriques
+              (temps jusqu'au premier token, tokens par seconde)
+        """
+        prompt = self._build_analysis_prompt(transcription, video_metadata)
+        cached = self._cache_lookup(prompt)
+        
+        if cached is not None:
+            chunks = iter([cached['analysis'], cached.get('usage', {})])
+        elif self.provider == "openai":
+            chunks = self._stream_openai(prompt)
+        elif self.provider == "anthropic":
+            chunks = self._stream_anthropic(prompt)
+        else:
+            chunks = self._stream_local(prompt)
+        
+        if cached is None:
+            self.rate_limiter.acquire()
+        
+        start = time.perf_counter()
+        first_token = None
+        text = ''
+        emitted = 0
+        usage = {}
+        
+        for chunk in chunks:
+            if isinstance(chunk, dict):
+                usage = chunk
+                continue
+            if not chunk:
+                continue
+            if first_token is None:
+                first_token = time.perf_counter()
+            text += chunk
+            yield {'type': 'delta', 'text': chunk}
+            
+            # Une section est complète dès que la suivante commence
+            headings = list(SECTION_HEADING.finditer(text))
+            for current, following in zip(headings[emitted:], headings[emitted + 1:]):
+                yield self._section_event(text, current, following.start())
+                emitted += 1
+        
+        headings = list(SECTION_HEADING.finditer(text))
+        if len(headings) > emitted:
+            yield self._section_event(text, headings[emitted], len(text))
+        
+        end = time.perf_counter()
+        output_tokens = usage.get('output_tokens') or len(text.split())
+        generation_time = end - (first_token or end)
+        metrics = {
+            'time_to_first_token': (first_token or end) - start,
+            'total_seconds': end - start,
+            'output_tokens': output_tokens,
+            'tokens_per_second': output_tokens / generation_time if generation_time > 0 else 0.0,
+        }
+        self.last_metrics = metrics
+        
+        if cached is not None:
+            yield {'type': 'done', 'result': dict(cached, metrics=metrics)}
+            return
+        
+        result = self._with_structure({
+            'provider': self.provider,
+            'analysis': text,
+            'usage': usage,
+            'metrics': metrics
+        })
+        self._cache_store(prompt, result)
+        yield {'type': 'done', 'result': result}
+    
+    @staticmethod
+    def _section_event(text: str, heading, end: int) -> Dict:
+        """Événement de section complète"""
+        return {
+            'type': 'section',
+            'number': int(heading.group(1)),
+            'text': text[heading.start():end].strip()
+        }
+    
+    def _stream_openai(self, prompt: str) -> Iterator:
+        """Fragments de texte OpenAI, puis un dictionnaire d'usage"""
+        stream = self.client.chat.completions.create(
+            **self._openai_request(prompt),
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        for chunk in stream:
+            if chunk.choices:
+                yield chunk.choices[0].delta.content
+            if chunk.usage:
+                yield {'output_tokens': chunk.usage.completion_tokens,
+                       'input_tokens': chunk.usage.prompt_tokens}
+    
+    def _stream_anthropic(self, prompt: str) -> Iterator:
+        """Fragments de texte Anthropic, puis un dictionnaire d'usage"""
+        with self.client.messages.stream(**self._anthropic_request(prompt)) as stream:
+            for text in stream.text_stream:
+                yield text
+            message = stream.get_final_message()
+        # En mode structuré, l'analyse arrive en entier dans l'appel d'outil
+        for block in message.content:
+            if block.type == "tool_use":
+                yield json.dumps(block.input, ensure_ascii=False)
+        yield {'output_tokens': message.usage.output_tokens,
+               'input_tokens': message.usage.input_tokens}
+    
+    def _stream_local(self, prompt: str) -> Iterator:
+        """Fragments de texte Ollama (JSON par ligne), puis un dictionnaire d'usage"""
+        url = f"{Config.LOCAL_LLM_URL}/api/generate"
+        request = dict(self._local_request(prompt), stream=True)
+        
+        with self.client.post(url, json=request, stream=True, timeout=Config.LLM_TIMEOUT) as response:
+            if response.status_code != 200:
+                raise Exception(f"Erreur API locale: {response.status_code}")
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                yield data.get('response', '')
+                if data.get('done'):
+                    yield {'output_tokens': data.get('eval_count', 0),
+                           'input_tokens': data.get('prompt_eval_count', 0)}
+    
+    def analyze_many(self, transcriptions: List[str], video_metadata_list: Optional[List[Dict]] = None,
+                     concurrency: Optional[int] = None) -> List[Dict]:
+        """
+        Analyse plusieurs transcriptions en parallèle
+        
+        Les requêtes partagent un client asynchrone (connexions réutilisées) et
+        respectent la limite de concurrence et le débit du provider.
+        
+        Args:
+            transcriptions: Textes transcrits
+            video_metadata_list: Métadonnées de chaque vidéo (optionnel)
+            concurrency: Nombre maximum de requêtes simultanées (défaut: configuration)
+            
+        Returns:
+            Liste des analyses, dans l'ordre des transcriptions. Une analyse en
+            échec contient une clé 'error'.
+        """
+        return _run_coroutine(self.analyze_many_async(transcriptions, video_metadata_list, concurrency))
+    
+    def analyze_batch(self, transcriptions: List[str], video_metadata_list: Optional[List[Dict]] = None,
+                      job_name: Optional[str] = None, wait: bool = True) -> Optional[List[Dict]]:
+        """
+        Analyse en lot via l'API batch du provider (file locale pour Ollama)
+        
+        Moins cher et sans contrainte de débit, mais sans garantie de délai:
+        destiné aux traitements de nuit. L'état du lot est enregistré sur disque
+        et un nouvel appel avec les mêmes transcriptions (ou le même job_name)
+        reprend le lot après une interruption.
+        
+        Args:
+            transcriptions: Textes transcrits
+            video_metadata_list: Métadonnées de chaque vidéo (optionnel)
+            job_name: Nom du lot (défaut: dérivé des requêtes du lot)
+            wait: Attendre la fin du lot
+            
+        Returns:
+            Liste des analyses dans l'ordre des transcriptions, ou None si le
+            lot n'est pas encore terminé (wait=False)
+        """
+        from src.batch import BatchAnalyzer
+        
+        return BatchAnalyzer(self, job_name).run(transcriptions, video_metadata_list, wait=wait)
+    
+    async def analyze_many_async(self, transcriptions: List[str],
+                                 video_metadata_list: Optional[List[Dict]] = None,
+                                 concurrency: Optional[int] = None) -> List[Dict]:
+        """Version asynchrone de analyze_many"""
+        metadata_list = list(video_metadata_list or [])
+        metadata_list += [None] * (len(transcriptions) - len(metadata_list))
+        semaphore = asyncio.Semaphore(concurrency or Config.LLM_CONCURRENCY)
+        client = self._async_client()
+        
+        async def analyze(index: int, transcription: str, metadata: Optional[Dict]) -> Dict:
+            prompt = self._build_analysis_prompt(transcription, metadata)
+            cached = self._cache_lookup(prompt)
+            if cached is not None:
+                return cached
+            
+            async with semaphore:
+                await self.rate_limiter.acquire_async()
+                print(f"Analyse LLM {index + 1}/{len(transcriptions)}...")
+                try:
+                    result = await self._analyze_async(client, prompt)
+                except Exception as e:
+                    print(f"Erreur d'analyse LLM {index + 1}: {e}")
+                    return {'provider': self.provider, 'analysis': '', 'error': str(e)}
+            self._cache_store(prompt, result)
+            return result
+        
+        try:
+            results = await asyncio.gather(*(
+                analyze(i, transcription, metadata)
+                for i, (transcription, metadata) in enumerate(zip(transcriptions, metadata_list))
+            ))
+            hits = sum(1 for result in results if result.get('cached'))
+            if hits:
+                print(f"Cache LLM: {hits}/{len(results)} analyses réutilisées "
+                      f"(économies cumulées: {self.cache_savings['input_tokens'] + self.cache_savings['output_tokens']} "
+                      f"tokens, ${self.cache_savings['cost_usd']:.2f})")
+            return results
+        finally:
+            if self.provider == "local":
+                await client.aclose()
+            else:
+                await client.close()
+    
+    def _async_client(self):
+        """Client asynchrone du provider (un par lot, pour rester lié à la boucle courante)"""
+        if self.provider == "openai":
+            from openai import AsyncOpenAI
+            return AsyncOpenAI(api_key=Config.OPENAI_API_KEY, timeout=Config.LLM_TIMEOUT)
+        if self.provider == "anthropic":
+            import anthropic
+            return anthropic.AsyncAnthropic(api_key=Config.ANTHROPIC_API_KEY, timeout=Config.LLM_TIMEOUT)
+        import httpx
+        return httpx.AsyncClient(
+            timeout=Config.LLM_TIMEOUT,
+            limits=httpx.Limits(max_connections=Config.LLM_CONCURRENCY,
+                                max_keepalive_connections=Config.LLM_CONCURRENCY)
+        )
+    
+    async def _analyze_async(self, client, prompt: str) -> Dict:
+        """Appel asynchrone au provider"""
+        if self.provider == "openai":
+            response = await client.chat.completions.create(**self._openai_request(prompt))
+            return self._openai_result(response)
+        if self.provider == "anthropic":
+            message = await client.messages.create(**self._anthropic_request(prompt))
+            return self._anthropic_result(message)
+        response = await client.post(f"{Config.LOCAL_LLM_URL}/api/generate", json=self._local_request(prompt))
+        if response.status_code != 200:
+            raise Exception(f"Erreur API locale: {response.status_code}")
+        return self._local_result(response.json())
     
     def _build_analysis_prompt(self, transcription: str, video_metadata: Optional[Dict]) -> str:
         """Construit le prompt d'analyse"""
+        if self.structured:
+            return self._build_structured_prompt(transcription, video_metadata)
+        
         prompt = f"""Tu es un expert en analyse de contenu et vérification de faits. Analyse le texte suivant d'une vidéo TikTok et fournis une analyse détaillée.
 
 TEXTE À ANALYSER:
@@ -74,67 +619,203 @@ Réponds en français et structure ta réponse de manière claire."""
         
         return prompt
     
-    def _analyze_openai(self, prompt: str) -> Dict:
-        """Analyse avec OpenAI"""
-        response = self.client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "Tu es un expert en analyse de contenu et vérification de faits."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=2000
-        )
+    def _build_structured_prompt(self, transcription: str, video_metadata: Optional[Dict]) -> str:
+        """Construit le prompt d'analyse en mode structuré (réponse JSON)"""
+        from src.schemas import VideoAnalysis
         
-        analysis_text = response.choices[0].message.content
+        schema = json.dumps(VideoAnalysis.model_json_schema(), ensure_ascii=False)
+        prompt = f"""Tu es un expert en analyse de contenu et vérification de faits. Analyse le texte suivant d'une vidéo TikTok.
+
+TEXTE À ANALYSER:
+{transcription}
+
+Réponds uniquement par un objet JSON conforme à ce schéma:
+{schema}
+
+Règles:
+- claims: uniquement des affirmations factuelles vérifiables, reformulées en une phrase autonome (pas d'opinions ni de questions)
+- to_verify: true si l'affirmation nécessite une vérification factuelle
+- credibility_score: entier de 0 à 100 basé sur la structure et la présentation du contenu
+- Rédige les textes en français."""
         
-        return {
-            'provider': 'openai',
-            'analysis': analysis_text,
-            'raw_response': response.model_dump()
+        if video_metadata:
+            prompt += f"\n\nMÉTADONNÉES VIDÉO:\n{video_metadata}"
+        
+        return prompt
+    
+    def _openai_request(self, prompt: str) -> Dict:
+        """Paramètres de requête OpenAI"""
+        request = {
+            'model': self.model,
+            'messages': [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            'temperature': self.temperature,
+            'max_tokens': self.max_tokens
         }
+        if self.structured:
+            request['response_format'] = {"type": "json_object"}
+        return request
     
-    def _analyze_anthropic(self, prompt: str) -> Dict:
-        """Analyse avec Anthropic Claude"""
-        message = self.client.messages.create(
-            model="claude-3-opus-20240229",
-            max_tokens=2000,
-            temperature=0.7,
-            messages=[
+    def _anthropic_request(self, prompt: str) -> Dict:
+        """Paramètres de requête Anthropic"""
+        request = {
+            'model': self.model,
+            'max_tokens': self.max_tokens,
+            'temperature': self.temperature,
+            'messages': [
                 {"role": "user", "content": prompt}
             ]
-        )
-        
-        analysis_text = message.content[0].text
-        
-        return {
-            'provider': 'anthropic',
-            'analysis': analysis_text,
-            'raw_response': message.model_dump()
         }
+        if self.structured:
+            from src.schemas import VideoAnalysis
+            
+            request['tools'] = [{
+                "name": "record_analysis",
+                "description": "Enregistre l'analyse structurée de la vidéo",
+                "input_schema": VideoAnalysis.model_json_schema()
+            }]
+            request['tool_choice'] = {"type": "tool", "name": "record_analysis"}
+        return request
+    
+    def _local_request(self, prompt: str) -> Dict:
+        """Corps de requête Ollama"""
+        request = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": False
+        }
+        if self.structured:
+            from src.schemas import VideoAnalysis
+            
+            request["format"] = VideoAnalysis.model_json_schema()
+        return request
+    
+    def _analyze_openai(self, prompt: str) -> Dict:
+        """Analyse avec OpenAI"""
+        response = self.client.chat.completions.create(**self._openai_request(prompt))
+        return self._openai_result(response)
+    
+    def _analyze_anthropic(self, prompt: str) -> Dict:
+        """Analyse avec Anthropic Claude"""
+        message = self.client.messages.create(**self._anthropic_request(prompt))
+        return self._anthropic_result(message)
     
     def _analyze_local(self, prompt: str) -> Dict:
         """Analyse avec un modèle local (Ollama)"""
         url = f"{Config.LOCAL_LLM_URL}/api/generate"
         
-        response = requests.post(
-            url,
-            json={
-                "model": Config.LOCAL_LLM_MODEL,
-                "prompt": prompt,
-                "stream": False
-            }
-        )
+        response = self.client.post(url, json=self._local_request(prompt), timeout=Config.LLM_TIMEOUT)
         
         if response.status_code != 200:
             raise Exception(f"Erreur API locale: {response.status_code}")
         
-        result = response.json()
+        return self._local_result(response.json())
+    
+    def _openai_result(self, response) -> Dict:
+        """Formate une réponse OpenAI"""
+        analysis_text = response.choices[0].message.content
+        
+        return self._with_structure({
+            'provider': 'openai',
+            'analysis': analysis_text,
+            'usage': {
+                'input_tokens': response.usage.prompt_tokens,
+                'output_tokens': response.usage.completion_tokens
+            },
+            'raw_response': response.model_dump()
+        })
+    
+    def _anthropic_result(self, message) -> Dict:
+        """Formate une réponse Anthropic"""
+        if self.structured:
+            analysis_text = next(
+                (json.dumps(block.input, ensure_ascii=False) for block in message.content if block.type == "tool_use"),
+                ''
+            )
+        else:
+            analysis_text = message.content[0].text
+        
+        return self._with_structure({
+            'provider': 'anthropic',
+            'analysis': analysis_text,
+            'usage': {
+                'input_tokens': message.usage.input_tokens,
+                'output_tokens': message.usage.output_tokens
+            },
+            'raw_response': message.model_dump()
+        })
+    
+    def _local_result(self, result: Dict) -> Dict:
+        """Formate une réponse Ollama"""
         analysis_text = result.get('response', '')
         
-        return {
+        return self._with_structure({
             'provider': 'local',
             'analysis': analysis_text,
+            'usage': {
+                'input_tokens': result.get('prompt_eval_count', 0),
+                'output_tokens': result.get('eval_count', 0)
+            },
             'raw_response': result
-        }
+        })
+    
+    def _with_structure(self, result: Dict) -> Dict:
+        """
+        Valide la réponse JSON en mode structuré et l'ajoute au résultat
+        
+        Le résultat reçoit 'structured' (analyse validée), 'claims' (affirmations
+        à vérifier), 'credibility_score', et 'analysis' devient le rendu texte de
+        l'analyse. Une réponse invalide est conservée telle quelle, sans affirmations,
+        avec 'structured' à None et une clé 'error' (elle n'est donc pas mise en cache).
+        """
+        if not self.structured:
+            return result
+        
+        from pydantic import ValidationError
+        from src.schemas import VideoAnalysis
+        
+        try:
+            analysis = VideoAnalysis.model_validate_json(result['analysis'])
+        except ValidationError as e:
+            print(f"Réponse structurée invalide ({self.provider}): {e.error_count()} erreur(s)")
+            return dict(result, structured=None, claims=[], error=f"Réponse structurée invalide: {e}")
+        
+        return dict(
+            result,
+            analysis=analysis.to_markdown(),
+            structured=analysis.model_dump(),
+            claims=[{'claim': claim.claim} for claim in analysis.claims if claim.to_verify],
+            credibility_score=analysis.credibility_score
+        )
+
 
+def _timestamp(seconds: float) -> str:
+    """Formate une position en secondes sous la forme m:ss"""
+    seconds = int(seconds or 0)
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def _run_coroutine(coroutine):
+    """Exécute une coroutine, y compris depuis un notebook dont la boucle tourne déjà"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    
+    # Boucle déjà active (Jupyter): exécuter dans un thread dédié
+    result = {}
+    
+    def runner():
+        try:
+            result['value'] = asyncio.run(coroutine)
+        except BaseException as e:
+            result['error'] = e
+    
+    thread = threading.Thread(target=runner)
+    thread.start()
+    thread.join()
+    if 'error' in result:
+        raise result['error']
+    return result['value']
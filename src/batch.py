@@ -0,0 +1,281 @@
+"""
+Analyses LLM par lots via les API batch des providers (traitements de nuit)
+"""
+import hashlib
+import io
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from src.config import Config
+
+# États terminaux des lots, par provider
+FINISHED_STATUSES = {
+    'openai': {'completed', 'failed', 'expired', 'cancelled'},
+    'anthropic': {'ended'},
+}
+
+
+class BatchJob:
+    """État persistant d'un lot d'analyses (fichier JSON réécrit atomiquement)"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.state = {}
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+
+    def save(self):
+        """Écrit l'état sur disque"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def archive(self):
+        """Déplace l'état d'un lot terminé dans le sous-dossier done/ (le nom du lot est libéré)"""
+        if not self.path.exists():
+            return
+        archive_dir = self.path.parent / "done"
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        os.replace(self.path, archive_dir / f"{self.path.stem}-{time.strftime('%Y%m%d_%H%M%S')}.json")
+
+
+class BatchAnalyzer:
+    """Soumet des analyses en lot, suit leur avancement et reprend après une interruption"""
+
+    def __init__(self, analyzer, job_name: Optional[str] = None, state_dir: Optional[Path] = None,
+                 poll_interval: Optional[float] = None):
+        """
+        Initialise le lot
+
+        Args:
+            analyzer: LLMAnalyzer (provider, modèle, prompt et cache)
+            job_name: Nom du lot, qui identifie son fichier d'état (défaut:
+                      dérivé de l'ensemble des requêtes)
+            state_dir: Dossier des fichiers d'état (défaut: CACHE_DIR/batches)
+            poll_interval: Intervalle entre deux vérifications en secondes
+        """
+        self.analyzer = analyzer
+        self.job_name = job_name
+        self.state_dir = state_dir or Config.CACHE_DIR / "batches"
+        self.poll_interval = poll_interval if poll_interval is not None else Config.BATCH_POLL_INTERVAL
+        self.job: Optional[BatchJob] = None
+
+    def run(self, transcriptions: List[str], video_metadata_list: Optional[List[Dict]] = None,
+            wait: bool = True) -> Optional[List[Dict]]:
+        """
+        Analyse les transcriptions en lot
+
+        Relancé avec les mêmes transcriptions après un arrêt, le lot n'est pas
+        soumis une seconde fois: son suivi reprend là où il s'était arrêté.
+        Les requêtes restées sans résultat (lot échoué, expiré ou annulé)
+        sont remises en attente et soumises dans un nouveau lot à la reprise
+        suivante. Une fois toutes les analyses obtenues, l'état est archivé.
+
+        Args:
+            transcriptions: Textes transcrits
+            video_metadata_list: Métadonnées de chaque vidéo (optionnel)
+            wait: Attendre la fin du lot (sinon retourne None s'il est en cours)
+
+        Returns:
+            Liste des analyses dans l'ordre des transcriptions (même format que
+            LLMAnalyzer.analyze_content), ou None si le lot n'est pas terminé
+        """
+        metadata_list = list(video_metadata_list or [])
+        metadata_list += [None] * (len(transcriptions) - len(metadata_list))
+        prompts = [
+            self.analyzer._build_analysis_prompt(transcription, metadata)
+            for transcription, metadata in zip(transcriptions, metadata_list)
+        ]
+        custom_ids = [self.analyzer._cache_key(prompt)[:32] for prompt in prompts]
+        job_name = self.job_name or "batch-" + hashlib.sha256(
+            "\n".join(sorted(set(custom_ids))).encode('utf-8')).hexdigest()[:16]
+        self.job = BatchJob(self.state_dir / f"{job_name}.json")
+
+        if not self.job.state:
+            self._prepare(prompts, custom_ids)
+        elif set(self.job.state['requests']) != set(custom_ids):
+            raise ValueError(f"Le lot {self.job.path.stem} existe déjà avec d'autres transcriptions")
+
+        if self.analyzer.provider == "local":
+            self._run_local()
+        else:
+            if self.job.state['pending'] and not self.job.state.get('batch_id'):
+                self._submit()
+            while self.job.state['pending'] and self.job.state.get('batch_id') and not self._poll():
+                if not wait:
+                    return None
+                time.sleep(self.poll_interval)
+
+        results = self.job.state['results']
+        if not self.job.state['pending']:
+            self.job.archive()
+        return [
+            results.get(custom_id) or _error_result(self.analyzer.provider, 'non traitée, relancer le lot')
+            for custom_id in custom_ids
+        ]
+
+    def _prepare(self, prompts: List[str], custom_ids: List[str]):
+        """Crée l'état du lot; les analyses déjà en cache ne sont pas soumises"""
+        results = {}
+        pending = []
+        for prompt, custom_id in zip(prompts, custom_ids):
+            cached = self.analyzer._cache_lookup(prompt)
+            if cached is not None:
+                results[custom_id] = cached
+            elif custom_id not in pending:
+                pending.append(custom_id)
+
+        self.job.state = {
+            'provider': self.analyzer.provider,
+            'model': self.analyzer.model,
+            'requests': dict(zip(custom_ids, prompts)),
+            'pending': pending,
+            'results': results,
+            'batch_id': None,
+            'status': 'prepared'
+        }
+        self.job.save()
+        print(f"Lot {self.job.path.stem}: {len(pending)} analyse(s) à soumettre, {len(results)} en cache")
+
+    def _submit(self):
+        """Soumet les requêtes en attente à l'API batch du provider"""
+        requests = self.job.state['requests']
+        pending = self.job.state['pending']
+        client = self.analyzer.client
+
+        if self.analyzer.provider == "openai":
+            lines = [
+                json.dumps({
+                    'custom_id': custom_id,
+                    'method': 'POST',
+                    'url': '/v1/chat/completions',
+                    'body': self.analyzer._openai_request(requests[custom_id])
+                }, ensure_ascii=False)
+                for custom_id in pending
+            ]
+            input_file = client.files.create(
+                file=(f"{self.job.path.stem}.jsonl", io.BytesIO("\n".join(lines).encode('utf-8'))),
+                purpose="batch"
+            )
+            batch = client.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+        else:
+            batch = client.messages.batches.create(requests=[
+                {'custom_id': custom_id, 'params': self.analyzer._anthropic_request(requests[custom_id])}
+                for custom_id in pending
+            ])
+
+        self.job.state.update(batch_id=batch.id, status='submitted', submitted_at=time.time())
+        self.job.save()
+        print(f"Lot {self.job.path.stem} soumis ({len(pending)} requêtes): {batch.id}")
+
+    def _poll(self) -> bool:
+        """Vérifie l'avancement du lot et récupère ses résultats une fois terminé"""
+        client = self.analyzer.client
+        batch_id = self.job.state['batch_id']
+
+        if self.analyzer.provider == "openai":
+            batch = client.batches.retrieve(batch_id)
+            status = batch.status
+        else:
+            batch = client.messages.batches.retrieve(batch_id)
+            status = batch.processing_status
+
+        if status != self.job.state['status']:
+            self.job.state['status'] = status
+            self.job.save()
+        if status not in FINISHED_STATUSES[self.analyzer.provider]:
+            return False
+
+        if self.analyzer.provider == "openai":
+            results = self._openai_results(batch)
+        else:
+            results = self._anthropic_results(batch_id)
+        self._record(results)
+
+        # Requêtes absentes de la sortie du provider: remises en attente pour un nouveau lot
+        pending = self.job.state['pending']
+        if pending:
+            self.job.state.setdefault('previous_batch_ids', []).append(batch_id)
+            self.job.state.update(batch_id=None, status='prepared')
+            self.job.save()
+            print(f"Lot {self.job.path.stem} terminé ({status}): {len(pending)} requête(s) sans résultat, "
+                  f"resoumise(s) à la prochaine reprise")
+        return True
+
+    def _openai_results(self, batch) -> Dict[str, Dict]:
+        """Résultats d'un lot OpenAI terminé, par identifiant de requête"""
+        from openai.types.chat import ChatCompletion
+
+        client = self.analyzer.client
+        results = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in client.files.content(file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                response = entry.get('response') or {}
+                if response.get('status_code') == 200:
+                    completion = ChatCompletion.model_validate(response['body'])
+                    results[entry['custom_id']] = self.analyzer._openai_result(completion)
+                else:
+                    error = entry.get('error') or response.get('body', {}).get('error')
+                    results[entry['custom_id']] = _error_result('openai', error)
+        return results
+
+    def _anthropic_results(self, batch_id: str) -> Dict[str, Dict]:
+        """Résultats d'un lot Anthropic terminé, par identifiant de requête"""
+        results = {}
+        for entry in self.analyzer.client.messages.batches.results(batch_id):
+            if entry.result.type == "succeeded":
+                results[entry.custom_id] = self.analyzer._anthropic_result(entry.result.message)
+            elif entry.result.type not in ("expired", "canceled"):
+                # Les requêtes expirées ou annulées restent en attente
+                results[entry.custom_id] = _error_result('anthropic', entry.result.type)
+        return results
+
+    def _run_local(self):
+        """File locale pour Ollama: une requête à la fois, état enregistré après chacune"""
+        requests = self.job.state['requests']
+        pending = self.job.state['pending']
+        self.job.state['status'] = 'in_progress'
+        queue = list(pending)
+        for index, custom_id in enumerate(queue):
+            print(f"Lot {self.job.path.stem}: analyse {index + 1}/{len(queue)}")
+            self.analyzer.rate_limiter.acquire()
+            try:
+                result = self.analyzer._analyze_local(requests[custom_id])
+            except Exception as e:
+                # La requête reste en attente et sera retentée à la prochaine reprise
+                print(f"Erreur d'analyse locale ({custom_id}): {e}")
+                continue
+            self._record({custom_id: result})
+        self.job.state['status'] = 'in_progress' if pending else 'completed'
+        self.job.save()
+
+    def _record(self, results: Dict[str, Dict]):
+        """Enregistre des résultats (forme compacte) et les met en cache"""
+        requests = self.job.state['requests']
+        for custom_id, result in results.items():
+            self.analyzer._cache_store(requests[custom_id], result)
+            self.job.state['results'][custom_id] = {
+                key: value for key, value in result.items() if key != 'raw_response'
+            }
+            if custom_id in self.job.state['pending']:
+                self.job.state['pending'].remove(custom_id)
+        self.job.save()
+
+
+def _error_result(provider: str, error) -> Dict:
+    """Analyse en échec, au format de LLMAnalyzer"""
+    return {'provider': provider, 'analysis': '', 'error': str(error)}
@@ -0,0 +1,129 @@
+"""
+Cache persistant sur disque (SQLite) avec expiration et éviction LRU
+"""
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class ResultCache:
+    """Cache clé/valeur JSON compressé, stocké dans une base SQLite"""
+
+    def __init__(self, db_path: Path, ttl: Optional[float] = None, max_entries: int = 10000,
+                 bypass: bool = False):
+        """
+        Ouvre (ou crée) le cache
+
+        Args:
+            db_path: Chemin du fichier SQLite
+            ttl: Durée de vie des entrées en secondes (None = pas d'expiration)
+            max_entries: Nombre maximum d'entrées avant éviction LRU
+            bypass: Ignore les lectures (les résultats frais sont tout de même enregistrés)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Lit une entrée du cache
+
+        Args:
+            key: Clé de l'entrée
+
+        Returns:
+            Valeur stockée, ou None si absente, expirée ou en mode bypass
+        """
+        if self.bypass:
+            self.misses += 1
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self.ttl is not None and now - row[1] > self.ttl):
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(zlib.decompress(row[0]).decode('utf-8'))
+
+    def set(self, key: str, value: Any):
+        """
+        Enregistre une entrée et applique l'éviction LRU si nécessaire
+
+        Args:
+            key: Clé de l'entrée
+            value: Valeur sérialisable en JSON
+        """
+        blob = zlib.compress(json.dumps(value, ensure_ascii=False).encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, blob, now, now)
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM entries WHERE key IN "
+                    "(SELECT key FROM entries ORDER BY accessed_at ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """Supprime les entrées expirées et retourne leur nombre"""
+        if self.ttl is None:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM entries WHERE created_at < ?", (time.time() - self.ttl,)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def clear(self):
+        """Vide le cache"""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        """Statistiques d'utilisation du cache"""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'entries': size,
+            'max_entries': self.max_entries,
+        }
+
+    def close(self):
+        """Ferme la connexion SQLite"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,133 @@
+"""
+Filtre local de vérifiabilité des affirmations (indices lexicaux, sans modèle ni réseau)
+"""
+import math
+import re
+import unicodedata
+from typing import Dict, List
+
+# Indices d'une affirmation factuelle (texte sans accents, en minuscules)
+FACTUAL_CUES = [
+    'selon', 'etude', 'chercheur', 'scientifique', 'rapport', 'statistique', 'donnees',
+    'gouvernement', 'ministere', 'loi', 'decret', 'oms', 'insee', 'millions', 'milliards',
+    'pour cent', 'pourcent', 'prouve', 'demontre', 'decouvert', 'interdit', 'autorise',
+    'provoque', 'cause', 'augmente', 'diminue', 'reduit', 'tue', 'guerit', 'contient',
+    'represente', 'coute', 'a ete', 'ont ete', 'depuis', 'en moyenne',
+    'modifie', 'vaccin', 'virus', 'maladie', 'cancer', 'climat', 'deces', 'morts', 'impot',
+    'according to', 'study', 'percent', 'million', 'billion', 'causes', 'proved',
+]
+
+# Indices d'opinion, de ressenti ou d'injonction
+OPINION_MARKERS = [
+    'je pense', 'je crois', 'je trouve', 'a mon avis', 'selon moi', "j'ai l'impression",
+    'il faut', 'on doit', 'faut arreter', 'honte', 'scandale', 'incroyable', 'magnifique',
+    'genial', 'nul', 'ridicule', 'franchement', 'j\'adore', 'je deteste', 'reveillez-vous',
+    'reveillez vous', 'i think', 'i believe', 'in my opinion', 'i feel',
+]
+
+# Intensifs: fréquents dans les opinions comme dans les affirmations ("trop de sucre provoque...")
+INTENSIFIERS = ['trop', 'vraiment', 'completement', 'totalement', 'tellement', 'super']
+
+# Entités fréquentes dans les affirmations virales, reconnues sans tenir compte de la casse
+ENTITIES = [
+    'terre', 'lune', 'soleil', 'planete', 'france', 'europe', 'union europeenne', 'ue', 'chine',
+    'etats-unis', 'usa', 'amerique', 'americain', 'russie', 'ukraine', 'afrique', 'espagne',
+    'arctique', 'sahara', 'oms', 'onu', 'insee', 'gouvernement', 'macron', 'trump', 'bill gates',
+    'pape', 'einstein', 'covid', 'coronavirus', '5g', 'adn', 'arn', 'pfizer', 'moderna', 'ogm',
+    'glyphosate', 'pesticide', 'paracetamol', 'ivermectine', 'hydroxychloroquine', 'vitamine',
+    'antibiotique', 'fluor', 'aluminium', 'gluten', 'sucre', 'sel', 'alcool', 'tabac', 'cafe',
+    'lait', 'diabete', 'autisme', 'nucleaire', 'smic', 'inflation', 'chomage', 'dette', 'retraite',
+]
+
+# Poids des indices: régression logistique ajustée sur benchmarks/fixtures/check_worthiness.json
+# (python benchmarks/check_worthiness.py pour les recalculer)
+WEIGHTS = {
+    'bias': 1.21,
+    'number': 0.68,
+    'entity': 2.37,
+    'factual_cue': 1.68,
+    'opinion': -1.23,
+    'intensifier': -0.57,
+    'first_person': -1.26,
+    'second_person': -1.16,
+    'question': -0.65,
+    'exclamation': -0.4,
+    'short': -2.03,
+}
+
+# Seuil retenu sur le même jeu annoté
+THRESHOLD = 0.4
+
+def _terms(terms: List[str]):
+    """Expression régulière des termes en mots entiers (pluriels et accords tolérés)"""
+    return re.compile(r"\b(?:" + "|".join(re.escape(term) for term in terms) + r")(?:s|e|es|nt|ent)?\b")
+
+
+_FACTUAL_CUES = _terms(FACTUAL_CUES)
+_OPINION_MARKERS = _terms(OPINION_MARKERS)
+_INTENSIFIERS = _terms(INTENSIFIERS)
+_ENTITIES = _terms(ENTITIES)
+_NUMBER = re.compile(r'\d|%|\b(?:un|deux|trois|dix|cent|mille)\s+(?:millions?|milliards?)\b')
+_FIRST_PERSON = re.compile(r"\b(?:je|j'|moi|mon|ma|mes|i|my)\b")
+# Tutoiement, vouvoiement ou impératif en tête ("abonnez-vous", "partagez")
+_SECOND_PERSON = re.compile(r"\b(?:tu|t'|vous|ton|ta|tes|votre|vos|you)\b|^\w+ez\b")
+# Mot à majuscule hors début de phrase (nom propre, sigle)
+_CAPITALIZED = re.compile(r"(?<![.!?]\s)(?<!^)\b[A-ZÉÈÀÂÎÔ][\wÀ-ÿ-]{1,}")
+
+
+def _fold(text: str) -> str:
+    """Minuscules sans accents"""
+    text = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+class CheckWorthinessScorer:
+    """Estime si une affirmation mérite une vérification factuelle"""
+
+    def __init__(self, threshold: float = THRESHOLD):
+        """
+        Initialise le filtre
+
+        Args:
+            threshold: Priorité minimale pour qu'une affirmation soit vérifiée
+        """
+        self.threshold = threshold
+
+    def features(self, claim: str) -> Dict[str, float]:
+        """Indices lexicaux de l'affirmation"""
+        folded = _fold(claim)
+        stripped = claim.strip()
+        return {
+            'bias': 1.0,
+            'number': float(bool(_NUMBER.search(folded))),
+            'entity': min(len(self._entities(claim, folded)), 2) / 2,
+            'factual_cue': min(len(_FACTUAL_CUES.findall(folded)), 2) / 2,
+            'opinion': min(len(_OPINION_MARKERS.findall(folded)), 2) / 2,
+            'intensifier': float(bool(_INTENSIFIERS.search(folded))),
+            'first_person': float(bool(_FIRST_PERSON.search(folded))),
+            'second_person': float(bool(_SECOND_PERSON.search(folded))),
+            'question': float(stripped.endswith('?')),
+            'exclamation': float('!' in stripped),
+            'short': float(len(folded.split()) < 6),
+        }
+
+    @staticmethod
+    def _entities(claim: str, folded: str) -> set:
+        """Entités connues (quelle que soit la casse) et noms propres à majuscule"""
+        entities = {match.group(0) for match in _ENTITIES.finditer(folded)}
+        entities.update(_fold(word) for word in _CAPITALIZED.findall(claim.strip()))
+        return entities
+
+    def score(self, claim: str) -> float:
+        """Priorité de vérification entre 0 et 1"""
+        features = self.features(claim)
+        logit = sum(WEIGHTS[name] * value for name, value in features.items())
+        return 1 / (1 + math.exp(-logit))
+
+    def is_checkable(self, claim: str) -> bool:
+        """L'affirmation atteint-elle le seuil de vérification ?"""
+        return self.score(claim) >= self.threshold
+
+    def rank(self, claims: List[str]) -> List[str]:
+        """Affirmations triées par priorité décroissante"""
+        return sorted(claims, key=self.score, reverse=True)
@@ -0,0 +1,153 @@
+"""
+Index de quasi-doublons d'affirmations (MinHash/LSH sur des shingles de caractères)
+"""
+import random
+import re
+import unicodedata
+import zlib
+from typing import Dict, FrozenSet, List, Set
+
+# Mots vides ignorés lors de la normalisation (les négations sont conservées)
+STOPWORDS = {
+    'le', 'la', 'les', 'l', 'de', 'du', 'des', 'd', 'et', 'ou', 'un', 'une', 'ce', 'cette',
+    'ces', 'il', 'elle', 'ils', 'elles', 'on', 'que', 'qui', 'qu', 'en', 'a', 'au', 'aux',
+    'est', 'sont', 'c', 'se', 's', 'y', 'tres', 'the', 'of', 'and', 'is'
+}
+
+# Marques de négation: deux affirmations qui en diffèrent ne sont jamais fusionnées
+NEGATIONS = {'ne', 'n', 'pas', 'plus', 'jamais', 'aucun', 'aucune', 'non', 'not', 'no', 'never'}
+
+# Unités et multiplicateurs rattachés à un nombre: "5 mg" et "50 mg" ne sont jamais fusionnées
+UNITS = {
+    '%', 'pourcent', 'percent', 'mg', 'g', 'kg', 't', 'tonnes', 'ml', 'cl', 'l', 'litres', 'mm', 'cm',
+    'm', 'km', 'metres', 'kilometres', 'degres', 'ans', 'an', 'mois', 'semaines', 'jours', 'heures',
+    'h', 'min', 'minutes', 'fois', 'euros', 'eur', 'dollars', 'usd', 'mille', 'milliers', 'million',
+    'millions', 'milliard', 'milliards', 'md', 'mds', 'years', 'days', 'thousand', 'billion', 'billions'
+}
+
+_QUANTITY = re.compile(r'(\d+(?:[.,]\d+)?)\s*(%|[a-z]+)?')
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def _fold(text: str) -> str:
+    """Minuscules sans accents"""
+    text = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+def negations(claim: str) -> FrozenSet[str]:
+    """Marques de négation présentes dans l'affirmation"""
+    return frozenset(NEGATIONS.intersection(normalize_claim(claim).split()))
+
+
+def quantities(claim: str) -> FrozenSet[str]:
+    """Nombres de l'affirmation, avec leur unité lorsqu'elle les suit ("68 millions", "5 mg", "2.5 %")"""
+    found = set()
+    for number, unit in _QUANTITY.findall(_fold(claim)):
+        number = number.replace(',', '.')
+        found.add(f"{number} {unit}" if unit in UNITS else number)
+    return frozenset(found)
+
+
+def normalize_claim(claim: str) -> str:
+    """Minuscules, sans accents, sans ponctuation ni mots vides"""
+    words = re.findall(r'\w+', _fold(claim))
+    return ' '.join(w for w in words if w not in STOPWORDS)
+
+
+class ClaimIndex:
+    """Regroupe les affirmations équivalentes formulées différemment"""
+
+    def __init__(self, threshold: float = 0.6, shingle_size: int = 4, bands: int = 16, rows: int = 4,
+                 seed: int = 42):
+        """
+        Initialise l'index
+
+        Args:
+            threshold: Similarité de Jaccard minimale pour fusionner deux affirmations
+            shingle_size: Taille des shingles de caractères
+            bands: Nombre de bandes LSH
+            rows: Nombre de lignes par bande (bands * rows fonctions de hachage)
+            seed: Graine des permutations MinHash
+        """
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.bands = bands
+        self.rows = rows
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(bands * rows)
+        ]
+
+    def cluster(self, claims: List[str]) -> Dict[str, List[str]]:
+        """
+        Regroupe les affirmations quasi identiques
+
+        Deux affirmations dont les négations ("modifie" / "ne modifie pas")
+        ou les nombres ("5 mg" / "50 mg") diffèrent restent séparées quelle
+        que soit leur similarité.
+
+        Args:
+            claims: Liste des affirmations
+
+        Returns:
+            Dictionnaire représentant -> membres du groupe (représentant inclus),
+            le représentant étant la première occurrence du groupe
+        """
+        claims = list(dict.fromkeys(claims))
+        shingles = [self._shingles(claim) for claim in claims]
+        constraints = [(negations(claim), quantities(claim)) for claim in claims]
+        parent = list(range(len(claims)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        buckets: Dict[tuple, List[int]] = {}
+        for i, claim_shingles in enumerate(shingles):
+            signature = self._signature(claim_shingles)
+            candidates = set()
+            for band in range(self.bands):
+                key = (band, tuple(signature[band * self.rows:(band + 1) * self.rows]))
+                candidates.update(buckets.setdefault(key, []))
+                buckets[key].append(i)
+
+            # Vérification exacte des candidats LSH (mêmes négations et nombres que tout le groupe)
+            for j in sorted(candidates):
+                root_i, root_j = find(i), find(j)
+                if (root_i != root_j and constraints[root_i] == constraints[root_j]
+                        and self._jaccard(claim_shingles, shingles[j]) >= self.threshold):
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        clusters: Dict[str, List[str]] = {}
+        for i, claim in enumerate(claims):
+            clusters.setdefault(claims[find(i)], []).append(claim)
+        return clusters
+
+    def _shingles(self, claim: str) -> Set[int]:
+        """Shingles de caractères hachés de l'affirmation normalisée"""
+        text = normalize_claim(claim)
+        if len(text) <= self.shingle_size:
+            return {zlib.crc32(text.encode('utf-8'))}
+        return {
+            zlib.crc32(text[i:i + self.shingle_size].encode('utf-8'))
+            for i in range(len(text) - self.shingle_size + 1)
+        }
+
+    def _signature(self, shingles: Set[int]) -> List[int]:
+        """Signature MinHash"""
+        return [
+            min((a * s + b) % _MERSENNE_PRIME for s in shingles)
+            for a, b in self._permutations
+        ]
+
+    @staticmethod
+    def _jaccard(a: Set[int], b: Set[int]) -> float:
+        """Similarité de Jaccard exacte entre deux ensembles de shingles"""
+        if not a or not b:
+            return 0.0
+        return len(a & b) / len(a | b)
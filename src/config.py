@@ -22,14 +22,51 @@ class Config:
     # Provider par défaut
     DEFAULT_LLM_PROVIDER = os.getenv("DEFAULT_LLM_PROVIDER", "openai")
     
+    # Appels LLM: délai, concurrence et débit maximum (requêtes/minute, 0 = illimité)
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "120"))
+    LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "8"))
+    LLM_RATE_LIMITS = {
+        'openai': float(os.getenv("OPENAI_RPM", "500")),
+        'anthropic': float(os.getenv("ANTHROPIC_RPM", "50")),
+        'local': float(os.getenv("LOCAL_RPM", "0")),
+    }
+    LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", 30 * 24 * 3600))
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+    # Traitements par lots (API batch des providers)
+    BATCH_POLL_INTERVAL = float(os.getenv("BATCH_POLL_INTERVAL", "60"))
+    
+    # Recherche (vérification des faits)
+    SEARCH_CONCURRENCY = int(os.getenv("SEARCH_CONCURRENCY", "8"))
+    SEARCH_TIMEOUT = float(os.getenv("SEARCH_TIMEOUT", "15"))
+    SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", 7 * 24 * 3600))
+    SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "50000"))
+    SEARCH_RATE = float(os.getenv("SEARCH_RATE", "1"))  # requêtes/s au démarrage
+    SEARCH_MAX_RATE = float(os.getenv("SEARCH_MAX_RATE", "5"))
+    SEARCH_MAX_RETRIES = int(os.getenv("SEARCH_MAX_RETRIES", "3"))
+    SEARCH_BUDGET_PER_RUN = int(os.getenv("SEARCH_BUDGET_PER_RUN", "0"))  # par vérification, 0 = illimité
+    EVIDENCE_TOP_N = int(os.getenv("EVIDENCE_TOP_N", "3"))  # pages lues par affirmation (0 = aucune)
+    EVIDENCE_MAX_BYTES = int(os.getenv("EVIDENCE_MAX_BYTES", 512 * 1024))
+    EVIDENCE_CACHE_MAX_ENTRIES = int(os.getenv("EVIDENCE_CACHE_MAX_ENTRIES", "20000"))
+    CHECK_WORTHINESS_THRESHOLD = float(os.getenv("CHECK_WORTHINESS_THRESHOLD", "0.4"))
+    LOCAL_MATCH_THRESHOLD = float(os.getenv("LOCAL_MATCH_THRESHOLD", "0.8"))  # part des termes dans le titre
+    LOCAL_INDEX_TTL = float(os.getenv("LOCAL_INDEX_TTL", 30 * 24 * 3600))  # 0 = articles sans expiration
+    SEARCH_BUDGET_PER_VIDEO = int(os.getenv("SEARCH_BUDGET_PER_VIDEO", "0"))  # 0 = illimité
+    
+    # Transcription
+    TRANSCRIPTION_CACHE_MAX_ENTRIES = int(os.getenv("TRANSCRIPTION_CACHE_MAX_ENTRIES", "5000"))
+    
     # Répertoires
     BASE_DIR = Path(__file__).parent.parent
     OUTPUT_DIR = Path(os.getenv("OUTPUT_DIR", BASE_DIR / "results"))
     VIDEOS_DIR = Path(os.getenv("VIDEOS_DIR", BASE_DIR / "videos"))
+    CACHE_DIR = Path(os.getenv("CACHE_DIR", BASE_DIR / ".cache"))
+    LOCAL_INDEX_PATH = Path(os.getenv("LOCAL_INDEX_PATH", CACHE_DIR / "factchecks.sqlite"))
+    RESULTS_DB_PATH = Path(os.getenv("RESULTS_DB_PATH", OUTPUT_DIR / "results.sqlite"))
     
     # Créer les répertoires s'ils n'existent pas
     OUTPUT_DIR.mkdir(exist_ok=True)
     VIDEOS_DIR.mkdir(exist_ok=True)
+    CACHE_DIR.mkdir(exist_ok=True)
     
     @classmethod
     def validate(cls):
@@ -1,18 +1,184 @@
 """
 Module de téléchargement de vidéos TikTok
 """
+import json
 import os
-import yt_dlp
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional
 from src.config import Config
 
+# Gabarit des fichiers téléchargés: l'identifiant distingue deux vidéos de même titre
+OUTPUT_TEMPLATE = "%(title)s [%(id)s].%(ext)s"
+
+
+def _youtube_dl(options: dict):
+    """Crée une session yt-dlp (le module n'est importé qu'à la première utilisation)"""
+    import yt_dlp
+    return yt_dlp.YoutubeDL(options)
+
+
+def _metadata(info: dict) -> dict:
+    """Extrait l'enregistrement de métadonnées d'un résultat yt-dlp"""
+    return {
+        'id': info.get('id', ''),
+        'url': info.get('webpage_url', ''),
+        'title': info.get('title', ''),
+        'description': info.get('description', ''),
+        'uploader': info.get('uploader', ''),
+        'upload_date': info.get('upload_date', ''),
+        'duration': info.get('duration') or 0,
+        'view_count': info.get('view_count') or 0,
+        'like_count': info.get('like_count') or 0,
+    }
+
+
+class DownloadManifest:
+    """Manifeste des vidéos déjà téléchargées dans un dossier (identifiant -> fichier et mode)"""
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries = {}
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+    
+    def complete_path(self, video_id: str, mode: str) -> Optional[Path]:
+        """Retourne le fichier d'une vidéo s'il est complet et a été obtenu dans ce mode"""
+        entry = self.entries.get(video_id)
+        if not entry or entry.get('mode') != mode:
+            return None
+        path = self.path.parent / entry['file']
+        if path.exists() and path.stat().st_size == entry['size']:
+            return path
+        return None
+    
+    def record(self, video_id: str, path: Path, mode: str, **extra):
+        """Enregistre un téléchargement terminé (écriture atomique du manifeste)"""
+        with self._lock:
+            self.entries[video_id] = {
+                'file': path.name,
+                'size': path.stat().st_size,
+                'mode': mode,
+                **extra
+            }
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+
+
 class TikTokDownloader:
     """Gestionnaire de téléchargement de vidéos TikTok"""
     
-    def __init__(self, output_dir: Optional[Path] = None):
+    def __init__(self, output_dir: Optional[Path] = None, audio_only: bool = False,
+                 audio_format: str = "opus"):
+        """
+        Initialise le téléchargeur
+        
+        Args:
+            output_dir: Dossier de destination
+            audio_only: Ne conserve que la piste audio, en 16 kHz mono (suffisant pour Whisper)
+            audio_format: Format audio en mode audio seul ('opus' pour le disque, 'wav' pour
+                          un PCM lu directement par le transcripteur sans ffmpeg)
+        """
         self.output_dir = output_dir or Config.VIDEOS_DIR
         self.output_dir.mkdir(exist_ok=True)
+        self.audio_only = audio_only
+        self.audio_format = audio_format
+        # Métriques par fichier: octets transférés, taille sur disque, durée
+        self.metrics: Dict[str, Dict] = {}
+        self._metrics_lock = threading.Lock()
+        # Sessions yt-dlp réutilisées pendant toute l'exécution (une par thread et par gabarit)
+        self._local = threading.local()
+        self._sessions = []
+    
+    @property
+    def mode(self) -> str:
+        """Mode d'acquisition enregistré dans le manifeste ('video' ou 'audio:<format>')"""
+        return f"audio:{self.audio_format}" if self.audio_only else "video"
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        """Ferme les sessions yt-dlp ouvertes"""
+        with self._metrics_lock:
+            sessions, self._sessions = self._sessions, []
+        for ydl in sessions:
+            ydl.close()
+        self._local = threading.local()
+    
+    def _session(self, outtmpl: Optional[str], quiet: bool = True):
+        """
+        Session yt-dlp longue durée du thread courant
+        
+        Args:
+            outtmpl: Gabarit de sortie des téléchargements, ou None pour une session
+                     d'extraction de métadonnées sans format imposé
+            quiet: Supprime la sortie de yt-dlp
+        """
+        sessions = getattr(self._local, 'sessions', None)
+        if sessions is None:
+            sessions = self._local.sessions = {}
+        key = (outtmpl, quiet)
+        if key not in sessions:
+            if outtmpl is None:
+                options = {'quiet': quiet, 'no_warnings': quiet}
+            else:
+                options = self._download_options(outtmpl, quiet)
+            sessions[key] = _youtube_dl(options)
+            with self._metrics_lock:
+                self._sessions.append(sessions[key])
+        return sessions[key]
+    
+    def _download_options(self, outtmpl: str, quiet: bool) -> dict:
+        """Options yt-dlp de téléchargement selon le mode (vidéo ou audio seul)"""
+        ydl_opts = {
+            'format': 'best[ext=mp4]',
+            'outtmpl': outtmpl,
+            'quiet': quiet,
+            'no_warnings': quiet,
+            'continuedl': True,
+            'progress_hooks': [self._record_progress],
+        }
+        if self.audio_only:
+            # Plus petit format contenant de l'audio, puis extraction en 16 kHz mono
+            ydl_opts['format'] = 'worstaudio/worst[acodec!=none]/worst'
+            ydl_opts['postprocessors'] = [{
+                'key': 'FFmpegExtractAudio',
+                'preferredcodec': self.audio_format,
+            }]
+            ydl_opts['postprocessor_args'] = {'extractaudio': ['-ac', '1', '-ar', '16000']}
+        return ydl_opts
+    
+    def _record_progress(self, status: dict):
+        """Hook de progression yt-dlp: mémorise les octets transférés par fichier"""
+        if status.get('status') != 'finished':
+            return
+        with self._metrics_lock:
+            self.metrics[Path(status['filename']).stem] = {
+                'bytes_downloaded': status.get('downloaded_bytes') or status.get('total_bytes') or 0,
+                'download_seconds': status.get('elapsed', 0),
+            }
+    
+    def _finalize(self, ydl, info: dict) -> Path:
+        """Chemin final après post-traitement et complétion des métriques"""
+        downloads = info.get('requested_downloads') or [{}]
+        path = Path(downloads[0].get('filepath') or ydl.prepare_filename(info))
+        with self._metrics_lock:
+            metrics = self.metrics.setdefault(path.stem, {})
+            metrics['file_bytes'] = path.stat().st_size if path.exists() else 0
+            metrics['format_id'] = info.get('format_id', '')
+            metrics['audio_only'] = self.audio_only
+        return path
     
     def download_video(self, url: str, output_filename: Optional[str] = None) -> Path:
         """
@@ -25,59 +191,178 @@ class TikTokDownloader:
         Returns:
             Chemin du fichier vidéo téléchargé
         """
+        return self.fetch_video(url, output_filename)['path']
+    
+    def fetch_video(self, url: str, output_filename: Optional[str] = None) -> Dict:
+        """
+        Télécharge une vidéo et récupère ses métadonnées en une seule extraction
+        
+        Args:
+            url: URL de la vidéo TikTok
+            output_filename: Nom du fichier de sortie (optionnel)
+            
+        Returns:
+            Dictionnaire {'id', 'path', 'metadata'}
+        """
         if output_filename:
             output_path = self.output_dir / output_filename
         else:
-            output_path = self.output_dir / "%(title)s.%(ext)s"
+            output_path = self.output_dir / OUTPUT_TEMPLATE
         
-        ydl_opts = {
-            'format': 'best[ext=mp4]',
-            'outtmpl': str(output_path),
-            'quiet': False,
-            'no_warnings': False,
+        ydl = self._session(str(output_path), quiet=False)
+        info = ydl.extract_info(url, download=True)
+        return {
+            'id': info.get('id', ''),
+            'path': self._finalize(ydl, info),
+            'metadata': _metadata(info)
         }
-        
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=True)
-            filename = ydl.prepare_filename(info)
-            return Path(filename)
     
-    def download_user_videos(self, username: str, max_videos: int = 5) -> List[Path]:
+    def download_user_videos(self, username: str, max_videos: int = 5, max_workers: int = 4,
+                             retries: int = 3) -> List[Path]:
         """
         Télécharge les vidéos récentes d'un utilisateur TikTok
         
+        Les vidéos déjà présentes et complètes dans le même mode (d'après le
+        manifeste du dossier utilisateur) ne sont pas retéléchargées.
+        
         Args:
             username: Nom d'utilisateur TikTok (sans @)
             max_videos: Nombre maximum de vidéos à télécharger
+            max_workers: Nombre de téléchargements simultanés
+            retries: Nombre de tentatives par vidéo (au moins une)
             
         Returns:
-            Liste des chemins des vidéos téléchargées
+            Liste des chemins des vidéos téléchargées, dans l'ordre du profil
         """
-        user_url = f"https://www.tiktok.com/@{username}"
+        return [record['path'] for record in self.fetch_user_videos(username, max_videos, max_workers, retries)]
+    
+    def fetch_user_videos(self, username: str, max_videos: int = 5, max_workers: int = 4,
+                          retries: int = 3) -> List[Dict]:
+        """
+        Télécharge les vidéos récentes d'un utilisateur avec leurs métadonnées
+        
+        Args:
+            username: Nom d'utilisateur TikTok (sans @)
+            max_videos: Nombre maximum de vidéos à télécharger
+            max_workers: Nombre de téléchargements simultanés
+            retries: Nombre de tentatives par vidéo (au moins une)
+            
+        Returns:
+            Liste de dictionnaires {'id', 'path', 'metadata'}, dans l'ordre du profil
+        """
+        try:
+            entries = self.list_user_videos(username, max_videos)
+        except Exception as e:
+            print(f"Erreur lors du téléchargement: {e}")
+            return []
+        
+        records = {
+            record['id']: record
+            for record in self.iter_user_videos(username, max_videos, max_workers, retries, entries=entries)
+        }
+        return [records[entry['id']] for entry in entries if entry['id'] in records]
+    
+    def iter_user_videos(self, username: str, max_videos: int = 5, max_workers: int = 4,
+                         retries: int = 3, entries: Optional[List[Dict]] = None) -> Iterator[Dict]:
+        """
+        Télécharge les vidéos d'un utilisateur avec un pool de workers
+        
+        Args:
+            username: Nom d'utilisateur TikTok (sans @)
+            max_videos: Nombre maximum de vidéos à télécharger
+            max_workers: Nombre de téléchargements simultanés
+            retries: Nombre de tentatives par vidéo (au moins une)
+            entries: Entrées déjà listées (optionnel, voir list_user_videos)
+            
+        Yields:
+            Dictionnaires {'id', 'path', 'metadata'} dans l'ordre de fin de téléchargement
+        """
+        if entries is None:
+            entries = self.list_user_videos(username, max_videos)
         user_dir = self.output_dir / username
         user_dir.mkdir(exist_ok=True)
+        manifest = DownloadManifest(user_dir / "manifest.json")
+        
+        pending = []
+        for entry in entries:
+            path = manifest.complete_path(entry['id'], self.mode)
+            if path:
+                print(f"Déjà téléchargée: {path.name}")
+                yield {
+                    'id': entry['id'],
+                    'path': path,
+                    'metadata': manifest.entries[entry['id']].get('metadata', {})
+                }
+            else:
+                pending.append(entry)
         
+        if not pending:
+            return
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._download_entry, entry, user_dir, retries): entry
+                for entry in pending
+            }
+            for future in as_completed(futures):
+                entry = futures[future]
+                try:
+                    record = future.result()
+                except Exception as e:
+                    print(f"Erreur lors du téléchargement de {entry['url']}: {e}")
+                    continue
+                manifest.record(entry['id'], record['path'], self.mode, metadata=record['metadata'])
+                yield record
+    
+    def list_user_videos(self, username: str, max_videos: int = 5) -> List[Dict]:
+        """
+        Liste les vidéos récentes d'un utilisateur sans les télécharger
+        
+        Args:
+            username: Nom d'utilisateur TikTok (sans @)
+            max_videos: Nombre maximum de vidéos
+            
+        Returns:
+            Liste de dictionnaires {'id', 'url', 'title'}
+        """
+        user_url = f"https://www.tiktok.com/@{username}"
         ydl_opts = {
-            'format': 'best[ext=mp4]',
-            'outtmpl': str(user_dir / '%(title)s.%(ext)s'),
-            'quiet': False,
+            'extract_flat': 'in_playlist',
             'playlistend': max_videos,
+            'quiet': True,
+            'no_warnings': True,
         }
         
-        downloaded_files = []
+        with _youtube_dl(ydl_opts) as ydl:
+            info = ydl.extract_info(user_url, download=False)
+        
+        entries = []
+        for entry in (info.get('entries') or [])[:max_videos]:
+            if entry and entry.get('id'):
+                entries.append({
+                    'id': entry['id'],
+                    'url': entry.get('url') or f"{user_url}/video/{entry['id']}",
+                    'title': entry.get('title', ''),
+                })
+        return entries
+    
+    def _download_entry(self, entry: Dict, user_dir: Path, retries: int) -> Dict:
+        """Télécharge une entrée, avec reprise des fichiers partiels et backoff exponentiel"""
+        ydl = self._session(str(user_dir / OUTPUT_TEMPLATE))
+        attempts = max(retries, 1)
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        for attempt in range(attempts):
             try:
-                info = ydl.extract_info(user_url, download=True)
-                if 'entries' in info:
-                    for entry in info['entries']:
-                        if entry:
-                            filename = ydl.prepare_filename(entry)
-                            downloaded_files.append(Path(filename))
+                info = ydl.extract_info(entry['url'], download=True)
+                path = self._finalize(ydl, info)
+                print(f"Téléchargée: {path.name}")
+                return {'id': entry['id'], 'path': path, 'metadata': _metadata(info)}
             except Exception as e:
-                print(f"Erreur lors du téléchargement: {e}")
-        
-        return downloaded_files
+                if attempt == attempts - 1:
+                    raise
+                delay = 2 ** attempt + random.uniform(0, 1)
+                print(f"Échec du téléchargement de {entry['url']} ({e}), nouvel essai dans {delay:.1f}s")
+                time.sleep(delay)
     
     def get_video_info(self, url: str) -> dict:
         """
@@ -89,20 +374,5 @@ class TikTokDownloader:
         Returns:
             Dictionnaire avec les métadonnées
         """
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-        }
-        
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            return {
-                'title': info.get('title', ''),
-                'description': info.get('description', ''),
-                'uploader': info.get('uploader', ''),
-                'upload_date': info.get('upload_date', ''),
-                'duration': info.get('duration', 0),
-                'view_count': info.get('view_count', 0),
-                'like_count': info.get('like_count', 0),
-            }
-
+        info = self._session(None).extract_info(url, download=False)
+        return _metadata(info)
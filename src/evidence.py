@@ -0,0 +1,198 @@
+"""
+Récupération et extraction du texte des pages sources (preuves pour la vérification)
+"""
+import codecs
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from src.cache import ResultCache
+
+# Balises dont le contenu n'est jamais du texte d'article
+SKIPPED_TAGS = {'script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside', 'form', 'svg', 'iframe',
+                'button', 'select'}
+# Balises de blocs de texte conservées
+TEXT_TAGS = {'p', 'h1', 'h2', 'h3', 'li', 'blockquote'}
+# Conteneurs du contenu principal, préférés au reste de la page s'ils existent
+MAIN_TAGS = {'article', 'main'}
+# Balises sans contenu (jamais fermées)
+VOID_TAGS = {'br', 'img', 'hr', 'meta', 'link', 'input', 'source', 'wbr', 'area', 'base', 'col', 'embed'}
+
+
+class ArticleExtractor(HTMLParser):
+    """
+    Extracteur du texte principal d'une page, en un seul passage et sans arbre DOM
+
+    Ne conserve que les blocs de texte (paragraphes, titres, listes) hors des
+    zones de navigation; le texte situé dans <article> ou <main> est préféré.
+    """
+
+    def __init__(self, max_chars: int = 20000):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.title = ''
+        self._in_title = False
+        self._skip_depth = 0
+        self._main_depth = 0
+        self._text_depth = 0
+        self._block: List[str] = []
+        self._main: List[str] = []
+        self._other: List[str] = []
+        self._size = 0
+        # Vrai dès que la suite de la page n'apporterait plus rien
+        self.finished = False
+
+    def handle_starttag(self, tag: str, attrs):
+        if tag in VOID_TAGS:
+            return
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in MAIN_TAGS:
+            self._main_depth += 1
+        elif tag in TEXT_TAGS:
+            self._text_depth += 1
+        elif tag == 'title':
+            self._in_title = True
+
+    def handle_endtag(self, tag: str):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in MAIN_TAGS:
+            self._main_depth = max(0, self._main_depth - 1)
+            if not self._main_depth and self._main:
+                self.finished = True
+        elif tag in TEXT_TAGS:
+            self._text_depth = max(0, self._text_depth - 1)
+            if not self._text_depth:
+                self._flush_block()
+        elif tag == 'title':
+            self._in_title = False
+
+    def handle_data(self, data: str):
+        if self._in_title:
+            self.title += data
+        elif self._text_depth and not self._skip_depth and self._size < self.max_chars:
+            self._block.append(data)
+
+    def _flush_block(self):
+        """Termine le bloc de texte courant"""
+        text = ' '.join(''.join(self._block).split())
+        self._block = []
+        if len(text) < 3:
+            return
+        (self._main if self._main_depth else self._other).append(text)
+        self._size += len(text)
+        if self._size >= self.max_chars:
+            self.finished = True
+
+    def text(self) -> str:
+        """Texte extrait (contenu principal s'il a été identifié)"""
+        self._flush_block()
+        return '\n'.join(self._main or self._other)[:self.max_chars]
+
+
+class EvidenceFetcher:
+    """Télécharge en parallèle les pages sources et met en cache leur texte extrait"""
+
+    def __init__(self, max_workers: int = 8, timeout: float = 10.0, max_bytes: int = 512 * 1024,
+                 max_chars: int = 20000, max_age: float = 7 * 24 * 3600, cache: Optional[ResultCache] = None):
+        """
+        Initialise le récupérateur
+
+        Args:
+            max_workers: Nombre de téléchargements simultanés (et taille du pool de connexions)
+            timeout: Délai réseau maximum par page en secondes
+            max_bytes: Nombre maximum d'octets lus par page (le reste n'est pas téléchargé)
+            max_chars: Nombre maximum de caractères de texte conservés par page
+            max_age: Âge au-delà duquel une page en cache est revalidée (ETag)
+            cache: Cache compressé des textes extraits (optionnel)
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self.max_age = max_age
+        self.cache = cache
+        self.downloads = 0
+        self._lock = threading.Lock()
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = "Mozilla/5.0 (compatible; info-checker)"
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def fetch_many(self, urls: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Récupère le texte de plusieurs pages en parallèle
+
+        Args:
+            urls: URLs des pages
+
+        Returns:
+            Dictionnaire URL -> {'url', 'title', 'text', 'etag'}, ou None si la
+            page n'a pas pu être récupérée
+        """
+        urls = list(dict.fromkeys(url for url in urls if url))
+        if not urls:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            return dict(zip(urls, executor.map(self.fetch, urls)))
+
+    def fetch(self, url: str) -> Optional[Dict]:
+        """Récupère le texte d'une page (cache, puis revalidation par ETag, puis téléchargement)"""
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None and time.time() - cached['fetched_at'] < self.max_age:
+            return cached
+
+        headers = {}
+        if cached is not None and cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        try:
+            with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+                if response.status_code == 304 and cached is not None:
+                    page = dict(cached, fetched_at=time.time())
+                elif response.status_code != 200 or 'html' not in response.headers.get('Content-Type', 'text/html'):
+                    return None
+                else:
+                    page = self._extract(url, response)
+        except Exception as e:
+            print(f"Erreur de récupération {url[:60]}: {e}")
+            return None
+
+        if self.cache is not None:
+            self.cache.set(key, page)
+        return page
+
+    def _extract(self, url: str, response) -> Dict:
+        """
+        Lit la réponse en alimentant l'extracteur au fil de l'eau, jusqu'à
+        max_bytes ou dès que le texte de l'article est complet
+        """
+        with self._lock:
+            self.downloads += 1
+        # Sans charset déclaré, requests suppose ISO-8859-1: l'UTF-8 est plus probable
+        content_type = response.headers.get('Content-Type', '')
+        encoding = response.encoding if 'charset' in content_type.lower() else 'utf-8'
+        decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+        extractor = ArticleExtractor(self.max_chars)
+        received = 0
+        for chunk in response.iter_content(chunk_size=16384):
+            extractor.feed(decoder.decode(chunk[:self.max_bytes - received]))
+            received += len(chunk)
+            if received >= self.max_bytes or extractor.finished:
+                break
+        extractor.feed(decoder.decode(b'', final=True))
+
+        return {
+            'url': url,
+            'title': ' '.join(extractor.title.split()),
+            'text': extractor.text(),
+            'etag': response.headers.get('ETag'),
+            'fetched_at': time.time()
+        }
@@ -1,16 +1,73 @@
 """
 Module de vérification des faits avec recherche multi-sources
 """
-from typing import List, Dict
-from duckduckgo_search import DDGS
-import requests
-from bs4 import BeautifulSoup
-import re
+from typing import Callable, List, Dict, Optional, Tuple
+from src.cache import ResultCache
+from src.check_worthiness import CheckWorthinessScorer
+from src.claim_index import ClaimIndex, normalize_claim, quantities
+from src.config import Config
+from src.evidence import EvidenceFetcher
+from src.local_index import LocalIndexBackend
+from src.scoring import EvidenceScorer
+from src.search import SearchEngine, SearchQuery, domain_matches
 
 class FactChecker:
     """Vérificateur de faits avec recherche dans plusieurs sources"""
     
-    def __init__(self):
+    def __init__(self, engine: Optional[SearchEngine] = None, use_cache: bool = True,
+                 bypass_cache: bool = False, local_index: Optional[LocalIndexBackend] = None,
+                 offline: bool = False):
+        """
+        Initialise le vérificateur
+        
+        Args:
+            engine: Moteur de recherche concurrent (optionnel); ses requêtes
+                    utilisent son premier backend
+            use_cache: Active le cache persistant des recherches
+            bypass_cache: Ignore les entrées en cache (elles sont rafraîchies)
+            local_index: Index local des articles de fact-checking (défaut: LOCAL_INDEX_PATH)
+            offline: N'utiliser que l'index local, sans aucun appel réseau
+                     (les pages sources ne sont pas récupérées)
+        """
+        self.local_index = local_index or LocalIndexBackend(Config.LOCAL_INDEX_PATH)
+        if offline and engine is None:
+            engine = SearchEngine(backends={LocalIndexBackend.name: self.local_index})
+        
+        cache = None
+        if use_cache and engine is None:
+            cache = ResultCache(
+                Config.CACHE_DIR / "search.sqlite",
+                ttl=Config.SEARCH_CACHE_TTL,
+                max_entries=Config.SEARCH_CACHE_MAX_ENTRIES,
+                bypass=bypass_cache
+            )
+        self.engine = engine or SearchEngine(
+            concurrency={'duckduckgo': Config.SEARCH_CONCURRENCY},
+            timeout=Config.SEARCH_TIMEOUT,
+            cache=cache,
+            rates={'duckduckgo': Config.SEARCH_RATE},
+            max_rate=Config.SEARCH_MAX_RATE,
+            max_retries=Config.SEARCH_MAX_RETRIES,
+            budget=Config.SEARCH_BUDGET_PER_RUN or None
+        )
+        self.search_backend = next(iter(self.engine.backends))
+        
+        # Lecture des pages des meilleurs résultats de fact-checking
+        self.evidence_fetcher = None
+        if Config.EVIDENCE_TOP_N and not offline:
+            self.evidence_fetcher = EvidenceFetcher(
+                max_workers=Config.SEARCH_CONCURRENCY,
+                timeout=Config.SEARCH_TIMEOUT,
+                max_bytes=Config.EVIDENCE_MAX_BYTES,
+                cache=ResultCache(Config.CACHE_DIR / "evidence.sqlite",
+                                  max_entries=Config.EVIDENCE_CACHE_MAX_ENTRIES) if use_cache else None
+            )
+        self.claim_index = ClaimIndex()
+        self.check_worthiness = CheckWorthinessScorer(Config.CHECK_WORTHINESS_THRESHOLD)
+        self.scorer = EvidenceScorer()
+        self.last_dedup_stats = {}
+        self.last_filter_stats = {}
+        self.last_local_hits = 0
         self.fact_checking_sites = [
             'snopes.com',
             'factcheck.org',
@@ -19,192 +76,359 @@ class FactChecker:
             'lesdecodeurs.lemonde.fr',
             'factuel.afp.com'
         ]
+        self.trusted_news_sources = [
+            'reuters.com',
+            'apnews.com',
+            'lemonde.fr',
+            'franceinfo.fr',
+            'france24.com'
+        ]
     
-    def verify_claims(self, claims: List[str], language: str = "fr") -> Dict:
+    def verify_claims(self, claims: List[str], language: str = "fr", deduplicate: bool = True,
+                      prefilter: bool = True, search_budget: Optional[int] = None) -> Dict:
         """
         Vérifie une liste d'affirmations
         
+        Toutes les requêtes de toutes les affirmations sont lancées en même
+        temps via le moteur de recherche concurrent. Les affirmations
+        quasi identiques sont regroupées et un seul représentant par groupe
+        est vérifié ; son verdict est recopié sur tous les membres.
+        
+        Un filtre local estime la vérifiabilité de chaque affirmation: les
+        opinions ne sont pas recherchées (verdict 'non_verifiable') et les
+        autres sont vérifiées par priorité décroissante, dans la limite du
+        budget de recherches (verdict 'non_verifie' au-delà). Les affirmations
+        dont le titre d'un article de fact-checking de l'index local reprend
+        presque tous les termes sont résolues sans appel réseau
+        ('resolved_locally'); les autres articles locaux trouvés s'ajoutent
+        aux résultats de la recherche normale.
+        
         Args:
             claims: Liste des affirmations à vérifier
             language: Langue de recherche ('fr' pour français)
+            deduplicate: Regroupe les affirmations équivalentes avant la recherche
+            prefilter: Ignore les affirmations jugées non vérifiables
+            search_budget: Nombre maximum de requêtes de recherche (None = illimité)
             
         Returns:
-            Dictionnaire avec les résultats de vérification pour chaque affirmation
+            Dictionnaire avec les résultats de vérification pour chaque affirmation.
+            Chaque résultat porte sa priorité ('check_worthiness') et, s'il n'a pas
+            été recherché, 'checked' à False et la raison dans 'skip_reason'
         """
-        results = {}
+        claims = list(dict.fromkeys(claims))
+        if deduplicate:
+            clusters = self.claim_index.cluster(claims)
+        else:
+            clusters = {claim: [claim] for claim in claims}
         
-        for claim in claims:
-            print(f"Vérification de: {claim[:50]}...")
-            verification = self._verify_single_claim(claim, language)
-            results[claim] = verification
+        self.last_dedup_stats = {
+            'claims': len(claims),
+            'verified': len(clusters),
+            'dedup_ratio': 1 - len(clusters) / len(claims) if claims else 0.0
+        }
+        if len(clusters) < len(claims):
+            print(f"Déduplication: {len(claims)} affirmations -> {len(clusters)} à vérifier "
+                  f"({self.last_dedup_stats['dedup_ratio']:.0%} de recherches évitées)")
+        
+        priorities = {
+            representative: max(self.check_worthiness.score(member) for member in members)
+            for representative, members in clusters.items()
+        }
+        local, local_hits = {}, {}
+        if self.search_backend != LocalIndexBackend.name:
+            local, local_hits = self._resolve_locally([
+                claim for claim, priority in priorities.items()
+                if not prefilter or priority >= self.check_worthiness.threshold
+            ])
+        remaining = {claim: priority for claim, priority in priorities.items() if claim not in local}
+        selected, skipped = self._select_claims(remaining, language, prefilter, search_budget)
+        
+        verified = self._verify_representatives(selected, language, local_hits)
+        verified.update(local)
+        for claim, reason in skipped.items():
+            verified[claim] = self._skipped_result(claim, reason)
+        
+        results = {}
+        for representative, members in clusters.items():
+            for member in members:
+                result = dict(verified[representative], claim=member,
+                              check_worthiness=round(priorities[representative], 3))
+                if member != representative:
+                    result['representative'] = representative
+                results[member] = result
         
         return results
     
-    def _verify_single_claim(self, claim: str, language: str) -> Dict:
-        """Vérifie une seule affirmation"""
-        results = {
+    def _select_claims(self, priorities: Dict[str, float], language: str, prefilter: bool,
+                       search_budget: Optional[int]) -> Tuple[List[str], Dict[str, str]]:
+        """
+        Choisit les affirmations à rechercher, par priorité décroissante
+        
+        Returns:
+            (affirmations retenues, affirmations écartées -> raison)
+        """
+        selected = []
+        skipped = {}
+        spent = 0
+        for claim in sorted(priorities, key=priorities.get, reverse=True):
+            if prefilter and priorities[claim] < self.check_worthiness.threshold:
+                skipped[claim] = 'opinion'
+                continue
+            cost = sum(len(planner(claim, language)) for _, planner, _ in self._search_families())
+            if search_budget is not None and spent + cost > search_budget:
+                skipped[claim] = 'budget'
+                continue
+            selected.append(claim)
+            spent += cost
+        
+        self.last_filter_stats = {
+            'checked': len(selected),
+            'skipped_opinion': sum(1 for reason in skipped.values() if reason == 'opinion'),
+            'skipped_budget': sum(1 for reason in skipped.values() if reason == 'budget'),
+            'queries': spent
+        }
+        if skipped:
+            print(f"Filtre de vérifiabilité: {len(selected)} affirmation(s) recherchée(s), "
+                  f"{self.last_filter_stats['skipped_opinion']} opinion(s) et "
+                  f"{self.last_filter_stats['skipped_budget']} hors budget ignorée(s)")
+        return selected, skipped
+    
+    def _skipped_result(self, claim: str, reason: str) -> Dict:
+        """Résultat d'une affirmation non recherchée"""
+        return {
             'claim': claim,
             'sources': [],
             'fact_checking_results': [],
             'scientific_results': [],
             'news_results': [],
-            'credibility_score': 0,
-            'verdict': 'non_verifie'
+            'credibility_score': 50,
+            'verdict': {'opinion': 'non_verifiable', 'search_failed': 'echec_recherche'}.get(reason, 'non_verifie'),
+            'checked': False,
+            'skip_reason': reason
         }
+    
+    def _resolve_locally(self, claims: List[str]) -> Tuple[Dict, Dict[str, List[Dict]]]:
+        """
+        Cherche dans l'index local les articles de fact-checking des affirmations
+        
+        Seule une correspondance forte (titre reprenant au moins
+        LOCAL_MATCH_THRESHOLD des termes et tous les nombres de l'affirmation)
+        dispense de la recherche réseau: un article qui ne partage que le sujet
+        ne doit pas imposer son verdict. Les articles indexés depuis plus de
+        LOCAL_INDEX_TTL secondes sont ignorés.
+        
+        Returns:
+            (affirmations résolues -> résultat, autres affirmations -> articles
+            locaux à ajouter aux résultats de leur recherche)
+        """
+        sites = ' '.join(f"site:{site}" for site in self.fact_checking_sites)
+        resolved = {}
+        partial = {}
+        for claim in claims:
+            hits = self.local_index.text(f"{claim} {sites}", max_results=10,
+                                         max_age=Config.LOCAL_INDEX_TTL or None)
+            if not hits:
+                continue
+            fact_checking = [
+                {
+                    'title': hit['title'],
+                    'url': hit['href'],
+                    'snippet': hit['body'][:300],
+                    'evidence': hit['body'][:1500],
+                    'source': next((site for site in self.fact_checking_sites
+                                    if domain_matches(hit['href'], site)), 'local')
+                }
+                for hit in hits
+            ]
+            strong = [r for r in fact_checking
+                      if self._title_match(claim, r['title']) >= Config.LOCAL_MATCH_THRESHOLD]
+            if strong:
+                resolved[claim] = dict(self._build_result(claim, {'fact_checking_results': strong}),
+                                       resolved_locally=True)
+            else:
+                partial[claim] = fact_checking
+        self._score(list(resolved.values()))
+        
+        self.last_local_hits = len(resolved)
+        if resolved:
+            print(f"Index local: {len(resolved)}/{len(claims)} affirmation(s) résolue(s) sans recherche réseau")
+        return resolved, partial
+    
+    @staticmethod
+    def _title_match(claim: str, title: str) -> float:
+        """Part des termes de l'affirmation présents dans le titre d'un article (0 si un nombre diffère)"""
+        terms = set(normalize_claim(claim).split())
+        if len(terms) < 3 or not quantities(claim) <= quantities(title):
+            return 0.0
+        return len(terms & set(normalize_claim(title).split())) / len(terms)
+    
+    def _verify_representatives(self, claims: List[str], language: str,
+                                local_hits: Optional[Dict[str, List[Dict]]] = None) -> Dict:
+        """
+        Lance en une seule fois toutes les recherches des affirmations données
+        
+        Args:
+            claims: Affirmations à rechercher
+            language: Langue de recherche
+            local_hits: Articles de l'index local ajoutés aux résultats de
+                        fact-checking de chaque affirmation
+        """
+        queries = []
+        plan = []
+        
+        for claim in claims:
+            print(f"Vérification de: {claim[:50]}...")
+            for family, planner, limit in self._search_families():
+                family_queries = planner(claim, language)
+                plan.append((claim, family, len(queries), len(queries) + len(family_queries), limit))
+                queries.extend(family_queries)
+        
+        outcomes = self.engine.run(queries)
+        
+        found = {claim: {} for claim in claims}
+        failed = {claim: 0 for claim in claims}
+        total = {claim: 0 for claim in claims}
+        for claim, family, start, end, limit in plan:
+            family_results = [r for outcome in outcomes[start:end] if outcome is not None for r in outcome]
+            found[claim][family] = family_results[:limit] if limit else family_results
+            failed[claim] += sum(1 for outcome in outcomes[start:end] if outcome is None)
+            total[claim] += end - start
         
-        # Recherche dans les bases de fact-checking
-        fact_check_results = self._search_fact_checking(claim, language)
-        results['fact_checking_results'] = fact_check_results
+        for claim, hits in (local_hits or {}).items():
+            if claim in found:
+                urls = {r['url'] for r in found[claim].get('fact_checking_results', [])}
+                found[claim]['fact_checking_results'] = found[claim].get('fact_checking_results', []) + [
+                    hit for hit in hits if hit['url'] not in urls]
         
-        # Recherche scientifique
-        scientific_results = self._search_scientific(claim, language)
-        results['scientific_results'] = scientific_results
+        pages = self._attach_evidence([found[claim].get('fact_checking_results', []) for claim in claims])
         
-        # Recherche dans les sources d'actualité
-        news_results = self._search_news(claim, language)
-        results['news_results'] = news_results
+        # Les articles de fact-checking lus enrichissent l'index local (texte de la page, pas l'extrait)
+        if self.search_backend != LocalIndexBackend.name:
+            self.local_index.ingest(
+                dict(r, text=pages[r['url']]['text'])
+                for claim in claims for r in found[claim].get('fact_checking_results', [])
+                if pages.get(r['url']) and pages[r['url']]['text']
+            )
         
-        # Recherche web générale
-        web_results = self._search_web(claim, language)
-        results['sources'] = web_results
+        results = {claim: self._build_result(claim, found[claim], failed[claim], total[claim]) for claim in claims}
+        self._score([result for result in results.values() if result.get('checked', True)])
+        return results
+    
+    def _score(self, results: List[Dict]):
+        """Note en une seule passe (score de crédibilité, verdict, pertinence, position) les résultats donnés"""
+        for result, scored in zip(results, self.scorer.score_many(results)):
+            result.update(scored)
+    
+    def _attach_evidence(self, result_lists: List[List[Dict]], excerpt_chars: int = 1500) -> Dict:
+        """
+        Récupère en un seul lot les pages des premiers résultats de chaque liste
+        et ajoute à chaque résultat un extrait de son texte ('evidence')
         
-        # Calcul du score de crédibilité
-        results['credibility_score'] = self._calculate_credibility_score(results)
+        Returns:
+            Pages récupérées (URL -> page ou None)
+        """
+        if self.evidence_fetcher is None:
+            return {}
+        top = [result for results in result_lists for result in results[:Config.EVIDENCE_TOP_N]]
+        pages = self.evidence_fetcher.fetch_many([result['url'] for result in top])
+        for result in top:
+            page = pages.get(result['url'])
+            if page and page['text']:
+                result['evidence'] = page['text'][:excerpt_chars]
+        return pages
+    
+    def _verify_single_claim(self, claim: str, language: str) -> Dict:
+        """Vérifie une seule affirmation"""
+        return self._verify_representatives([claim], language)[claim]
+    
+    def _search_families(self) -> List[Tuple[str, Callable, Optional[int]]]:
+        """Familles de recherche: (clé du résultat, planificateur, limite de résultats)"""
+        return [
+            ('fact_checking_results', self._plan_fact_checking, 10),
+            ('scientific_results', self._plan_scientific, None),
+            ('news_results', self._plan_news, 15),
+            ('sources', self._plan_web, None),
+        ]
+    
+    def _build_result(self, claim: str, found: Dict[str, List[Dict]], failed: int = 0, total: int = 0) -> Dict:
+        """
+        Assemble le résultat de vérification d'une affirmation (noté ensuite par _score)
         
-        # Détermination du verdict
-        results['verdict'] = self._determine_verdict(results)
+        Si toutes ses recherches ont échoué, l'affirmation n'est pas notée
+        (verdict 'echec_recherche') plutôt que comptée comme sans source.
+        """
+        if total and failed == total:
+            return dict(self._skipped_result(claim, 'search_failed'),
+                        search_status='failed', failed_queries=failed)
         
+        results = {
+            'claim': claim,
+            'sources': found.get('sources', []),
+            'fact_checking_results': found.get('fact_checking_results', []),
+            'scientific_results': found.get('scientific_results', []),
+            'news_results': found.get('news_results', []),
+            'credibility_score': 50,
+            'verdict': 'non_verifie'
+        }
+        results['search_status'] = 'partial' if failed else 'ok'
+        results['failed_queries'] = failed
         return results
     
+    def _plan_sites(self, query: str, sites: List[str], per_site: int, limit: int, language: str,
+                    priority: int) -> List[SearchQuery]:
+        """
+        Requêtes restreintes à une liste de sites
+        
+        Si le backend l'accepte, une seule requête combinée ("site:a OR site:b")
+        demande directement les `limit` résultats qui seront conservés; sinon
+        une requête de `per_site` résultats est envoyée par site.
+        """
+        if getattr(self.engine.backends[self.search_backend], 'combined_sites', False):
+            sites_filter = ' OR '.join(f"site:{site}" for site in sites)
+            return [SearchQuery(f"{query} {sites_filter}", source=sites[0], max_results=limit, language=language,
+                                backend=self.search_backend, priority=priority, sites=tuple(sites))]
+        return [
+            SearchQuery(f"{query} site:{site}", source=site, max_results=per_site, language=language,
+                        backend=self.search_backend, priority=priority)
+            for site in sites
+        ]
+    
+    def _plan_fact_checking(self, query: str, language: str) -> List[SearchQuery]:
+        """Requêtes vers les sites de fact-checking"""
+        return self._plan_sites(query, self.fact_checking_sites, per_site=3, limit=10, language=language,
+                                priority=0)
+    
+    def _plan_scientific(self, query: str, language: str) -> List[SearchQuery]:
+        """Requêtes vers les bases de données scientifiques (Google Scholar)"""
+        return [SearchQuery(f"{query} site:scholar.google.com", source='Google Scholar', max_results=5,
+                            language=language, backend=self.search_backend, priority=2)]
+    
+    def _plan_news(self, query: str, language: str) -> List[SearchQuery]:
+        """Requêtes vers les sources d'actualité vérifiées"""
+        return self._plan_sites(query, self.trusted_news_sources, per_site=3, limit=15, language=language,
+                                priority=1)
+    
+    def _plan_web(self, query: str, language: str) -> List[SearchQuery]:
+        """Requête web générale"""
+        return [SearchQuery(query, source='Web', max_results=10, language=language,
+                            backend=self.search_backend, priority=3)]
+    
     def _search_fact_checking(self, query: str, language: str) -> List[Dict]:
         """Recherche dans les sites de fact-checking"""
-        results = []
-        
-        for site in self.fact_checking_sites:
-            search_query = f"{query} site:{site}"
-            try:
-                # Utiliser DuckDuckGo pour éviter les limites de Google
-                with DDGS() as ddgs:
-                    for result in ddgs.text(search_query, max_results=3):
-                        results.append({
-                            'title': result.get('title', ''),
-                            'url': result.get('href', ''),
-                            'snippet': result.get('body', ''),
-                            'source': site
-                        })
-            except Exception as e:
-                print(f"Erreur recherche fact-checking sur {site}: {e}")
-        
-        return results[:10]  # Limiter à 10 résultats
+        return self._search(self._plan_fact_checking(query, language))[:10]  # Limiter à 10 résultats
     
     def _search_scientific(self, query: str, language: str) -> List[Dict]:
         """Recherche dans les bases de données scientifiques"""
-        results = []
-        
-        # Recherche Google Scholar
-        scholar_query = f"{query} site:scholar.google.com"
-        try:
-            with DDGS() as ddgs:
-                for result in ddgs.text(scholar_query, max_results=5):
-                    results.append({
-                        'title': result.get('title', ''),
-                        'url': result.get('href', ''),
-                        'snippet': result.get('body', ''),
-                        'source': 'Google Scholar'
-                    })
-        except Exception as e:
-            print(f"Erreur recherche scientifique: {e}")
-        
-        return results
+        return self._search(self._plan_scientific(query, language))
     
     def _search_news(self, query: str, language: str) -> List[Dict]:
         """Recherche dans les sources d'actualité vérifiées"""
-        trusted_news_sources = [
-            'reuters.com',
-            'apnews.com',
-            'lemonde.fr',
-            'franceinfo.fr',
-            'france24.com'
-        ]
-        
-        results = []
-        
-        for source in trusted_news_sources:
-            search_query = f"{query} site:{source}"
-            try:
-                with DDGS() as ddgs:
-                    for result in ddgs.text(search_query, max_results=3):
-                        results.append({
-                            'title': result.get('title', ''),
-                            'url': result.get('href', ''),
-                            'snippet': result.get('body', ''),
-                            'source': source
-                        })
-            except Exception as e:
-                print(f"Erreur recherche actualités sur {source}: {e}")
-        
-        return results[:15]
+        return self._search(self._plan_news(query, language))[:15]
     
     def _search_web(self, query: str, language: str) -> List[Dict]:
         """Recherche web générale"""
-        results = []
-        
-        try:
-            with DDGS() as ddgs:
-                for result in ddgs.text(query, max_results=10):
-                    results.append({
-                        'title': result.get('title', ''),
-                        'url': result.get('href', ''),
-                        'snippet': result.get('body', ''),
-                        'source': 'Web'
-                    })
-        except Exception as e:
-            print(f"Erreur recherche web: {e}")
-        
-        return results
+        return self._search(self._plan_web(query, language))
     
-    def _calculate_credibility_score(self, results: Dict) -> int:
-        """Calcule un score de crédibilité de 0 à 100"""
-        score = 50  # Score de base
-        
-        # Bonus pour résultats de fact-checking
-        if results['fact_checking_results']:
-            score += min(len(results['fact_checking_results']) * 5, 20)
-        
-        # Bonus pour résultats scientifiques
-        if results['scientific_results']:
-            score += min(len(results['scientific_results']) * 3, 15)
-        
-        # Bonus pour sources d'actualité vérifiées
-        if results['news_results']:
-            score += min(len(results['news_results']) * 2, 15)
-        
-        return min(score, 100)
-    
-    def _determine_verdict(self, results: Dict) -> str:
-        """Détermine le verdict (vrai, faux, non_verifie, partiellement_vrai)"""
-        fact_checking = results['fact_checking_results']
-        scientific = results['scientific_results']
-        news = results['news_results']
-        
-        # Si des résultats de fact-checking existent, les prioriser
-        if fact_checking:
-            # Analyser les snippets pour détecter des mots-clés
-            snippets = ' '.join([r.get('snippet', '').lower() for r in fact_checking])
-            if any(word in snippets for word in ['false', 'faux', 'misleading', 'trompeur']):
-                return 'faux'
-            elif any(word in snippets for word in ['true', 'vrai', 'correct', 'correct']):
-                return 'vrai'
-            elif any(word in snippets for word in ['partially', 'partiellement', 'mixture']):
-                return 'partiellement_vrai'
-        
-        # Si beaucoup de sources scientifiques et d'actualité
-        if len(scientific) >= 3 and len(news) >= 3:
-            return 'probablement_vrai'
-        
-        # Si peu ou pas de sources
-        if len(results['sources']) < 3:
-            return 'non_verifie'
-        
-        return 'non_verifie'
-
+    def _search(self, queries: List[SearchQuery]) -> List[Dict]:
+        """Exécute un groupe de requêtes en parallèle et concatène les résultats"""
+        return [r for outcome in self.engine.run(queries) if outcome is not None for r in outcome]
@@ -0,0 +1,123 @@
+"""
+Index local hors ligne des articles de fact-checking (SQLite FTS5, classement BM25)
+"""
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from src.claim_index import normalize_claim
+from src.search import SearchBackend, domain_matches
+
+_SITE_FILTER = re.compile(r'\bsite:(\S+)')
+_OR_OPERATOR = re.compile(r'\bOR\b')
+
+
+class LocalIndexBackend(SearchBackend):
+    """
+    Backend de recherche sur un corpus local d'articles déjà récupérés
+
+    Utilisable comme backend de SearchEngine (y compris comme doublure de
+    test de toute la vérification des faits): il comprend les filtres
+    `site:domaine` et ne fait aucun appel réseau.
+    """
+
+    name = "local"
+    combined_sites = True
+
+    def __init__(self, db_path: Path, min_overlap: float = 0.5):
+        """
+        Ouvre (ou crée) l'index
+
+        Args:
+            db_path: Chemin du fichier SQLite
+            min_overlap: Part minimale des termes de la requête présents dans
+                         un article pour qu'il soit retourné
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.min_overlap = min_overlap
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS articles USING fts5("
+            "title, body, url UNINDEXED, source UNINDEXED, fetched_at UNINDEXED, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        self._conn.commit()
+
+    def ingest(self, articles: Iterable[Dict]) -> int:
+        """
+        Ajoute ou met à jour des articles (une URL n'est indexée qu'une fois)
+
+        Args:
+            articles: Résultats formatés ({'title', 'url', 'snippet', 'source'})
+                      ou bruts ({'title', 'href', 'body'}); le texte extrait de la
+                      page ('text'), s'il est fourni, est indexé à la place de l'extrait
+
+        Returns:
+            Nombre d'articles nouveaux
+        """
+        added = 0
+        now = time.time()
+        with self._lock:
+            for article in articles:
+                url = article.get('url') or article.get('href')
+                if not url:
+                    continue
+                existing = self._conn.execute("DELETE FROM articles WHERE url = ?", (url,)).rowcount
+                self._conn.execute(
+                    "INSERT INTO articles (title, body, url, source, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                    (article.get('title', ''),
+                     article.get('text') or article.get('snippet') or article.get('body', ''),
+                     url, article.get('source', ''), now)
+                )
+                added += not existing
+            self._conn.commit()
+        return added
+
+    def text(self, query: str, max_results: int, timeout: Optional[float] = None,
+             max_age: Optional[float] = None) -> List[Dict]:
+        """
+        Recherche BM25 dans l'index (voir SearchBackend.text)
+
+        Args:
+            max_age: Âge maximal en secondes des articles retournés (None = tous)
+        """
+        sites = _SITE_FILTER.findall(query)
+        terms = normalize_claim(_OR_OPERATOR.sub(' ', _SITE_FILTER.sub(' ', query))).split()
+        if not terms:
+            return []
+
+        match = ' OR '.join(f'"{term}"' for term in dict.fromkeys(terms))
+        min_fetched_at = time.time() - max_age if max_age else 0
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT title, body, url FROM articles WHERE articles MATCH ? AND fetched_at >= ? "
+                "ORDER BY bm25(articles) LIMIT ?",
+                (match, min_fetched_at, max(max_results * 10, 50))
+            ).fetchall()
+
+        results = []
+        for title, body, url in rows:
+            if sites and not any(domain_matches(url, site) for site in sites):
+                continue
+            words = set(normalize_claim(f"{title} {body}").split())
+            if sum(1 for term in set(terms) if term in words) / len(set(terms)) < self.min_overlap:
+                continue
+            results.append({'title': title, 'href': url, 'body': body})
+            if len(results) >= max_results:
+                break
+        return results
+
+    def __len__(self) -> int:
+        """Nombre d'articles indexés"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def close(self):
+        """Ferme la connexion SQLite"""
+        with self._lock:
+            self._conn.close()
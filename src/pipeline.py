@@ -0,0 +1,479 @@
+"""
+Pipeline de bout en bout: téléchargement → transcription → analyse LLM → vérification → stockage
+
+Les étapes tournent en parallèle et sont reliées par des files bornées: chaque
+vidéo passe à l'étape suivante dès que la précédente l'a traitée.
+
+Usage:
+    python -m src.pipeline --url https://www.tiktok.com/@user/video/123
+    python -m src.pipeline --user username --max-videos 5 --provider local
+    python -m src.pipeline --user username --max-videos 20 --incremental --stream
+"""
+import argparse
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from src.account_manifest import AccountManifest
+from src.analyzer import LLMAnalyzer, analysis_claims, estimate_tokens
+from src.config import Config
+from src.downloader import TikTokDownloader
+from src.fact_checker import FactChecker
+from src.storage import ResultStorage
+from src.transcriber import AudioTranscriber
+
+# Marqueur de fin de flux
+_DONE = object()
+
+
+def build_video_result(video_path: Path, transcription: Dict, llm_analysis: Dict,
+                       metadata: Optional[Dict], fact_check_results: Dict) -> Dict:
+    """
+    Compile le résultat d'une vidéo
+
+    Args:
+        video_path: Chemin du fichier vidéo
+        transcription: Transcription Whisper
+        llm_analysis: Analyse LLM
+        metadata: Métadonnées de la vidéo
+        fact_check_results: Résultats de vérification par affirmation
+
+    Returns:
+        Dictionnaire du résultat de la vidéo (format de ResultStorage)
+    """
+    video_claims = analysis_claims(llm_analysis)
+
+    video_fact_check = {}
+    for claim in video_claims:
+        if claim in fact_check_results:
+            video_fact_check[claim] = fact_check_results[claim]
+
+    # Les affirmations non recherchées (opinions, hors budget) ne comptent pas dans le score
+    checked = [r for r in video_fact_check.values() if r.get('checked', True)]
+    if checked:
+        avg_score = sum(r['credibility_score'] for r in checked) / len(checked)
+        verdicts = [r['verdict'] for r in checked]
+        main_verdict = max(set(verdicts), key=verdicts.count) if verdicts else 'non_verifie'
+    else:
+        avg_score = 50
+        main_verdict = 'non_verifie'
+
+    all_sources = []
+    for claim_result in video_fact_check.values():
+        all_sources.extend(claim_result.get('sources', []))
+        all_sources.extend(claim_result.get('fact_checking_results', []))
+        all_sources.extend(claim_result.get('scientific_results', []))
+        all_sources.extend(claim_result.get('news_results', []))
+
+    seen_urls = set()
+    unique_sources = []
+    for source in all_sources:
+        url = source.get('url', '')
+        if url and url not in seen_urls:
+            seen_urls.add(url)
+            unique_sources.append(source)
+
+    return {
+        'title': metadata.get('title', video_path.stem) if metadata else video_path.stem,
+        'metadata': metadata if metadata else {},
+        'transcription': transcription,
+        'llm_analysis': llm_analysis,
+        'fact_checking': {
+            'credibility_score': int(avg_score),
+            'verdict': main_verdict,
+            'claims': video_fact_check,
+            'sources': unique_sources[:20]
+        }
+    }
+
+
+def summarize_video(video: Dict) -> Dict:
+    """
+    Résumé léger d'un résultat de vidéo (sans transcription, analyse ni sources)
+
+    Args:
+        video: Résultat de la vidéo (voir build_video_result)
+
+    Returns:
+        Dictionnaire avec 'title', 'metadata' et 'fact_checking' (score,
+        verdict et verdict de chaque affirmation)
+    """
+    fact_checking = video['fact_checking']
+    return {
+        'title': video['title'],
+        'metadata': video['metadata'],
+        'fact_checking': {
+            'credibility_score': fact_checking['credibility_score'],
+            'verdict': fact_checking['verdict'],
+            'claims': {
+                claim: {'credibility_score': result.get('credibility_score'), 'verdict': result.get('verdict')}
+                for claim, result in fact_checking['claims'].items()
+            }
+        }
+    }
+
+
+def compute_statistics(videos: List[Dict]) -> Dict:
+    """
+    Calcule les statistiques globales d'un ensemble de vidéos
+
+    Args:
+        videos: Résultats par vidéo (voir build_video_result)
+
+    Returns:
+        Dictionnaire des statistiques
+    """
+    all_scores = [v['fact_checking']['credibility_score'] for v in videos]
+    all_verdicts = [v['fact_checking']['verdict'] for v in videos]
+
+    return {
+        'average_credibility': sum(all_scores) / len(all_scores) if all_scores else 0,
+        'verified_count': sum(1 for v in all_verdicts if v != 'non_verifie'),
+        'unverified_count': sum(1 for v in all_verdicts if v == 'non_verifie'),
+        'verdict_distribution': {v: all_verdicts.count(v) for v in set(all_verdicts)}
+    }
+
+
+class Pipeline:
+    """Enchaîne les étapes d'analyse en flux, une file bornée entre chaque étape"""
+
+    def __init__(self, downloader: Optional[TikTokDownloader] = None,
+                 transcriber: Optional[AudioTranscriber] = None,
+                 analyzer: Optional[LLMAnalyzer] = None,
+                 fact_checker: Optional[FactChecker] = None,
+                 storage: Optional[ResultStorage] = None,
+                 language: str = "fr", queue_size: int = 4,
+                 analysis_workers: int = 2, fact_check_workers: int = 2,
+                 max_chunk_tokens: int = 1500):
+        """
+        Initialise le pipeline
+
+        Args:
+            downloader: Téléchargeur (défaut: TikTokDownloader())
+            transcriber: Transcripteur (défaut: AudioTranscriber())
+            analyzer: Analyseur LLM (défaut: provider de la configuration)
+            fact_checker: Vérificateur de faits (défaut: FactChecker())
+            storage: Stockage des résultats (défaut: ResultStorage())
+            language: Code langue
+            queue_size: Taille maximale de chaque file entre deux étapes
+            analysis_workers: Nombre d'analyses LLM simultanées
+            fact_check_workers: Nombre de vidéos vérifiées simultanément
+            max_chunk_tokens: Au-delà, la transcription est analysée par fenêtres
+        """
+        self.downloader = downloader or TikTokDownloader()
+        self.transcriber = transcriber or AudioTranscriber()
+        self.analyzer = analyzer or LLMAnalyzer()
+        self.fact_checker = fact_checker or FactChecker()
+        self.storage = storage or ResultStorage()
+        self.language = language
+        self.queue_size = queue_size
+        self.analysis_workers = analysis_workers
+        self.fact_check_workers = fact_check_workers
+        self.max_chunk_tokens = max_chunk_tokens
+        self.timings: Dict[str, float] = {}
+        self._timings_lock = threading.Lock()
+        # Manifeste du dernier compte traité en mode incrémental
+        self.manifest: Optional[AccountManifest] = None
+
+    def run_video(self, url: str, stream_prefix: Optional[str] = None) -> Dict:
+        """
+        Analyse une vidéo spécifique
+
+        Args:
+            url: URL de la vidéo TikTok
+            stream_prefix: Sauvegarde au fil de l'eau sous ce préfixe (voir run)
+
+        Returns:
+            Résultats compilés (format de ResultStorage)
+        """
+        def source():
+            record = self.downloader.fetch_video(url)
+            yield record['path'], record['metadata']
+
+        return self.run(source(), source_label=url, stream_prefix=stream_prefix)
+
+    def run_user(self, username: str, max_videos: int = 5, incremental: bool = False,
+                 stream_prefix: Optional[str] = None) -> Dict:
+        """
+        Analyse les vidéos récentes d'un utilisateur
+
+        En mode incrémental, seules les vidéos absentes du manifeste du compte
+        ou dont une étape a échoué sont traitées; leurs résultats s'ajoutent
+        aux statistiques cumulées du compte ('account_statistics').
+
+        Args:
+            username: Nom d'utilisateur TikTok (sans @)
+            max_videos: Nombre maximum de vidéos (les plus récentes)
+            incremental: Ne traite que les vidéos nouvelles ou en échec
+            stream_prefix: Sauvegarde au fil de l'eau sous ce préfixe (voir run)
+
+        Returns:
+            Résultats compilés (format de ResultStorage)
+        """
+        if not incremental:
+            def source():
+                for record in self.downloader.iter_user_videos(username, max_videos):
+                    yield record['path'], record['metadata']
+
+            return self.run(source(), source_label=f"@{username}", stream_prefix=stream_prefix)
+
+        self.manifest = manifest = AccountManifest.for_account(username)
+        try:
+            entries = self.downloader.list_user_videos(username, max_videos)
+        except Exception as e:
+            print(f"Erreur lors de la liste des vidéos de @{username}: {e}")
+            entries = []
+        pending = manifest.pending(entries)
+        print(f"Mode incrémental @{username}: {len(pending)} vidéo(s) nouvelle(s) ou en échec "
+              f"sur {len(entries)}")
+
+        def pending_source():
+            for record in self.downloader.iter_user_videos(username, max_videos, entries=pending):
+                yield record['path'], dict(record['metadata'], id=record['id'])
+
+        results = self.run(pending_source(), source_label=f"@{username}", manifest=manifest,
+                           stream_prefix=stream_prefix)
+        for entry in pending:
+            if 'download' not in manifest.videos.get(entry['id'], {}).get('stages', {}):
+                manifest.record_failure(entry['id'], 'download', "téléchargement impossible")
+        results['account_statistics'] = manifest.statistics()
+        return results
+
+    def run(self, videos, source_label: str = "", manifest: Optional[AccountManifest] = None,
+            stream_prefix: Optional[str] = None) -> Dict:
+        """
+        Fait passer un flux de vidéos à travers toutes les étapes
+
+        Avec stream_prefix, chaque vidéo terminée est écrite aussitôt (JSON
+        Lines, Markdown et base de résultats) puis seul son résumé est gardé
+        en mémoire; les chemins des fichiers sont dans results['files'].
+
+        Args:
+            videos: Itérable de tuples (chemin de la vidéo, métadonnées)
+            source_label: Description de la source (URL ou @utilisateur)
+            manifest: Manifeste du compte, mis à jour à chaque étape (optionnel)
+            stream_prefix: Préfixe des fichiers de la sauvegarde au fil de l'eau (optionnel)
+
+        Returns:
+            Résultats compilés (format de ResultStorage)
+        """
+        metadata = {
+            'source': source_label,
+            'analysis_date': datetime.now().isoformat(),
+            'llm_provider': self.analyzer.provider,
+            'language': self.language
+        }
+        stream = self.storage.open_stream(metadata, stream_prefix) if stream_prefix else None
+
+        downloaded = queue.Queue(self.queue_size)
+        transcribed = queue.Queue(self.queue_size)
+        analyzed = queue.Queue(self.queue_size)
+        checked = queue.Queue(self.queue_size)
+
+        def download_stage():
+            try:
+                for index, (video_path, metadata) in enumerate(videos):
+                    print(f"📥 Vidéo prête: {video_path.name}")
+                    if manifest is not None and _video_id(metadata):
+                        manifest.record_stage(_video_id(metadata), 'download')
+                    downloaded.put({'index': index, 'video_path': video_path, 'metadata': metadata})
+            except Exception as e:
+                print(f"Erreur lors du téléchargement: {e}")
+            finally:
+                downloaded.put(_DONE)
+
+        started = time.perf_counter()
+        threads = [
+            threading.Thread(target=self._timed, args=('download', download_stage), daemon=True),
+            *self._start_stage('transcription', self._transcribe, downloaded, transcribed, 1, manifest),
+            *self._start_stage('analyse', self._analyze, transcribed, analyzed, self.analysis_workers, manifest),
+            *self._start_stage('verification', self._fact_check, analyzed, checked, self.fact_check_workers,
+                               manifest),
+        ]
+        threads[0].start()
+
+        videos_done = []
+        while True:
+            item = checked.get()
+            if item is _DONE:
+                break
+            print(f"✅ Vidéo {item['index'] + 1} terminée: {item['video_path'].name}")
+            video = build_video_result(item['video_path'], item['transcription'], item['llm_analysis'],
+                                       item['metadata'], item['fact_check_results'])
+            if stream is not None:
+                stream.write_video(video)
+                video = summarize_video(video)
+            if manifest is not None and _video_id(item['metadata']):
+                manifest.record_result(_video_id(item['metadata']), video)
+            videos_done.append((item['index'], video))
+        for thread in threads:
+            thread.join()
+        self.timings['total'] = time.perf_counter() - started
+
+        videos_done.sort(key=lambda done: done[0])
+        results = {
+            'metadata': dict(metadata, video_count=len(videos_done)),
+            'videos': [video for _, video in videos_done]
+        }
+        results['statistics'] = compute_statistics(results['videos'])
+        if stream is not None:
+            extra = {'account_statistics': manifest.statistics()} if manifest is not None else None
+            results['files'] = stream.close(extra)
+        return results
+
+    def _transcribe(self, item: Dict) -> Dict:
+        """Étape de transcription"""
+        transcription = self.transcriber.transcribe_video(item['video_path'], language=self.language)
+        transcription['video_path'] = str(item['video_path'])
+        item['transcription'] = transcription
+        return item
+
+    def _analyze(self, item: Dict) -> Dict:
+        """Étape d'analyse LLM (par fenêtres pour les longues transcriptions)"""
+        transcription = item['transcription']
+        if estimate_tokens(transcription['text']) > self.max_chunk_tokens and transcription.get('segments'):
+            item['llm_analysis'] = self.analyzer.analyze_segments(
+                transcription['segments'],
+                video_metadata=item['metadata'],
+                max_chunk_tokens=self.max_chunk_tokens
+            )
+        else:
+            item['llm_analysis'] = self.analyzer.analyze_content(
+                transcription=transcription['text'],
+                video_metadata=item['metadata']
+            )
+        # JSON invalide, échec du provider ou de toutes les fenêtres
+        if item['llm_analysis'].get('error'):
+            item['error'] = f"analyse LLM: {item['llm_analysis']['error']}"
+        return item
+
+    def _fact_check(self, item: Dict) -> Dict:
+        """Étape d'extraction des affirmations et de vérification"""
+        claims = analysis_claims(item['llm_analysis'])
+        item['fact_check_results'] = self.fact_checker.verify_claims(
+            claims,
+            language=self.language,
+            search_budget=Config.SEARCH_BUDGET_PER_VIDEO or None
+        )
+        return item
+
+    def _start_stage(self, name: str, func: Callable[[Dict], Dict], inbox: queue.Queue,
+                     outbox: queue.Queue, workers: int,
+                     manifest: Optional[AccountManifest] = None) -> List[threading.Thread]:
+        """
+        Démarre les threads d'une étape; le dernier à finir propage la fin du flux
+
+        Une vidéo dont l'étape lève une exception ou rend un élément portant
+        une clé 'error' n'est pas transmise à l'étape suivante. Si un
+        manifeste est donné, la fin ou l'échec de l'étape y est enregistré
+        pour chaque vidéo (une vidéo en échec sera retraitée).
+        """
+        remaining = [workers]
+        lock = threading.Lock()
+
+        def worker():
+            while True:
+                item = inbox.get()
+                if item is _DONE:
+                    # Réveiller les autres threads de l'étape
+                    inbox.put(_DONE)
+                    break
+                video_id = _video_id(item['metadata']) if manifest is not None else None
+                try:
+                    result = self._timed(name, func, item)
+                    # Une étape peut aussi échouer sans exception (clé 'error' du résultat)
+                    if result.get('error'):
+                        raise RuntimeError(result['error'])
+                except Exception as e:
+                    print(f"Erreur à l'étape {name} pour {item['video_path'].name}: {e}")
+                    if video_id:
+                        manifest.record_failure(video_id, name, e)
+                    continue
+                if video_id:
+                    manifest.record_stage(video_id, name)
+                outbox.put(result)
+            with lock:
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    outbox.put(_DONE)
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def _timed(self, name: str, func: Callable, *args):
+        """Exécute func en cumulant son temps d'exécution par étape"""
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            with self._timings_lock:
+                self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+
+def _video_id(metadata: Optional[Dict]) -> str:
+    """Identifiant TikTok de la vidéo ('' s'il est inconnu)"""
+    return (metadata or {}).get('id', '')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyse de crédibilité de vidéos TikTok")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="URL d'une vidéo TikTok")
+    target.add_argument("--user", help="Nom d'utilisateur TikTok (sans @)")
+    parser.add_argument("--max-videos", type=int, default=5, help="Nombre maximum de vidéos (mode utilisateur)")
+    parser.add_argument("--provider", default=None, help="Provider LLM: openai, anthropic ou local")
+    parser.add_argument("--model-size", default="base", help="Taille du modèle Whisper")
+    parser.add_argument("--language", default="fr", help="Code langue")
+    parser.add_argument("--audio-only", action="store_true",
+                        help="Ne télécharger que l'audio (16 kHz mono), suffisant pour la transcription")
+    parser.add_argument("--queue-size", type=int, default=4, help="Taille des files entre étapes")
+    parser.add_argument("--structured", action="store_true",
+                        help="Analyse LLM en sortie JSON validée (affirmations, score, ton, sources)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Mode utilisateur: ne traiter que les vidéos nouvelles ou en échec")
+    parser.add_argument("--stream", action="store_true",
+                        help="Écrire chaque vidéo dès qu'elle est terminée (JSON Lines + Markdown)")
+    args = parser.parse_args()
+
+    pipeline = Pipeline(
+        downloader=TikTokDownloader(audio_only=args.audio_only),
+        transcriber=AudioTranscriber(model_size=args.model_size),
+        analyzer=LLMAnalyzer(provider=args.provider, structured=args.structured),
+        language=args.language,
+        queue_size=args.queue_size
+    )
+    prefix = "video" if args.url else args.user
+    stream_prefix = prefix if args.stream else None
+    if args.url:
+        results = pipeline.run_video(args.url, stream_prefix=stream_prefix)
+    else:
+        results = pipeline.run_user(args.user, args.max_videos, incremental=args.incremental,
+                                    stream_prefix=stream_prefix)
+
+    if args.incremental and args.user:
+        account = results['account_statistics']
+        print(f"\n📈 @{args.user}: {account['video_count']} vidéo(s) analysée(s), "
+              f"score moyen cumulé {account['average_credibility']:.1f}%")
+        if not results['videos'] and not args.stream:
+            print("Aucune nouvelle vidéo à analyser")
+            return
+
+    if args.stream:
+        saved_files = results['files']
+    else:
+        saved_files = pipeline.storage.save_results(results, filename_prefix=prefix)
+    if args.incremental and args.user:
+        pipeline.manifest.record_run([_video_id(video['metadata']) for video in results['videos']], saved_files)
+    print(f"\n📊 Score moyen: {results['statistics']['average_credibility']:.1f}%")
+    print("⏱️ Temps par étape: " + ", ".join(f"{k}={v:.1f}s" for k, v in pipeline.timings.items()))
+    print(f"✅ Résultats sauvegardés:\n   JSON: {saved_files['json']}\n   Markdown: {saved_files['markdown']}")
+    if 'database' in saved_files:
+        print(f"   Base: {saved_files['database']}")
+
+
+if __name__ == "__main__":
+    main()
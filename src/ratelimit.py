@@ -0,0 +1,97 @@
+"""
+Limiteur de débit à seau de jetons (token bucket), utilisable en threads et en asyncio
+"""
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """Seau de jetons: au plus `rate` requêtes par seconde, avec une rafale de `burst`"""
+
+    def __init__(self, rate: Optional[float], burst: Optional[int] = None):
+        """
+        Initialise le limiteur
+
+        Args:
+            rate: Requêtes par seconde (None ou 0 = illimité)
+            burst: Taille du seau (défaut: max(1, rate))
+        """
+        self.rate = rate or None
+        self.burst = burst or max(1, int(rate or 1))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: Optional[float], burst: Optional[int] = None) -> 'RateLimiter':
+        """Crée un limiteur à partir d'un nombre de requêtes par minute"""
+        return cls(requests_per_minute / 60 if requests_per_minute else None, burst)
+
+    def _reserve(self) -> float:
+        """Prend un jeton et retourne le temps d'attente nécessaire avant de l'utiliser"""
+        if self.rate is None:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        """Bloque jusqu'à ce qu'une requête soit autorisée"""
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        """Attend (sans bloquer la boucle) qu'une requête soit autorisée"""
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """
+    Débit ajusté à ce que le service accepte (AIMD): le débit augmente
+    d'environ `increase` requêtes/s par seconde de succès et est divisé par
+    deux à chaque refus (429)
+    """
+
+    def __init__(self, rate: float, max_rate: float, min_rate: float = 0.1, increase: float = 0.5,
+                 burst: Optional[int] = None):
+        """
+        Initialise le limiteur
+
+        Args:
+            rate: Débit initial en requêtes par seconde
+            max_rate: Débit maximum
+            min_rate: Débit minimum après des refus successifs
+            increase: Augmentation du débit par seconde sans refus
+            burst: Taille du seau (défaut: max(1, rate))
+        """
+        super().__init__(rate, burst)
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.increase = increase
+        self._last_throttle = 0.0
+
+    def on_success(self):
+        """Une requête a abouti: augmente le débit"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def on_throttle(self):
+        """Le service a refusé une requête: divise le débit et vide le seau"""
+        with self._lock:
+            now = time.monotonic()
+            # Les refus simultanés d'une même rafale ne comptent qu'une fois
+            if now - self._last_throttle < 1 / self.rate:
+                return
+            self._last_throttle = now
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = 0.0
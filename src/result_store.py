@@ -0,0 +1,306 @@
+"""
+Base de résultats interrogeable (SQLite indexé, export Parquet)
+"""
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY,
+    source TEXT, analysis_date TEXT, llm_provider TEXT, language TEXT, video_count INTEGER
+);
+CREATE TABLE IF NOT EXISTS videos (
+    id INTEGER PRIMARY KEY,
+    analysis_id INTEGER NOT NULL REFERENCES analyses(id),
+    video_id TEXT, account TEXT, title TEXT, upload_date TEXT, analyzed_at TEXT,
+    duration REAL, view_count INTEGER, like_count INTEGER,
+    credibility_score INTEGER, verdict TEXT, claim_count INTEGER, llm_provider TEXT
+);
+CREATE TABLE IF NOT EXISTS claims (
+    id INTEGER PRIMARY KEY,
+    video_row INTEGER NOT NULL REFERENCES videos(id),
+    claim TEXT, credibility_score INTEGER, verdict TEXT, checked INTEGER, skip_reason TEXT, stance REAL
+);
+CREATE TABLE IF NOT EXISTS sources (
+    claim_row INTEGER NOT NULL REFERENCES claims(id),
+    family TEXT, title TEXT, url TEXT, source TEXT
+);
+CREATE TABLE IF NOT EXISTS segments (
+    video_row INTEGER NOT NULL REFERENCES videos(id),
+    start REAL, end REAL, text TEXT
+);
+CREATE TABLE IF NOT EXISTS texts (
+    video_row INTEGER PRIMARY KEY REFERENCES videos(id),
+    transcription BLOB, analysis BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_videos_account_date ON videos(account, analyzed_at, verdict, credibility_score);
+CREATE INDEX IF NOT EXISTS idx_videos_date ON videos(analyzed_at, verdict, credibility_score);
+CREATE INDEX IF NOT EXISTS idx_videos_verdict ON videos(verdict, analyzed_at);
+CREATE INDEX IF NOT EXISTS idx_videos_video_id ON videos(video_id);
+CREATE INDEX IF NOT EXISTS idx_claims_video ON claims(video_row);
+CREATE INDEX IF NOT EXISTS idx_claims_verdict ON claims(verdict);
+CREATE INDEX IF NOT EXISTS idx_sources_claim ON sources(claim_row);
+CREATE INDEX IF NOT EXISTS idx_segments_video ON segments(video_row);
+"""
+
+# Familles de résultats de recherche enregistrées comme sources d'une affirmation
+SOURCE_FAMILIES = ('fact_checking_results', 'scientific_results', 'news_results', 'sources')
+
+# Tables exportées en Parquet (les textes compressés restent dans la base)
+EXPORT_TABLES = ('analyses', 'videos', 'claims', 'sources', 'segments')
+
+
+def _compress(text: str) -> bytes:
+    """Texte compressé (zlib)"""
+    return zlib.compress(text.encode('utf-8'))
+
+
+def _decompress(blob: Optional[bytes]) -> str:
+    """Texte d'un bloc compressé ('' si vide)"""
+    return zlib.decompress(blob).decode('utf-8') if blob else ''
+
+
+class ResultStore:
+    """
+    Stockage des résultats d'analyse dans des tables SQLite indexées
+
+    Les écritures ne font qu'ajouter des lignes: une vidéo réanalysée
+    apparaît une seconde fois avec sa nouvelle date. Les colonnes
+    interrogées (compte, date, score, verdict) sont séparées des textes
+    volumineux (transcription, analyse LLM), stockés compressés dans une
+    table à part et lus seulement à la demande.
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Ouvre (ou crée) la base
+
+        Args:
+            db_path: Chemin du fichier SQLite
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def append(self, results: Dict) -> int:
+        """
+        Ajoute les résultats d'une analyse (format de ResultStorage)
+
+        Args:
+            results: Dictionnaire avec 'metadata' et 'videos'
+
+        Returns:
+            Identifiant de l'analyse dans la base
+        """
+        metadata = results.get('metadata', {})
+        videos = results.get('videos', [])
+        with self._lock, self._conn:
+            analysis_id = self._insert_analysis(metadata, len(videos))
+            for video in videos:
+                self._insert_video(analysis_id, video)
+        return analysis_id
+
+    def start_analysis(self, metadata: Dict) -> int:
+        """Crée une analyse dont les vidéos seront ajoutées une à une (append_video)"""
+        with self._lock, self._conn:
+            return self._insert_analysis(metadata, 0)
+
+    def append_video(self, analysis_id: int, video: Dict):
+        """Ajoute une vidéo terminée à une analyse (voir start_analysis)"""
+        with self._lock, self._conn:
+            self._insert_video(analysis_id, video)
+
+    def finish_analysis(self, analysis_id: int, video_count: int):
+        """Enregistre le nombre final de vidéos d'une analyse"""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE analyses SET video_count = ? WHERE id = ?", (video_count, analysis_id))
+
+    def _insert_analysis(self, metadata: Dict, video_count: int) -> int:
+        """Insère la ligne d'une analyse"""
+        return self._conn.execute(
+            "INSERT INTO analyses (source, analysis_date, llm_provider, language, video_count) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (metadata.get('source', ''), metadata.get('analysis_date') or datetime.now().isoformat(),
+             metadata.get('llm_provider', ''), metadata.get('language', ''), video_count)
+        ).lastrowid
+
+    def _insert_video(self, analysis_id: int, video: Dict):
+        """Insère une vidéo, ses affirmations, leurs sources, ses segments et ses textes"""
+        source, analysis_date, provider = self._conn.execute(
+            "SELECT source, analysis_date, llm_provider FROM analyses WHERE id = ?", (analysis_id,)
+        ).fetchone()
+        meta = video.get('metadata', {})
+        fact_checking = video.get('fact_checking', {})
+        claims = fact_checking.get('claims', {})
+        # Le compte est celui de l'analyse (@utilisateur) ou, à défaut, l'auteur de la vidéo
+        account = source[1:] if source.startswith('@') else meta.get('uploader', '')
+        video_row = self._conn.execute(
+            "INSERT INTO videos (analysis_id, video_id, account, title, upload_date, analyzed_at, duration, "
+            "view_count, like_count, credibility_score, verdict, claim_count, llm_provider) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (analysis_id, meta.get('id', ''), account, video.get('title', ''), meta.get('upload_date', ''),
+             analysis_date, meta.get('duration') or 0, meta.get('view_count') or 0, meta.get('like_count') or 0,
+             fact_checking.get('credibility_score'), fact_checking.get('verdict'), len(claims),
+             video.get('llm_analysis', {}).get('provider', provider))
+        ).lastrowid
+
+        for claim, result in claims.items():
+            claim_row = self._conn.execute(
+                "INSERT INTO claims (video_row, claim, credibility_score, verdict, checked, skip_reason, stance) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (video_row, claim, result.get('credibility_score'), result.get('verdict'),
+                 int(result.get('checked', True)), result.get('skip_reason'), result.get('stance'))
+            ).lastrowid
+            self._conn.executemany(
+                "INSERT INTO sources (claim_row, family, title, url, source) VALUES (?, ?, ?, ?, ?)",
+                [(claim_row, family, item.get('title', ''), item.get('url', ''), item.get('source', ''))
+                 for family in SOURCE_FAMILIES for item in result.get(family, [])]
+            )
+
+        transcription = video.get('transcription', {})
+        self._conn.executemany(
+            "INSERT INTO segments (video_row, start, end, text) VALUES (?, ?, ?, ?)",
+            [(video_row, segment.get('start'), segment.get('end'), segment.get('text', ''))
+             for segment in transcription.get('segments', [])]
+        )
+        self._conn.execute(
+            "INSERT INTO texts (video_row, transcription, analysis) VALUES (?, ?, ?)",
+            (video_row, _compress(transcription.get('text', '')),
+             _compress(video.get('llm_analysis', {}).get('analysis', '')))
+        )
+
+    def videos(self, account: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+               verdict: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Vidéos analysées, les plus récentes d'abord (sans les textes volumineux)
+
+        Args:
+            account: Compte (sans @)
+            since: Date ISO de début incluse (ex: '2024-05-01')
+            until: Date ISO de fin exclue
+            verdict: Verdict de la vidéo
+            limit: Nombre maximum de lignes
+
+        Returns:
+            Liste de dictionnaires (colonnes de la table videos, 'id' sert à load_text)
+        """
+        where, params = self._filters(account, since, until, verdict)
+        sql = f"SELECT * FROM videos{where} ORDER BY analyzed_at DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._fetch(sql, params)
+
+    def claims(self, account: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+               verdict: Optional[str] = None) -> List[Dict]:
+        """Affirmations vérifiées, filtrées par compte, période et verdict de l'affirmation"""
+        where, params = self._filters(account, since, until, None, prefix='v.')
+        if verdict:
+            where += (" AND" if where else " WHERE") + " c.verdict = ?"
+            params.append(verdict)
+        return self._fetch(
+            "SELECT c.*, v.account, v.video_id, v.analyzed_at FROM claims c "
+            f"JOIN videos v ON v.id = c.video_row{where} ORDER BY v.analyzed_at DESC",
+            params
+        )
+
+    def statistics(self, account: Optional[str] = None, since: Optional[str] = None,
+                   until: Optional[str] = None) -> Dict:
+        """
+        Statistiques agrégées en SQL (même format que pipeline.compute_statistics)
+
+        Args:
+            account: Compte (sans @), tous les comptes si None
+            since: Date ISO de début incluse
+            until: Date ISO de fin exclue
+
+        Returns:
+            Dictionnaire des statistiques, avec 'video_count'
+        """
+        where, params = self._filters(account, since, until, None)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT verdict, COUNT(*), SUM(credibility_score) FROM videos{where} GROUP BY verdict", params
+            ).fetchall()
+        count = sum(row[1] for row in rows)
+        return {
+            'average_credibility': sum(row[2] or 0 for row in rows) / count if count else 0,
+            'video_count': count,
+            'verified_count': sum(row[1] for row in rows if row[0] != 'non_verifie'),
+            'unverified_count': sum(row[1] for row in rows if row[0] == 'non_verifie'),
+            'verdict_distribution': {row[0]: row[1] for row in rows}
+        }
+
+    def load_text(self, video_row: int) -> Dict[str, str]:
+        """Textes volumineux d'une vidéo: {'transcription', 'analysis'}"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT transcription, analysis FROM texts WHERE video_row = ?", (video_row,)
+            ).fetchone()
+        if row is None:
+            return {'transcription': '', 'analysis': ''}
+        return {'transcription': _decompress(row[0]), 'analysis': _decompress(row[1])}
+
+    def segments(self, video_row: int) -> List[Dict]:
+        """Segments de transcription d'une vidéo"""
+        return self._fetch("SELECT start, end, text FROM segments WHERE video_row = ? ORDER BY start", [video_row])
+
+    def sources(self, claim_row: int) -> List[Dict]:
+        """Sources trouvées pour une affirmation"""
+        return self._fetch("SELECT family, title, url, source FROM sources WHERE claim_row = ?", [claim_row])
+
+    def export_parquet(self, output_dir: Path, tables=EXPORT_TABLES) -> Dict[str, Path]:
+        """
+        Exporte les tables en fichiers Parquet (un par table, nécessite pandas et pyarrow)
+
+        Args:
+            output_dir: Dossier de destination
+            tables: Tables à exporter
+
+        Returns:
+            Dictionnaire table -> chemin du fichier Parquet
+        """
+        import pandas as pd
+
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        paths = {}
+        for table in tables:
+            if table not in EXPORT_TABLES:
+                raise ValueError(f"Table inconnue: {table}")
+            with self._lock:
+                frame = pd.read_sql_query(f"SELECT * FROM {table}", self._conn)
+            paths[table] = output_dir / f"{table}.parquet"
+            frame.to_parquet(paths[table], index=False)
+        return paths
+
+    def close(self):
+        """Ferme la connexion SQLite"""
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _filters(account: Optional[str], since: Optional[str], until: Optional[str],
+                 verdict: Optional[str], prefix: str = '') -> tuple:
+        """Clause WHERE et paramètres des filtres sur la table videos"""
+        clauses, params = [], []
+        for column, operator, value in (('account', '=', account), ('analyzed_at', '>=', since),
+                                        ('analyzed_at', '<', until), ('verdict', '=', verdict)):
+            if value is not None:
+                clauses.append(f"{prefix}{column} {operator} ?")
+                params.append(value.lstrip('@') if column == 'account' else value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _fetch(self, sql: str, params: List) -> List[Dict]:
+        """Exécute une requête et retourne les lignes en dictionnaires"""
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
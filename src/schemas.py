@@ -0,0 +1,34 @@
+"""
+Schéma de sortie structurée des analyses LLM
+"""
+from typing import List
+from pydantic import BaseModel, Field
+
+
+class Claim(BaseModel):
+    """Une affirmation factuelle relevée dans la vidéo"""
+    claim: str = Field(description="Affirmation reformulée en une phrase autonome")
+    to_verify: bool = Field(default=True, description="L'affirmation nécessite-t-elle une vérification factuelle ?")
+
+
+class VideoAnalysis(BaseModel):
+    """Analyse d'une vidéo, telle que renvoyée par le LLM en mode structuré"""
+    summary: str = Field(description="Résumé des points principaux abordés")
+    claims: List[Claim] = Field(default_factory=list, description="Affirmations factuelles de la vidéo")
+    tone: str = Field(description="Ton utilisé (neutre, alarmiste, persuasif, etc.)")
+    sources: List[str] = Field(default_factory=list, description="Sources citées ou mentionnées")
+    credibility_score: int = Field(ge=0, le=100, description="Score de crédibilité initial de 0 à 100")
+
+    def to_markdown(self) -> str:
+        """Rendu texte de l'analyse, dans l'ordre des sections du prompt libre"""
+        claims = "\n".join(f"- {claim.claim}" for claim in self.claims) or "- Aucune"
+        to_verify = "\n".join(f"- {claim.claim}" for claim in self.claims if claim.to_verify) or "- Aucun"
+        sources = "\n".join(f"- {source}" for source in self.sources) or "- Aucune source mentionnée"
+        return (
+            f"1. **Résumé du contenu** : {self.summary}\n\n"
+            f"2. **Affirmations clés** :\n{claims}\n\n"
+            f"3. **Ton et style** : {self.tone}\n\n"
+            f"4. **Sources mentionnées** :\n{sources}\n\n"
+            f"5. **Points à vérifier** :\n{to_verify}\n\n"
+            f"6. **Score de crédibilité initial** : {self.credibility_score}/100"
+        )
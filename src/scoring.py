@@ -0,0 +1,306 @@
+"""
+Score de crédibilité et verdict des affirmations, calculés en lot (TF-IDF haché, NumPy)
+"""
+import itertools
+import re
+import string
+import threading
+import unicodedata
+import zlib
+from typing import Dict, List, Tuple
+from src.claim_index import NEGATIONS, STOPWORDS
+
+# Nombre de colonnes de l'espace haché
+N_FEATURES = 1 << 20
+
+# Poids de chaque famille de résultats dans le score
+BUCKET_WEIGHTS = {
+    'fact_checking_results': 1.0,
+    'scientific_results': 0.6,
+    'news_results': 0.5,
+    'sources': 0.2,
+}
+
+# Indices de position (texte sans accents, unigrammes et bigrammes)
+REFUTE_TERMS = [
+    'faux', 'fausse', 'fausses', 'trompeur', 'trompeuse', 'infonde', 'infondee', 'intox', 'fake', 'hoax',
+    'rumeur', 'dementi', 'dementit', 'canular', 'complotiste', 'desinformation', 'false', 'misleading',
+    'debunked', 'fabricated', 'aucune preuve', 'pas de lien', 'no evidence',
+    'pas vrai', 'pas exact', 'pas correct', 'not true', 'not accurate',
+]
+SUPPORT_TERMS = [
+    'vrai', 'vraie', 'exact', 'exacte', 'correct', 'correcte', 'confirme', 'confirmee', 'avere', 'averee',
+    'true', 'accurate', 'confirmed', 'correctly',
+]
+MIXED_TERMS = [
+    'partiellement', 'en partie', 'mitige', 'nuance', 'a nuancer', 'imprecis', 'exagere', 'sans contexte',
+    'partially', 'mixture', 'half true', 'mostly', 'missing context',
+]
+# Négations d'un indice de confirmation (déjà comptées comme réfutations)
+NEGATED_SUPPORT_TERMS = ['pas vrai', 'pas exact', 'pas correct', 'not true', 'not accurate']
+
+# Mots ignorés par la pertinence (la négation relève de la position, pas du sujet)
+RELEVANCE_STOPWORDS = STOPWORDS | NEGATIONS
+
+# Calibration
+MIN_RELEVANCE = 0.1        # similarité cosinus minimale pour qu'un résultat compte
+FACT_CHECK_MIN_MASS = 0.15  # pertinence cumulée des fact-checks avec une position pour trancher
+STANCE_THRESHOLD = 0.3     # position minimale (en valeur absolue) pour vrai / faux
+MIXED_THRESHOLD = 0.4      # part d'indices nuancés au-delà de laquelle le verdict est partiel
+
+
+# Multiplicateur impair de combinaison des hachages de deux mots (bigramme)
+_BIGRAM_MULTIPLIER = 0x9E3779B1
+_COMBINING = re.compile('[\u0300-\u036f]')
+# Ponctuation remplacée par des espaces avant le découpage en mots
+_PUNCTUATION = str.maketrans({c: ' ' for c in string.punctuation + "«»‘’“”…–—"})
+
+
+def _word_hash(word: str) -> int:
+    """Hachage 32 bits (déterministe) d'un mot"""
+    return zlib.crc32(word.encode('utf-8'))
+
+
+def _fold(text: str) -> str:
+    """Minuscules sans accents"""
+    return _COMBINING.sub('', unicodedata.normalize('NFKD', text.lower()))
+
+
+def _words(text: str) -> List[str]:
+    """Mots en minuscules sans accents ni ponctuation"""
+    return _fold(text).translate(_PUNCTUATION).split()
+
+
+def _term_ids(terms: List[str]) -> List[int]:
+    """Colonnes hachées (triées) d'une liste d'indices d'un ou deux mots"""
+    ids = set()
+    for term in terms:
+        hashes = [_word_hash(word) for word in _words(term)]
+        if len(hashes) == 1:
+            ids.add(hashes[0] & (N_FEATURES - 1))
+        else:
+            ids.add(((hashes[0] * _BIGRAM_MULTIPLIER) ^ hashes[1]) & (N_FEATURES - 1))
+    return sorted(ids)
+
+
+_REFUTE_IDS = _term_ids(REFUTE_TERMS)
+_SUPPORT_IDS = _term_ids(SUPPORT_TERMS)
+_MIXED_IDS = _term_ids(MIXED_TERMS)
+_NEGATED_IDS = _term_ids(NEGATED_SUPPORT_TERMS)
+
+
+class EvidenceScorer:
+    """
+    Note toutes les paires affirmation / résultat d'une exécution en une passe
+
+    Chaque texte (affirmation, titre + extrait + preuve de chaque résultat)
+    devient une ligne TF-IDF hachée. La pertinence d'un résultat est sa
+    similarité cosinus avec son affirmation, et sa position (réfute,
+    confirme, nuance) vient d'indices lexicaux. Les agrégats par affirmation
+    donnent le score de crédibilité (0-100) et le verdict.
+
+    Les fréquences documentaires (IDF) sont calculées sur le seul lot noté:
+    le verdict d'une affirmation ne dépend pas des lots précédents. Seul le
+    hachage des mots déjà rencontrés est conservé d'un lot à l'autre, dans
+    la limite de max_vocabulary mots.
+    """
+
+    def __init__(self, max_vocabulary: int = 200_000):
+        """
+        Initialise le noteur
+
+        Args:
+            max_vocabulary: Nombre de mots dont le hachage est conservé entre deux
+                            lots; au-delà, ce cache est vidé avant le lot suivant
+        """
+        import numpy as np
+
+        self.max_vocabulary = max_vocabulary
+        # Code de chaque mot déjà rencontré, et hachage / statut de mot vide par code
+        self._vocabulary: Dict[str, int] = {}
+        self._word_hashes = np.zeros(0, dtype=np.uint64)
+        self._stopwords = np.zeros(0, dtype=bool)
+        self._lock = threading.Lock()
+
+    def score_many(self, results: List[Dict]) -> List[Dict]:
+        """
+        Calcule score et verdict de plusieurs affirmations
+
+        Args:
+            results: Résultats de FactChecker ('claim' et listes de résultats par famille)
+
+        Returns:
+            Pour chaque résultat, dans l'ordre: {'credibility_score', 'verdict',
+            'relevance' (pertinence par famille), 'stance' (position de -1 à 1)}
+        """
+        import numpy as np
+
+        if not results:
+            return []
+
+        # Lignes: une par affirmation puis une par résultat de recherche
+        texts = [result['claim'] for result in results]
+        owners, buckets = [], []
+        for i, result in enumerate(results):
+            for bucket in BUCKET_WEIGHTS:
+                for item in result.get(bucket, []):
+                    texts.append(f"{item.get('title', '')} {item.get('snippet', '')} {item.get('evidence', '')}")
+                    owners.append(i)
+                    buckets.append(bucket)
+        n_claims = len(results)
+        owners = np.asarray(owners, dtype=np.int64)
+        bucket_names = list(BUCKET_WEIGHTS)
+        bucket_ids = np.asarray([bucket_names.index(b) for b in buckets], dtype=np.int64)
+
+        rows, cols, stance_rows, stance_cols = self._vectorize(texts)
+        similarity = self._claim_similarity(rows, cols, len(texts), n_claims, owners)
+
+        # Position de chaque résultat
+        n_docs = len(texts) - n_claims
+        doc_rows = stance_rows - n_claims
+        keep = doc_rows >= 0
+        doc_rows, stance_cols = doc_rows[keep], stance_cols[keep]
+
+        def cue_counts(term_ids):
+            return np.bincount(doc_rows, np.isin(stance_cols, term_ids).astype(float), minlength=n_docs)
+
+        refute = cue_counts(_REFUTE_IDS)
+        support = np.maximum(cue_counts(_SUPPORT_IDS) - cue_counts(_NEGATED_IDS), 0)
+        mixed = cue_counts(_MIXED_IDS)
+        cues = support + refute + mixed
+        stance = np.divide(support - refute, cues, out=np.zeros(n_docs), where=cues > 0)
+        mixed_share = np.divide(mixed, cues, out=np.zeros(n_docs), where=cues > 0)
+
+        # Agrégats par affirmation (seuls les résultats pertinents comptent)
+        relevance = np.where(similarity >= MIN_RELEVANCE, similarity, 0.0)
+        weights = np.asarray([BUCKET_WEIGHTS[b] for b in bucket_names])[bucket_ids] * relevance
+        has_cue = cues > 0
+        is_fact_check = bucket_ids == 0
+
+        def per_claim(values):
+            return np.bincount(owners, values, minlength=n_claims)
+
+        evidence = per_claim(weights)
+        stance_mass = per_claim(weights * has_cue)
+        overall_stance = np.divide(per_claim(weights * stance), stance_mass,
+                                   out=np.zeros(n_claims), where=stance_mass > 0)
+        fc_mass = per_claim(relevance * has_cue * is_fact_check)
+        fc_stance = np.divide(per_claim(relevance * stance * is_fact_check), fc_mass,
+                              out=np.zeros(n_claims), where=fc_mass > 0)
+        fc_mixed = np.divide(per_claim(relevance * mixed_share * is_fact_check), fc_mass,
+                             out=np.zeros(n_claims), where=fc_mass > 0)
+        relevant_counts = np.zeros((n_claims, len(bucket_names)))
+        np.add.at(relevant_counts, (owners, bucket_ids), (relevance > 0).astype(float))
+        relevance_by_bucket = np.zeros((n_claims, len(bucket_names)))
+        np.add.at(relevance_by_bucket, (owners, bucket_ids), relevance)
+
+        # Score: position des sources pondérée par la confiance, plus la corroboration
+        confidence = 1 - np.exp(-evidence)
+        corroboration = np.tanh((relevant_counts[:, 1] + relevant_counts[:, 2]) / 5)
+        scores = np.clip(50 + 45 * confidence * overall_stance + 10 * corroboration * (stance_mass == 0), 0, 100)
+
+        scored = []
+        for i in range(n_claims):
+            if fc_mass[i] >= FACT_CHECK_MIN_MASS:
+                if fc_mixed[i] >= MIXED_THRESHOLD or abs(fc_stance[i]) < STANCE_THRESHOLD:
+                    verdict = 'partiellement_vrai'
+                else:
+                    verdict = 'faux' if fc_stance[i] < 0 else 'vrai'
+            elif relevant_counts[i, 1] >= 3 and relevant_counts[i, 2] >= 3:
+                verdict = 'probablement_vrai'
+            else:
+                verdict = 'non_verifie'
+            scored.append({
+                'credibility_score': int(round(scores[i])),
+                'verdict': verdict,
+                'relevance': {name: round(float(relevance_by_bucket[i, b]), 3) for b, name in enumerate(bucket_names)},
+                'stance': round(float(overall_stance[i]), 3)
+            })
+        return scored
+
+    def _vectorize(self, texts: List[str]) -> Tuple:
+        """
+        Colonnes hachées de chaque texte
+
+        Tous les textes sont découpés en une passe; chaque mot distinct n'est
+        haché qu'une fois et les colonnes des bigrammes sont calculées en
+        NumPy à partir des hachages des deux mots.
+
+        Returns:
+            (lignes, colonnes) des termes de pertinence (sans mots vides) et
+            (lignes, colonnes) des n-grammes de position (tous les mots)
+        """
+        import numpy as np
+
+        # Un texte par ligne, replié et découpé en une seule fois
+        joined = '\n'.join(text.replace('\n', ' ') for text in texts)
+        lines = [line.split() for line in _fold(joined).translate(_PUNCTUATION).split('\n')]
+        tokens = list(itertools.chain.from_iterable(lines))
+        # Le vocabulaire est partagé entre les threads de vérification
+        with self._lock:
+            new_tokens = set(tokens).difference(self._vocabulary)
+            if len(self._vocabulary) + len(new_tokens) > self.max_vocabulary:
+                self._vocabulary = {}
+                self._word_hashes = np.zeros(0, dtype=np.uint64)
+                self._stopwords = np.zeros(0, dtype=bool)
+                new_tokens = set(tokens)
+            vocabulary = self._vocabulary
+            for token in new_tokens:
+                vocabulary[token] = len(vocabulary)
+            codes = np.fromiter(map(vocabulary.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+            if len(vocabulary) > len(self._word_hashes):
+                new_words = list(vocabulary)[len(self._word_hashes):]
+                self._word_hashes = np.concatenate([
+                    self._word_hashes, np.asarray([_word_hash(word) for word in new_words], dtype=np.uint64)])
+                self._stopwords = np.concatenate([
+                    self._stopwords, np.asarray([word in RELEVANCE_STOPWORDS for word in new_words], dtype=bool)])
+            all_hashes, all_stopwords = self._word_hashes, self._stopwords
+
+        word_rows = np.repeat(np.arange(len(lines), dtype=np.int64),
+                              np.fromiter(map(len, lines), dtype=np.int64, count=len(lines)))
+        word_hashes = all_hashes[codes]
+        content = ~all_stopwords[codes]
+
+        def ngrams(rows, values):
+            """Unigrammes puis bigrammes (deux mots consécutifs d'un même texte)"""
+            same_text = rows[1:] == rows[:-1]
+            bigrams = (values[:-1][same_text] * np.uint64(_BIGRAM_MULTIPLIER)) ^ values[1:][same_text]
+            columns = np.concatenate([values, bigrams]) & np.uint64(N_FEATURES - 1)
+            return np.concatenate([rows, rows[1:][same_text]]), columns.astype(np.int64)
+
+        stance_rows, stance_cols = ngrams(word_rows, word_hashes)
+        rows, cols = ngrams(word_rows[content], word_hashes[content])
+        return rows, cols, stance_rows, stance_cols
+
+    @staticmethod
+    def _claim_similarity(rows, cols, n_rows: int, n_claims: int, owners):
+        """Similarité cosinus TF-IDF entre chaque résultat et son affirmation"""
+        import numpy as np
+
+        n_docs = n_rows - n_claims
+        if n_docs == 0 or len(rows) == 0:
+            return np.zeros(n_docs)
+
+        # Matrice creuse au format (ligne, colonne, poids), une entrée par couple unique
+        keys, counts = np.unique(rows * N_FEATURES + cols, return_counts=True)
+        entry_rows, entry_cols = keys // N_FEATURES, keys % N_FEATURES
+        # IDF calculé sur les seuls textes de ce lot (aucune statistique conservée entre deux lots)
+        columns, document_frequency = np.unique(entry_cols, return_counts=True)
+        idf = np.log((1 + n_rows) / (1 + document_frequency)) + 1
+        weights = (1 + np.log(counts)) * idf[np.searchsorted(columns, entry_cols)]
+        norms = np.sqrt(np.bincount(entry_rows, weights ** 2, minlength=n_rows))
+        weights = weights / norms[entry_rows]
+
+        # Produit scalaire de chaque ligne de résultat avec la ligne de son affirmation
+        is_claim = entry_rows < n_claims
+        claim_keys = entry_rows[is_claim] * N_FEATURES + entry_cols[is_claim]
+        claim_weights = weights[is_claim]
+        doc_rows = entry_rows[~is_claim] - n_claims
+        if len(claim_keys) == 0:
+            return np.zeros(n_docs)
+        lookup = owners[doc_rows] * N_FEATURES + entry_cols[~is_claim]
+        position = np.minimum(np.searchsorted(claim_keys, lookup), len(claim_keys) - 1)
+        match = claim_keys[position] == lookup
+        products = np.where(match, weights[~is_claim] * claim_weights[position], 0.0)
+        return np.bincount(doc_rows, products, minlength=n_docs)
+
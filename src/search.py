@@ -0,0 +1,250 @@
+"""
+Moteur de recherche concurrent pour la vérification des faits
+"""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from src.cache import ResultCache
+from src.ratelimit import AdaptiveRateLimiter
+
+
+@dataclass
+class SearchQuery:
+    """Une requête de recherche élémentaire (une famille, un site)"""
+    query: str
+    source: str
+    max_results: int = 3
+    backend: str = "duckduckgo"
+    language: str = "fr"
+    priority: int = 0  # Les requêtes de priorité la plus basse partent en premier
+    # Sites d'une requête combinée ("site:a OR site:b"): la source de chaque résultat
+    # est alors le site auquel appartient son URL
+    sites: Tuple[str, ...] = ()
+
+    def cache_key(self) -> str:
+        """Clé de cache: requête normalisée, site, langue et nombre de résultats"""
+        normalized = re.sub(r'\s+', ' ', self.query).strip().lower()
+        payload = json.dumps([normalized, self.source, self.language, self.max_results, self.backend])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def domain_matches(url: str, site: str) -> bool:
+    """L'URL appartient-elle au site (domaine, éventuellement suivi d'un chemin) ?"""
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    domain, _, path = site.lower().partition('/')
+    if host != domain and not host.endswith('.' + domain):
+        return False
+    return not path or parsed.path.lstrip('/').startswith(path)
+
+
+class SearchBackend:
+    """
+    Interface d'un backend de recherche
+
+    Un backend comprend les filtres `site:domaine` dans la requête et
+    retourne des résultats bruts ({'title', 'href', 'body'}). S'il accepte
+    plusieurs filtres combinés ("site:a OR site:b"), combined_sites est vrai.
+    """
+
+    name = "base"
+    combined_sites = False
+
+    def text(self, query: str, max_results: int, timeout: Optional[float] = None) -> List[Dict]:
+        """
+        Exécute une recherche textuelle
+
+        Args:
+            query: Requête de recherche
+            max_results: Nombre maximum de résultats
+            timeout: Délai réseau maximum en secondes
+
+        Returns:
+            Liste de résultats bruts ({'title', 'href', 'body'})
+        """
+        raise NotImplementedError
+
+
+class DuckDuckGoBackend(SearchBackend):
+    """Backend de recherche DuckDuckGo"""
+
+    name = "duckduckgo"
+    combined_sites = True
+
+    def text(self, query: str, max_results: int, timeout: Optional[float] = None) -> List[Dict]:
+        """Recherche DuckDuckGo (voir SearchBackend.text)"""
+        from duckduckgo_search import DDGS
+
+        with DDGS(timeout=timeout or 10) as ddgs:
+            return list(ddgs.text(query, max_results=max_results))
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    """L'erreur est-elle un refus pour excès de requêtes (HTTP 429) ?"""
+    return 'ratelimit' in type(error).__name__.lower() or '429' in str(error)
+
+
+class SearchEngine:
+    """Exécute des lots de requêtes en parallèle avec des limites par backend"""
+
+    def __init__(self, backends: Optional[Dict] = None, concurrency: Optional[Dict[str, int]] = None,
+                 max_workers: int = 16, timeout: float = 15.0, cache: Optional[ResultCache] = None,
+                 rates: Optional[Dict[str, float]] = None, max_rate: float = 5.0, max_retries: int = 3,
+                 backoff: float = 1.0, budget: Optional[int] = None):
+        """
+        Initialise le moteur de recherche
+
+        Args:
+            backends: Dictionnaire nom -> backend (défaut: DuckDuckGo)
+            concurrency: Nombre maximum de requêtes simultanées par backend
+            max_workers: Taille du pool de threads partagé
+            timeout: Délai maximum par tentative en secondes
+            cache: Cache persistant des résultats (optionnel)
+            rates: Débit initial par backend en requêtes par seconde (défaut: illimité);
+                   il s'adapte ensuite entre 0.1 et max_rate selon les refus du backend
+            max_rate: Débit maximum par backend
+            max_retries: Nombre de nouvelles tentatives après une erreur
+            backoff: Délai de base de l'attente exponentielle entre tentatives, en secondes
+            budget: Nombre maximum d'appels réseau par appel de run() (None = illimité)
+        """
+        rates = rates or {}
+        self.backends = backends or {DuckDuckGoBackend.name: DuckDuckGoBackend()}
+        self.concurrency = concurrency or {}
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.cache = cache
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.budget = budget
+        # Total des appels réseau sur la durée de vie du moteur (le budget, lui, vaut par run())
+        self.network_calls = 0
+        self.failed_queries = 0
+        self._lock = threading.Lock()
+        self._semaphores = {
+            name: threading.BoundedSemaphore(self.concurrency.get(name, 4))
+            for name in self.backends
+        }
+        self.rate_limiters = {
+            name: AdaptiveRateLimiter(rates[name], max_rate=max(max_rate, rates[name]))
+            for name in self.backends if rates.get(name)
+        }
+
+    def run(self, queries: List[SearchQuery]) -> List[List[Dict]]:
+        """
+        Exécute toutes les requêtes en parallèle
+
+        Args:
+            queries: Liste des requêtes à exécuter
+
+        Returns:
+            Liste des résultats formatés, dans le même ordre que les requêtes.
+            Une requête en échec (erreurs répétées, délai dépassé, budget épuisé)
+            vaut None, à distinguer d'une recherche sans résultat ([])
+        """
+        outcomes: List[Optional[List[Dict]]] = [None for _ in queries]
+        if not queries:
+            return outcomes
+
+        started: Dict[int, float] = {}
+        spent = {'calls': 0}
+        # Les requêtes prioritaires sont soumises (donc exécutées) en premier
+        order = sorted(range(len(queries)), key=lambda i: queries[i].priority)
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(queries)))
+        try:
+            futures = {
+                executor.submit(self._execute, i, queries[i], started, spent): i
+                for i in order
+            }
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    outcomes[futures[future]] = future.result()
+
+                # Abandonner les requêtes qui dépassent leur délai
+                now = time.monotonic()
+                for future in list(pending):
+                    index = futures[future]
+                    if index in started and now - started[index] > self.timeout:
+                        print(f"Délai dépassé pour la recherche: {queries[index].query[:50]}")
+                        future.cancel()
+                        pending.discard(future)
+                        with self._lock:
+                            self.failed_queries += 1
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return outcomes
+
+    def _execute(self, index: int, query: SearchQuery, started: Dict[int, float],
+                 spent: Dict[str, int]) -> Optional[List[Dict]]:
+        """Exécute une requête en respectant le débit, la concurrence et le budget du lot (spent)"""
+        if self.cache is not None:
+            cached = self.cache.get(query.cache_key())
+            if cached is not None:
+                return cached
+
+        backend = self.backends[query.backend]
+        limiter = self.rate_limiters.get(query.backend)
+        for attempt in range(self.max_retries + 1):
+            with self._lock:
+                if self.budget is not None and spent['calls'] >= self.budget:
+                    print(f"Budget de recherche épuisé ({self.budget} requêtes): {query.query[:50]}")
+                    self.failed_queries += 1
+                    return None
+                spent['calls'] += 1
+                self.network_calls += 1
+            if limiter:
+                limiter.acquire()
+
+            with self._semaphores[query.backend]:
+                started[index] = time.monotonic()
+                try:
+                    raw_results = backend.text(query.query, query.max_results, timeout=self.timeout)
+                    error = None
+                except Exception as e:
+                    error = e
+
+            if error is None:
+                if limiter:
+                    limiter.on_success()
+                break
+
+            started.pop(index, None)
+            if limiter and _is_rate_limited(error):
+                limiter.on_throttle()
+            if attempt == self.max_retries:
+                print(f"Erreur recherche {query.source} (abandon après {attempt + 1} tentatives): {error}")
+                with self._lock:
+                    self.failed_queries += 1
+                return None
+            # Attente exponentielle avec gigue
+            delay = self.backoff * 2 ** attempt
+            time.sleep(delay + random.uniform(0, delay))
+
+        results = []
+        for result in raw_results:
+            source = query.source
+            if query.sites:
+                # Requête combinée: rattacher le résultat à son site, écarter les autres domaines
+                source = next((site for site in query.sites if domain_matches(result.get('href', ''), site)), None)
+                if source is None:
+                    continue
+            results.append({
+                'title': result.get('title', ''),
+                'url': result.get('href', ''),
+                'snippet': result.get('body', ''),
+                'source': source
+            })
+        if self.cache is not None:
+            self.cache.set(query.cache_key(), results)
+        return results
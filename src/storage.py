@@ -2,21 +2,36 @@
 Module de stockage des résultats en JSON et Markdown
 """
 import json
+import os
+import threading
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional
 from src.config import Config
+from src.result_store import ResultStore
 
 class ResultStorage:
     """Gestionnaire de stockage des résultats"""
     
-    def __init__(self, output_dir: Path = None):
+    def __init__(self, output_dir: Path = None, store: Optional[ResultStore] = None, use_store: bool = True):
+        """
+        Initialise le stockage
+        
+        Args:
+            output_dir: Dossier des fichiers JSON et Markdown
+            store: Base de résultats interrogeable (défaut: RESULTS_DB_PATH, ou
+                   results.sqlite dans output_dir s'il est donné)
+            use_store: Ajoute aussi chaque sauvegarde à la base de résultats
+        """
         self.output_dir = output_dir or Config.OUTPUT_DIR
         self.output_dir.mkdir(exist_ok=True)
+        self.store = store
+        if self.store is None and use_store:
+            self.store = ResultStore(self.output_dir / "results.sqlite" if output_dir else Config.RESULTS_DB_PATH)
     
     def save_results(self, results: Dict, filename_prefix: str = None) -> Dict[str, Path]:
         """
-        Sauvegarde les résultats en JSON et Markdown
+        Sauvegarde les résultats en JSON et Markdown, et les ajoute à la base de résultats
         
         Args:
             results: Dictionnaire avec les résultats d'analyse
@@ -40,83 +55,252 @@ class ResultStorage:
         with open(md_path, 'w', encoding='utf-8') as f:
             f.write(markdown_content)
         
-        return {
+        saved = {
             'json': json_path,
             'markdown': md_path
         }
+        
+        # Ajouter à la base interrogeable
+        if self.store is not None:
+            self.store.append(results)
+            saved['database'] = self.store.db_path
+        
+        return saved
     
     def _generate_markdown(self, results: Dict) -> str:
         """Génère le contenu Markdown à partir des résultats"""
-        md = f"# Rapport d'Analyse - {datetime.now().strftime('%d/%m/%Y %H:%M')}\n\n"
-        
-        # Informations générales
-        if 'metadata' in results:
-            md += "## Informations Générales\n\n"
-            metadata = results['metadata']
-            md += f"- **Influenceur/URL**: {metadata.get('source', 'N/A')}\n"
-            md += f"- **Nombre de vidéos analysées**: {metadata.get('video_count', 0)}\n"
-            md += f"- **Date d'analyse**: {metadata.get('analysis_date', 'N/A')}\n\n"
+        parts = [_markdown_header(results.get('metadata'))]
         
         # Résultats par vidéo
         if 'videos' in results:
-            md += "## Résultats par Vidéo\n\n"
-            
+            parts.append("## Résultats par Vidéo\n\n")
             for i, video in enumerate(results['videos'], 1):
-                md += f"### Vidéo {i}: {video.get('title', 'Sans titre')}\n\n"
-                
-                # Métadonnées
-                if 'metadata' in video:
-                    meta = video['metadata']
-                    md += f"**Métadonnées:**\n"
-                    md += f"- Auteur: {meta.get('uploader', 'N/A')}\n"
-                    md += f"- Date: {meta.get('upload_date', 'N/A')}\n"
-                    md += f"- Vues: {meta.get('view_count', 0):,}\n"
-                    md += f"- Likes: {meta.get('like_count', 0):,}\n\n"
-                
-                # Transcription
-                if 'transcription' in video:
-                    md += f"**Transcription:**\n\n{video['transcription'].get('text', 'N/A')}\n\n"
-                
-                # Analyse LLM
-                if 'llm_analysis' in video:
-                    md += f"**Analyse LLM:**\n\n{video['llm_analysis'].get('analysis', 'N/A')}\n\n"
-                
-                # Vérification des faits
-                if 'fact_checking' in video:
-                    fact_check = video['fact_checking']
-                    md += f"**Vérification des Faits:**\n\n"
-                    md += f"- Score de crédibilité: {fact_check.get('credibility_score', 0)}%\n"
-                    md += f"- Verdict: {fact_check.get('verdict', 'non_verifie')}\n\n"
-                    
-                    # Sources
-                    if 'sources' in fact_check:
-                        md += "**Sources trouvées:**\n\n"
-                        for source in fact_check['sources'][:10]:  # Limiter à 10
-                            md += f"- [{source.get('title', 'Sans titre')}]({source.get('url', '#')})\n"
-                            md += f"  - {source.get('snippet', '')[:100]}...\n\n"
-                
-                md += "---\n\n"
-        
-        # Statistiques globales
-        if 'statistics' in results:
-            md += "## Statistiques Globales\n\n"
-            stats = results['statistics']
-            md += f"- Score moyen de crédibilité: {stats.get('average_credibility', 0):.1f}%\n"
-            md += f"- Nombre de vidéos vérifiées: {stats.get('verified_count', 0)}\n"
-            md += f"- Nombre de vidéos non vérifiées: {stats.get('unverified_count', 0)}\n\n"
-        
-        return md
-    
-    def load_results(self, json_path: Path) -> Dict:
+                parts.append(_markdown_video(i, video))
+        
+        parts.append(_markdown_statistics(results))
+        return ''.join(parts)
+    
+    def open_stream(self, metadata: Dict, filename_prefix: str = None) -> 'ResultStream':
+        """
+        Ouvre une sauvegarde au fil de l'eau (JSON Lines et Markdown)
+        
+        Chaque vidéo est écrite dès qu'elle est terminée: après un arrêt
+        brutal, les vidéos déjà terminées restent sur disque.
+        
+        Args:
+            metadata: Informations générales de l'analyse
+            filename_prefix: Préfixe pour les noms de fichiers
+            
+        Returns:
+            ResultStream à fermer (ou à utiliser comme gestionnaire de contexte)
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base_filename = f"{filename_prefix or 'analysis'}_{timestamp}"
+        return ResultStream(
+            self.output_dir / f"{base_filename}.jsonl",
+            self.output_dir / f"{base_filename}.md",
+            metadata,
+            store=self.store
+        )
+    
+    def load_results(self, json_path: Path, lazy: bool = False):
+        """
+        Charge les résultats depuis un fichier JSON ou JSON Lines
+        
+        Args:
+            json_path: Chemin vers le fichier (.json ou .jsonl)
+            lazy: Pour un fichier JSON Lines, retourne un itérateur des vidéos
+                  lues une à une au lieu du dictionnaire complet
+            
+        Returns:
+            Dictionnaire avec les résultats (ou itérateur des vidéos si lazy)
+        """
+        json_path = Path(json_path)
+        if json_path.suffix != '.jsonl':
+            with open(json_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        
+        if lazy:
+            return (record['video'] for record in self.iter_records(json_path) if record['type'] == 'video')
+        results = {'videos': []}
+        for record in self.iter_records(json_path):
+            if record['type'] == 'video':
+                results['videos'].append(record['video'])
+            else:
+                results.update({key: value for key, value in record.items() if key != 'type'})
+        return results
+    
+    def iter_records(self, jsonl_path: Path) -> Iterator[Dict]:
+        """
+        Parcourt un fichier JSON Lines enregistrement par enregistrement
+        
+        Une dernière ligne incomplète (arrêt pendant l'écriture) est ignorée.
+        
+        Yields:
+            Enregistrements {'type': 'metadata' | 'video' | 'statistics', ...}
+        """
+        with open(jsonl_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Ligne incomplète ignorée dans {Path(jsonl_path).name}")
+
+
+class ResultStream:
+    """Sauvegarde au fil de l'eau: une ligne JSON et une section Markdown par vidéo terminée"""
+    
+    def __init__(self, jsonl_path: Path, md_path: Path, metadata: Dict, store: Optional[ResultStore] = None):
+        """
+        Ouvre les fichiers et écrit l'en-tête de l'analyse
+        
+        Args:
+            jsonl_path: Fichier JSON Lines
+            md_path: Fichier Markdown
+            metadata: Informations générales de l'analyse
+            store: Base de résultats alimentée vidéo par vidéo (optionnel)
+        """
+        self.jsonl_path = jsonl_path
+        self.md_path = md_path
+        self.store = store
+        self._lock = threading.Lock()
+        self._scores: List[int] = []
+        self._verdicts: List[str] = []
+        self._analysis_id = store.start_analysis(metadata) if store is not None else None
+        self._jsonl = open(jsonl_path, 'w', encoding='utf-8')
+        self._md = open(md_path, 'w', encoding='utf-8')
+        self._write({'type': 'metadata', 'metadata': metadata},
+                    _markdown_header(metadata) + "## Résultats par Vidéo\n\n")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        if not self._jsonl.closed:
+            self.close()
+    
+    def write_video(self, video: Dict):
+        """Ajoute une vidéo terminée (format de pipeline.build_video_result)"""
+        with self._lock:
+            fact_check = video.get('fact_checking', {})
+            self._scores.append(fact_check.get('credibility_score', 0))
+            self._verdicts.append(fact_check.get('verdict', 'non_verifie'))
+            self._write({'type': 'video', 'video': video}, _markdown_video(len(self._scores), video))
+            if self.store is not None:
+                self.store.append_video(self._analysis_id, video)
+    
+    def statistics(self) -> Dict:
+        """Statistiques des vidéos écrites (même format que pipeline.compute_statistics)"""
+        with self._lock:
+            scores, verdicts = list(self._scores), list(self._verdicts)
+        return {
+            'average_credibility': sum(scores) / len(scores) if scores else 0,
+            'verified_count': sum(1 for v in verdicts if v != 'non_verifie'),
+            'unverified_count': sum(1 for v in verdicts if v == 'non_verifie'),
+            'verdict_distribution': {v: verdicts.count(v) for v in set(verdicts)}
+        }
+    
+    def close(self, extra: Optional[Dict] = None) -> Dict[str, Path]:
         """
-        Charge les résultats depuis un fichier JSON
+        Écrit les statistiques et ferme les fichiers
         
         Args:
-            json_path: Chemin vers le fichier JSON
+            extra: Enregistrements de fin supplémentaires (ex: 'account_statistics')
             
         Returns:
-            Dictionnaire avec les résultats
+            Dictionnaire avec les chemins des fichiers sauvegardés
         """
-        with open(json_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        summary = {'statistics': self.statistics(), 'video_count': len(self._scores), **(extra or {})}
+        with self._lock:
+            self._write({'type': 'statistics', **summary}, _markdown_statistics(summary))
+            self._jsonl.close()
+            self._md.close()
+            if self.store is not None:
+                self.store.finish_analysis(self._analysis_id, len(self._scores))
+        
+        saved = {'json': self.jsonl_path, 'markdown': self.md_path}
+        if self.store is not None:
+            saved['database'] = self.store.db_path
+        return saved
+    
+    def _write(self, record: Dict, markdown: str):
+        """Ajoute un enregistrement JSON Lines et du Markdown, écrits sur disque immédiatement"""
+        self._jsonl.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._md.write(markdown)
+        for f in (self._jsonl, self._md):
+            f.flush()
+            os.fsync(f.fileno())
+
 
+def _markdown_header(metadata: Optional[Dict]) -> str:
+    """Titre et informations générales du rapport"""
+    md = f"# Rapport d'Analyse - {datetime.now().strftime('%d/%m/%Y %H:%M')}\n\n"
+    if metadata is not None:
+        md += "## Informations Générales\n\n"
+        md += f"- **Influenceur/URL**: {metadata.get('source', 'N/A')}\n"
+        if 'video_count' in metadata:
+            md += f"- **Nombre de vidéos analysées**: {metadata['video_count']}\n"
+        md += f"- **Date d'analyse**: {metadata.get('analysis_date', 'N/A')}\n\n"
+    return md
+
+
+def _markdown_video(i: int, video: Dict) -> str:
+    """Section Markdown d'une vidéo"""
+    parts = [f"### Vidéo {i}: {video.get('title', 'Sans titre')}\n\n"]
+    
+    # Métadonnées
+    if 'metadata' in video:
+        meta = video['metadata']
+        parts.append(f"**Métadonnées:**\n"
+                     f"- Auteur: {meta.get('uploader', 'N/A')}\n"
+                     f"- Date: {meta.get('upload_date', 'N/A')}\n"
+                     f"- Vues: {meta.get('view_count', 0):,}\n"
+                     f"- Likes: {meta.get('like_count', 0):,}\n\n")
+    
+    # Transcription
+    if 'transcription' in video:
+        parts.append(f"**Transcription:**\n\n{video['transcription'].get('text', 'N/A')}\n\n")
+    
+    # Analyse LLM
+    if 'llm_analysis' in video:
+        parts.append(f"**Analyse LLM:**\n\n{video['llm_analysis'].get('analysis', 'N/A')}\n\n")
+    
+    # Vérification des faits
+    if 'fact_checking' in video:
+        fact_check = video['fact_checking']
+        parts.append(f"**Vérification des Faits:**\n\n"
+                     f"- Score de crédibilité: {fact_check.get('credibility_score', 0)}%\n"
+                     f"- Verdict: {fact_check.get('verdict', 'non_verifie')}\n\n")
+        
+        # Sources
+        if 'sources' in fact_check:
+            parts.append("**Sources trouvées:**\n\n")
+            for source in fact_check['sources'][:10]:  # Limiter à 10
+                parts.append(f"- [{source.get('title', 'Sans titre')}]({source.get('url', '#')})\n"
+                             f"  - {source.get('snippet', '')[:100]}...\n\n")
+    
+    parts.append("---\n\n")
+    return ''.join(parts)
+
+
+def _markdown_statistics(results: Dict) -> str:
+    """Statistiques globales et, en mode incrémental, cumulées du compte"""
+    md = ""
+    if 'statistics' in results:
+        md += "## Statistiques Globales\n\n"
+        stats = results['statistics']
+        md += f"- Score moyen de crédibilité: {stats.get('average_credibility', 0):.1f}%\n"
+        md += f"- Nombre de vidéos vérifiées: {stats.get('verified_count', 0)}\n"
+        md += f"- Nombre de vidéos non vérifiées: {stats.get('unverified_count', 0)}\n\n"
+    
+    # Statistiques cumulées du compte (mode incrémental)
+    if 'account_statistics' in results:
+        md += "## Statistiques du Compte (toutes analyses)\n\n"
+        account = results['account_statistics']
+        md += f"- Vidéos analysées au total: {account.get('video_count', 0)}\n"
+        md += f"- Score moyen de crédibilité: {account.get('average_credibility', 0):.1f}%\n"
+        md += f"- Nombre de vidéos vérifiées: {account.get('verified_count', 0)}\n"
+        md += f"- Nombre de vidéos non vérifiées: {account.get('unverified_count', 0)}\n\n"
+    return md
@@ -1,23 +1,136 @@
 """
 Module de transcription audio/vidéo avec Whisper
 """
-import whisper
+import hashlib
+import os
+import multiprocessing
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, List, Optional, Tuple
+from src.cache import ResultCache
+from src.config import Config
+
+# Fréquence d'échantillonnage attendue par Whisper (whisper.audio.SAMPLE_RATE)
+SAMPLE_RATE = 16000
+
+# Modèle chargé une seule fois par processus du pool de transcription
+_worker_model = None
+
+
+def _init_worker(model_size: str, threads: int):
+    """Initialise un processus du pool: charge le modèle Whisper une seule fois"""
+    global _worker_model
+    import torch
+    import whisper
+    torch.set_num_threads(threads)
+    _worker_model = whisper.load_model(model_size)
+
+
+def _transcribe_in_worker(audio, language: str) -> Tuple[dict, float]:
+    """Transcrit un signal audio déjà décodé dans un processus du pool"""
+    start = time.perf_counter()
+    result = _worker_model.transcribe(audio, language=language, task="transcribe")
+    return _format_result(result, language, len(audio) / SAMPLE_RATE), time.perf_counter() - start
+
+
+# Champs conservés pour chaque segment (les tokens bruts sont écartés)
+SEGMENT_FIELDS = ('id', 'start', 'end', 'text', 'avg_logprob', 'no_speech_prob')
+
+
+def load_audio(media_path: Path):
+    """
+    Charge un fichier audio/vidéo en signal 16 kHz mono float32 (format attendu par Whisper)
+    
+    Un WAV PCM 16 bits déjà en 16 kHz mono (mode audio seul du téléchargeur) est lu
+    directement, sans lancer ffmpeg.
+    
+    Args:
+        media_path: Chemin du fichier
+        
+    Returns:
+        Tableau numpy float32
+    """
+    if media_path.suffix.lower() == '.wav':
+        with wave.open(str(media_path), 'rb') as wav:
+            if wav.getnchannels() == 1 and wav.getframerate() == SAMPLE_RATE and wav.getsampwidth() == 2:
+                import numpy as np
+                frames = wav.readframes(wav.getnframes())
+                return np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+    
+    import whisper
+    return whisper.load_audio(str(media_path))
+
+
+def _format_result(result: dict, language: str, duration: float) -> dict:
+    """
+    Formate le résultat brut de Whisper sous une forme compacte
+    
+    La durée (en secondes) vient du signal décodé: Whisper ne la renvoie pas.
+    """
+    return {
+        'text': result['text'],
+        'segments': [
+            {key: segment[key] for key in SEGMENT_FIELDS if key in segment}
+            for segment in result.get('segments', [])
+        ],
+        'language': result.get('language', language),
+        'duration': duration
+    }
+
 
 class AudioTranscriber:
     """Gestionnaire de transcription audio avec Whisper"""
     
-    def __init__(self, model_size: str = "base"):
+    def __init__(self, model_size: str = "base", use_cache: bool = True):
         """
-        Initialise le modèle Whisper
+        Initialise le transcripteur
+        
+        Le modèle Whisper n'est chargé qu'à la première transcription qui
+        n'est pas déjà en cache.
         
         Args:
             model_size: Taille du modèle ('tiny', 'base', 'small', 'medium', 'large')
+            use_cache: Active le cache des transcriptions (clé: contenu du fichier)
+        """
+        self.model_size = model_size
+        self._model = None
+        # Durées de décodage et de transcription par fichier
+        self.metrics = {}
+        self.cache = None
+        if use_cache:
+            self.cache = ResultCache(
+                Config.CACHE_DIR / "transcriptions.sqlite",
+                max_entries=Config.TRANSCRIPTION_CACHE_MAX_ENTRIES
+            )
+    
+    @property
+    def model(self):
+        """Modèle Whisper, chargé à la première utilisation"""
+        if self._model is None:
+            import whisper
+            print(f"Chargement du modèle Whisper ({self.model_size})...")
+            self._model = whisper.load_model(self.model_size)
+            print("Modèle chargé avec succès!")
+        return self._model
+    
+    def cache_key(self, media_path: Path, language: str) -> str:
         """
-        print(f"Chargement du modèle Whisper ({model_size})...")
-        self.model = whisper.load_model(model_size)
-        print("Modèle chargé avec succès!")
+        Clé de cache adressée par le contenu
+        
+        Args:
+            media_path: Chemin du fichier audio/vidéo
+            language: Code langue
+            
+        Returns:
+            Empreinte SHA-256 du contenu, de la taille du modèle et de la langue
+        """
+        digest = hashlib.sha256()
+        with open(media_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return f"{digest.hexdigest()}:{self.model_size}:{language}"
     
     def transcribe_video(self, video_path: Path, language: str = "fr") -> dict:
         """
@@ -33,19 +146,126 @@ class AudioTranscriber:
         if not video_path.exists():
             raise FileNotFoundError(f"Fichier vidéo introuvable: {video_path}")
         
+        key = self.cache_key(video_path, language) if self.cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                print(f"Transcription en cache: {video_path.name}")
+                return cached
+        
         print(f"Transcription de {video_path.name}...")
+        start = time.perf_counter()
+        audio = load_audio(video_path)
+        decoded = time.perf_counter()
         result = self.model.transcribe(
-            str(video_path),
+            audio,
             language=language,
             task="transcribe"
         )
-        
-        return {
-            'text': result['text'],
-            'segments': result.get('segments', []),
-            'language': result.get('language', language),
-            'duration': result.get('duration', 0)
+        self.metrics[video_path.name] = {
+            'decode_seconds': decoded - start,
+            'transcribe_seconds': time.perf_counter() - decoded,
         }
+        
+        transcription = _format_result(result, language, len(audio) / SAMPLE_RATE)
+        if key:
+            self.cache.set(key, transcription)
+        return transcription
+    
+    def transcribe_many(self, video_paths: List[Path], language: str = "fr",
+                        workers: Optional[int] = None,
+                        decode_workers: int = 2) -> Iterator[Tuple[Path, Optional[dict], Optional[str]]]:
+        """
+        Transcrit plusieurs vidéos en parallèle avec un pool de processus
+        
+        Chaque processus charge son propre modèle une seule fois. L'audio est
+        décodé (ffmpeg) dans un étage séparé pendant que les modèles travaillent.
+        
+        Args:
+            video_paths: Chemins des fichiers vidéo
+            language: Code langue ('fr' pour français)
+            workers: Nombre de processus de transcription (défaut: nombre de coeurs / 2)
+            decode_workers: Nombre de décodages audio simultanés
+            
+        Yields:
+            Tuples (chemin, transcription, erreur) dans l'ordre de fin de
+            traitement; une vidéo en échec est rendue avec (chemin, None, erreur)
+        """
+        for video_path in video_paths:
+            if not video_path.exists():
+                raise FileNotFoundError(f"Fichier vidéo introuvable: {video_path}")
+        
+        # Les transcriptions en cache sont rendues sans lancer le pool
+        keys = {}
+        queue = []
+        for video_path in video_paths:
+            if self.cache:
+                keys[video_path] = self.cache_key(video_path, language)
+                cached = self.cache.get(keys[video_path])
+                if cached is not None:
+                    print(f"Transcription en cache: {video_path.name}")
+                    yield video_path, cached, None
+                    continue
+            queue.append(video_path)
+        
+        if not queue:
+            return
+        
+        cpu_count = os.cpu_count() or 1
+        workers = max(1, min(workers or cpu_count // 2, len(queue)))
+        threads = max(1, cpu_count // workers)
+        # Limiter l'audio décodé en attente pour borner la mémoire
+        max_ready = workers * 2
+        
+        decoding = {}
+        transcribing = {}
+        ready = []
+        
+        context = multiprocessing.get_context("spawn")
+        with ThreadPoolExecutor(max_workers=decode_workers) as decoder, \
+                ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                    initializer=_init_worker,
+                                    initargs=(self.model_size, threads)) as pool:
+            while queue or decoding or transcribing or ready:
+                # Étage 1: décodage audio en avance
+                while queue and len(decoding) + len(ready) < max_ready:
+                    video_path = queue.pop(0)
+                    decoding[decoder.submit(self._timed_load_audio, video_path)] = video_path
+                
+                # Étage 2: transcription dès qu'un processus est libre
+                while ready and len(transcribing) < workers:
+                    video_path, audio = ready.pop(0)
+                    print(f"Transcription de {video_path.name}...")
+                    transcribing[pool.submit(_transcribe_in_worker, audio, language)] = video_path
+                
+                done, _ = wait(list(decoding) + list(transcribing), return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in decoding:
+                        video_path = decoding.pop(future)
+                        try:
+                            ready.append((video_path, future.result()))
+                        except Exception as e:
+                            print(f"Erreur de décodage audio pour {video_path.name}: {e}")
+                            yield video_path, None, f"décodage audio: {e}"
+                    else:
+                        video_path = transcribing.pop(future)
+                        try:
+                            transcription, seconds = future.result()
+                        except Exception as e:
+                            print(f"Erreur de transcription pour {video_path.name}: {e}")
+                            yield video_path, None, f"transcription: {e}"
+                            continue
+                        self.metrics.setdefault(video_path.name, {})['transcribe_seconds'] = seconds
+                        if self.cache:
+                            self.cache.set(keys[video_path], transcription)
+                        yield video_path, transcription, None
+    
+    def _timed_load_audio(self, video_path: Path):
+        """Décode l'audio et mémorise la durée de décodage"""
+        start = time.perf_counter()
+        audio = load_audio(video_path)
+        self.metrics[video_path.name] = {'decode_seconds': time.perf_counter() - start}
+        return audio
     
     def transcribe_audio(self, audio_path: Path, language: str = "fr") -> dict:
         """
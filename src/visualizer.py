@@ -1,18 +1,25 @@
 """
 Module de visualisation des résultats d'analyse
 """
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.graph_objects as go
-import plotly.express as px
-from wordcloud import WordCloud
-import pandas as pd
 from typing import Dict, List
 import re
 
-# Configuration matplotlib pour le français
-plt.rcParams['font.family'] = 'DejaVu Sans'
-sns.set_style("whitegrid")
+_style_configured = False
+
+
+def _pyplot():
+    """Importe matplotlib à la première utilisation et applique le style du projet"""
+    global _style_configured
+    import matplotlib.pyplot as plt
+    
+    if not _style_configured:
+        import seaborn as sns
+        
+        # Configuration matplotlib pour le français
+        plt.rcParams['font.family'] = 'DejaVu Sans'
+        sns.set_style("whitegrid")
+        _style_configured = True
+    return plt
 
 class ResultVisualizer:
     """Gestionnaire de visualisations des résultats"""
@@ -23,7 +30,9 @@ class ResultVisualizer:
             'faux': '#e74c3c',
             'partiellement_vrai': '#f39c12',
             'probablement_vrai': '#3498db',
-            'non_verifie': '#95a5a6'
+            'non_verifie': '#95a5a6',
+            'non_verifiable': '#bdc3c7',
+            'echec_recherche': '#7f8c8d'
         }
     
     def create_credibility_chart(self, results: List[Dict], save_path: str = None):
@@ -34,6 +43,8 @@ class ResultVisualizer:
             results: Liste des résultats d'analyse
             save_path: Chemin pour sauvegarder le graphique
         """
+        plt = _pyplot()
+        
         titles = [r.get('title', f"Vidéo {i+1}") for i, r in enumerate(results)]
         scores = [r.get('credibility_score', 0) for r in results]
         
@@ -62,6 +73,8 @@ class ResultVisualizer:
             results: Liste des résultats d'analyse
             save_path: Chemin pour sauvegarder le graphique
         """
+        plt = _pyplot()
+        
         verdicts = {}
         for result in results:
             verdict = result.get('verdict', 'non_verifie')
@@ -88,6 +101,9 @@ class ResultVisualizer:
             results: Liste des résultats d'analyse avec dates
             save_path: Chemin pour sauvegarder le graphique
         """
+        import pandas as pd
+        plt = _pyplot()
+        
         dates = []
         scores = []
         
@@ -127,6 +143,9 @@ class ResultVisualizer:
             transcriptions: Liste des textes transcrits
             save_path: Chemin pour sauvegarder le graphique
         """
+        from wordcloud import WordCloud
+        plt = _pyplot()
+        
         # Combiner tous les textes
         text = ' '.join(transcriptions)
         
@@ -167,6 +186,9 @@ class ResultVisualizer:
             results: Liste des résultats d'analyse
             save_path: Chemin pour sauvegarder le HTML
         """
+        import pandas as pd
+        import plotly.express as px
+        
         df = pd.DataFrame(results)
         
         # Graphique 1: Scores de crédibilité
@@ -0,0 +1,139 @@
+"""
+Tests des analyses LLM concurrentes contre un serveur HTTP local imitant les trois providers
+"""
+import http.server
+import json
+import threading
+import time
+
+import pytest
+
+from src.analyzer import LLMAnalyzer
+from src.config import Config
+
+LATENCY = 0.1
+
+
+class ProviderStub(http.server.BaseHTTPRequestHandler):
+    """Réponses minimales d'Ollama, d'OpenAI et d'Anthropic, avec une latence fixe"""
+
+    protocol_version = "HTTP/1.1"
+    lock = threading.Lock()
+    active = 0
+    max_active = 0
+    requests = 0
+    connections = set()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        cls = type(self)
+        with cls.lock:
+            cls.requests += 1
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+            cls.connections.add(self.client_address)
+        try:
+            time.sleep(LATENCY)
+            self._reply(self._response(body))
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def _response(self, body):
+        if self.path == "/api/generate":
+            return {'response': "Analyse locale", 'done': True, 'eval_count': 5, 'prompt_eval_count': 10}
+        if self.path == "/v1/chat/completions":
+            return {
+                'id': "chatcmpl-1", 'object': "chat.completion", 'created': 0, 'model': body['model'],
+                'choices': [{'index': 0, 'finish_reason': "stop",
+                             'message': {'role': "assistant", 'content': "Analyse OpenAI"}}],
+                'usage': {'prompt_tokens': 10, 'completion_tokens': 5, 'total_tokens': 15}
+            }
+        return {
+            'id': "msg_1", 'type': "message", 'role': "assistant", 'model': body['model'],
+            'content': [{'type': "text", 'text': "Analyse Anthropic"}],
+            'stop_reason': "end_turn", 'stop_sequence': None,
+            'usage': {'input_tokens': 10, 'output_tokens': 5}
+        }
+
+    def _reply(self, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', "application/json")
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url(monkeypatch, tmp_path):
+    ProviderStub.active = ProviderStub.max_active = ProviderStub.requests = 0
+    ProviderStub.connections = set()
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), ProviderStub)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{httpd.server_port}"
+
+    monkeypatch.setattr(Config, 'LOCAL_LLM_URL', url)
+    monkeypatch.setenv("OPENAI_BASE_URL", f"{url}/v1")
+    monkeypatch.setenv("ANTHROPIC_BASE_URL", url)
+    monkeypatch.setattr(Config, 'OPENAI_API_KEY', "test")
+    monkeypatch.setattr(Config, 'ANTHROPIC_API_KEY', "test")
+    monkeypatch.setattr(Config, 'CACHE_DIR', tmp_path)
+    monkeypatch.setattr(Config, 'LLM_RATE_LIMITS', {'openai': 0, 'anthropic': 0, 'local': 0})
+    yield url
+    httpd.shutdown()
+
+
+@pytest.mark.parametrize("provider, sdk, expected", [
+    ("local", "httpx", "Analyse locale"),
+    ("openai", "openai", "Analyse OpenAI"),
+    ("anthropic", "anthropic", "Analyse Anthropic"),
+])
+def test_analyze_many_runs_requests_concurrently(stub_url, provider, sdk, expected):
+    pytest.importorskip(sdk)
+    if provider == "local":
+        pytest.importorskip("requests")
+    analyzer = LLMAnalyzer(provider, cache_mode="off")
+    transcriptions = [f"transcription {i}" for i in range(32)]
+
+    start = time.perf_counter()
+    results = analyzer.analyze_many(transcriptions, concurrency=8)
+    elapsed = time.perf_counter() - start
+
+    assert [result['analysis'] for result in results] == [expected] * len(transcriptions)
+    assert results[0]['usage'] == {'input_tokens': 10, 'output_tokens': 5}
+    assert 4 <= ProviderStub.max_active <= 8
+    # 32 appels de 100 ms en série prendraient 3,2 s
+    assert elapsed < len(transcriptions) * LATENCY / 2
+    # Connexions réutilisées (keep-alive) plutôt qu'une par requête
+    assert len(ProviderStub.connections) <= 8
+
+
+def test_rate_limit_spaces_requests(stub_url, monkeypatch):
+    pytest.importorskip("httpx")
+    pytest.importorskip("requests")
+    monkeypatch.setattr(Config, 'LLM_RATE_LIMITS', {'openai': 0, 'anthropic': 0, 'local': 600})
+    analyzer = LLMAnalyzer("local", cache_mode="off")
+    analyzer.rate_limiter.burst = 1
+    analyzer.rate_limiter._tokens = 1
+
+    start = time.perf_counter()
+    analyzer.analyze_many([f"transcription {i}" for i in range(6)], concurrency=8)
+
+    # 10 requêtes par seconde: 5 intervalles de 100 ms après la première
+    assert time.perf_counter() - start >= 0.45
+
+
+def test_local_session_reuses_connection(stub_url):
+    pytest.importorskip("requests")
+    analyzer = LLMAnalyzer("local", cache_mode="off")
+
+    for i in range(3):
+        assert analyzer.analyze_content(f"transcription {i}")['analysis'] == "Analyse locale"
+
+    assert ProviderStub.requests == 3
+    assert len(ProviderStub.connections) == 1
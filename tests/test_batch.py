@@ -0,0 +1,311 @@
+"""
+Tests des analyses par lots (reprise et échecs partiels): client Anthropic factice, et serveur
+HTTP local imitant les API files/batches d'OpenAI et l'API generate d'Ollama
+"""
+import http.server
+import json
+import re
+import sys
+import threading
+import types
+from itertools import count
+
+import pytest
+
+from src.analyzer import LLMAnalyzer
+from src.batch import BatchAnalyzer
+from src.config import Config
+
+
+def _namespace(**kwargs):
+    return types.SimpleNamespace(**kwargs)
+
+
+class FakeMessage:
+    def __init__(self, text):
+        self.content = [_namespace(type="text", text=text)]
+        self.usage = _namespace(input_tokens=10, output_tokens=5)
+
+    def model_dump(self):
+        return {'text': self.content[0].text}
+
+
+class FakeBatches:
+    """API messages.batches d'Anthropic: chaque lot se termine au second suivi"""
+
+    def __init__(self):
+        self.submitted = []
+        self.outcomes = {}
+        self._polls = {}
+        self._ids = count(1)
+
+    def create(self, requests):
+        batch_id = f"batch_{next(self._ids)}"
+        self.submitted.append([request['custom_id'] for request in requests])
+        self._polls[batch_id] = 0
+        return _namespace(id=batch_id)
+
+    def retrieve(self, batch_id):
+        self._polls[batch_id] += 1
+        return _namespace(processing_status="ended" if self._polls[batch_id] > 1 else "in_progress")
+
+    def results(self, batch_id):
+        index = int(batch_id.split('_')[1]) - 1
+        for custom_id in self.submitted[index]:
+            outcome = self.outcomes.get(custom_id, "succeeded")
+            message = FakeMessage(f"Analyse {custom_id}") if outcome == "succeeded" else None
+            yield _namespace(custom_id=custom_id, result=_namespace(type=outcome, message=message))
+
+
+@pytest.fixture
+def analyzer(tmp_path, monkeypatch):
+    batches = FakeBatches()
+    client = _namespace(messages=_namespace(batches=batches))
+    monkeypatch.setitem(sys.modules, 'anthropic', _namespace(Anthropic=lambda **kwargs: client))
+    monkeypatch.setattr(Config, 'ANTHROPIC_API_KEY', "test")
+    monkeypatch.setattr(Config, 'CACHE_DIR', tmp_path)
+    return LLMAnalyzer("anthropic", cache_mode="off")
+
+
+def test_resume_after_interruption(analyzer, tmp_path):
+    batches = analyzer.client.messages.batches
+    texts = [f"transcription {i}" for i in range(3)]
+
+    assert BatchAnalyzer(analyzer, poll_interval=0).run(texts, wait=False) is None
+
+    # Reprise par un nouvel objet (processus redémarré): le lot n'est pas resoumis
+    results = BatchAnalyzer(analyzer, poll_interval=0).run(texts)
+
+    assert len(batches.submitted) == 1
+    assert all(result['analysis'].startswith("Analyse ") for result in results)
+    assert not list((tmp_path / "batches").glob("*.json"))
+    assert len(list((tmp_path / "batches" / "done").glob("*.json"))) == 1
+
+
+def test_expired_requests_are_requeued(analyzer):
+    batches = analyzer.client.messages.batches
+    texts = [f"transcription {i}" for i in range(3)]
+    batch = BatchAnalyzer(analyzer, poll_interval=0)
+    batch.run(texts, wait=False)
+    expired = batch.job.state['pending'][1]
+    batches.outcomes = {expired: "expired"}
+
+    results = batch.run(texts)
+
+    assert sum(1 for result in results if result.get('error')) == 1
+    assert batch.job.state['pending'] == [expired]
+    assert batch.job.state['batch_id'] is None
+
+    # La reprise suivante soumet seulement la requête expirée
+    batches.outcomes = {}
+    results = BatchAnalyzer(analyzer, poll_interval=0).run(texts)
+
+    assert batches.submitted[1] == [expired]
+    assert not any(result.get('error') for result in results)
+
+
+def test_errored_requests_are_not_resubmitted(analyzer):
+    batches = analyzer.client.messages.batches
+    texts = ["transcription a", "transcription b"]
+    batch = BatchAnalyzer(analyzer, poll_interval=0)
+    batch.run(texts, wait=False)
+    batches.outcomes = {batch.job.state['pending'][0]: "errored"}
+
+    results = batch.run(texts)
+
+    assert [bool(result.get('error')) for result in results] == [True, False]
+    assert len(batches.submitted) == 1
+
+
+def test_default_job_name_depends_on_requests(analyzer):
+    BatchAnalyzer(analyzer, poll_interval=0).run(["transcription a"])
+
+    # Un lot terminé n'empêche pas un nouveau lot avec d'autres transcriptions
+    results = BatchAnalyzer(analyzer, poll_interval=0).run(["transcription b"])
+
+    assert not results[0].get('error')
+    assert len(analyzer.client.messages.batches.submitted) == 2
+
+
+def test_named_job_with_other_requests_is_rejected(analyzer):
+    BatchAnalyzer(analyzer, "nuit", poll_interval=0).run(["transcription a"], wait=False)
+
+    with pytest.raises(ValueError):
+        BatchAnalyzer(analyzer, "nuit", poll_interval=0).run(["transcription b"], wait=False)
+
+
+class BatchServerStub(http.server.BaseHTTPRequestHandler):
+    """
+    API files/batches d'OpenAI et generate d'Ollama
+
+    Un lot OpenAI est terminé au second suivi; les requêtes dont le prompt contient
+    "erreur" vont dans le fichier d'erreurs. Si expire_next est vrai, le lot suivant
+    expire avec seulement sa première requête traitée. Ollama répond 500 une fois
+    pour chaque prompt contenant "panne".
+    """
+
+    protocol_version = "HTTP/1.1"
+    files = {}
+    batches = {}
+    submitted = []
+    expire_next = False
+    generated = []
+    failed_once = set()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        if self.path == "/v1/files":
+            requests = [json.loads(line) for line in re.findall(rb'^\{"custom_id".*$', body, re.MULTILINE)]
+            file_id = f"file-in-{len(self.files) + 1}"
+            self.files[file_id] = requests
+            return self._reply({'id': file_id, 'object': "file", 'bytes': len(body), 'created_at': 0,
+                                'filename': "batch.jsonl", 'purpose': "batch", 'status': "processed"})
+        if self.path == "/v1/batches":
+            request = json.loads(body)
+            batch_id = f"batch_{len(self.batches) + 1}"
+            cls = type(self)
+            self.batches[batch_id] = {'input': request['input_file_id'], 'polls': 0, 'expire': cls.expire_next}
+            cls.expire_next = False
+            self.submitted.append([r['custom_id'] for r in self.files[request['input_file_id']]])
+            return self._reply(self._batch(batch_id))
+        if self.path == "/api/generate":
+            prompt = json.loads(body)['prompt']
+            self.generated.append(prompt)
+            marker = re.search(r'transcription \w+', prompt).group(0)
+            if "panne" in prompt and marker not in self.failed_once:
+                self.failed_once.add(marker)
+                return self._reply({'error': "surcharge"}, status=500)
+            return self._reply({'response': f"Analyse {marker}", 'done': True,
+                                'eval_count': 5, 'prompt_eval_count': 10})
+        self._reply({'error': "inconnu"}, status=404)
+
+    def do_GET(self):
+        match = re.fullmatch(r'/v1/batches/(\w+)', self.path)
+        if match:
+            self.batches[match.group(1)]['polls'] += 1
+            return self._reply(self._batch(match.group(1)))
+        match = re.fullmatch(r'/v1/files/([\w-]+)/content', self.path)
+        if match:
+            data = self.files[match.group(1)].encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', "application/jsonl")
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            return self.wfile.write(data)
+        self._reply({'error': "inconnu"}, status=404)
+
+    def _batch(self, batch_id):
+        batch = self.batches[batch_id]
+        payload = {'id': batch_id, 'object': "batch", 'endpoint': "/v1/chat/completions",
+                   'input_file_id': batch['input'], 'completion_window': "24h", 'created_at': 0,
+                   'status': "in_progress", 'output_file_id': None, 'error_file_id': None}
+        if batch['polls'] < 2:
+            return payload
+        requests = self.files[batch['input']]
+        if batch['expire']:
+            requests = requests[:1]
+        output, errors = [], []
+        for request in requests:
+            prompt = request['body']['messages'][-1]['content']
+            if "erreur" in prompt:
+                error = {'error': {'message': "requête invalide"}}
+                errors.append({'id': "req", 'custom_id': request['custom_id'], 'error': None,
+                               'response': {'status_code': 400, 'body': error}})
+            else:
+                completion = {
+                    'id': "chatcmpl-1", 'object': "chat.completion", 'created': 0,
+                    'model': request['body']['model'],
+                    'choices': [{'index': 0, 'finish_reason': "stop",
+                                 'message': {'role': "assistant", 'content': f"Analyse {request['custom_id']}"}}],
+                    'usage': {'prompt_tokens': 10, 'completion_tokens': 5, 'total_tokens': 15}
+                }
+                output.append({'id': "req", 'custom_id': request['custom_id'], 'error': None,
+                               'response': {'status_code': 200, 'body': completion}})
+        for suffix, lines in (('out', output), ('err', errors)):
+            if lines:
+                self.files[f"file-{suffix}-{batch_id}"] = "\n".join(json.dumps(line) for line in lines)
+                payload[f"{'output' if suffix == 'out' else 'error'}_file_id"] = f"file-{suffix}-{batch_id}"
+        payload['status'] = "expired" if batch['expire'] else "completed"
+        return payload
+
+    def _reply(self, payload, status=200):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', "application/json")
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def batch_server(tmp_path, monkeypatch):
+    BatchServerStub.files, BatchServerStub.batches, BatchServerStub.submitted = {}, {}, []
+    BatchServerStub.expire_next = False
+    BatchServerStub.generated, BatchServerStub.failed_once = [], set()
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), BatchServerStub)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{httpd.server_port}"
+
+    monkeypatch.setattr(Config, 'LOCAL_LLM_URL', url)
+    monkeypatch.setenv("OPENAI_BASE_URL", f"{url}/v1")
+    monkeypatch.setattr(Config, 'OPENAI_API_KEY', "test")
+    monkeypatch.setattr(Config, 'CACHE_DIR', tmp_path)
+    monkeypatch.setattr(Config, 'LLM_RATE_LIMITS', {'openai': 0, 'anthropic': 0, 'local': 0})
+    yield url
+    httpd.shutdown()
+
+
+def test_openai_batch_parses_output_and_error_files(batch_server, tmp_path):
+    pytest.importorskip("openai")
+    analyzer = LLMAnalyzer("openai", cache_mode="off")
+    texts = ["transcription a", "transcription erreur", "transcription c"]
+
+    assert BatchAnalyzer(analyzer, poll_interval=0).run(texts, wait=False) is None
+    results = BatchAnalyzer(analyzer, poll_interval=0).run(texts)
+
+    assert len(BatchServerStub.submitted) == 1
+    assert [bool(result.get('error')) for result in results] == [False, True, False]
+    assert "requête invalide" in results[1]['error']
+    assert results[0]['analysis'].startswith("Analyse ")
+    assert results[0]['usage'] == {'input_tokens': 10, 'output_tokens': 5}
+    assert len(list((tmp_path / "batches" / "done").glob("*.json"))) == 1
+
+
+def test_openai_expired_batch_resubmits_missing_requests(batch_server):
+    pytest.importorskip("openai")
+    analyzer = LLMAnalyzer("openai", cache_mode="off")
+    texts = ["transcription a", "transcription b", "transcription c"]
+    BatchServerStub.expire_next = True
+
+    results = BatchAnalyzer(analyzer, poll_interval=0).run(texts)
+
+    assert [bool(result.get('error')) for result in results] == [False, True, True]
+    results = BatchAnalyzer(analyzer, poll_interval=0).run(texts)
+
+    first, second = BatchServerStub.submitted
+    assert second == first[1:]
+    assert not any(result.get('error') for result in results)
+
+
+def test_local_queue_resumes_after_a_failure(batch_server, tmp_path):
+    pytest.importorskip("requests")
+    analyzer = LLMAnalyzer("local", cache_mode="off")
+    texts = ["transcription a", "transcription panne", "transcription c"]
+
+    results = BatchAnalyzer(analyzer, poll_interval=0).run(texts)
+
+    assert [bool(result.get('error')) for result in results] == [False, True, False]
+    assert len(list((tmp_path / "batches").glob("*.json"))) == 1
+
+    # La reprise ne renvoie que la requête en échec
+    BatchServerStub.generated = []
+    results = BatchAnalyzer(analyzer, poll_interval=0).run(texts)
+
+    assert len(BatchServerStub.generated) == 1 and "transcription panne" in BatchServerStub.generated[0]
+    assert [result['analysis'] for result in results] == [
+        "Analyse transcription a", "Analyse transcription panne", "Analyse transcription c"]
+    assert not list((tmp_path / "batches").glob("*.json"))
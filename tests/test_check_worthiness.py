@@ -0,0 +1,64 @@
+"""
+Tests du filtre de vérifiabilité: affirmations retenues et opinions écartées
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from src.check_worthiness import CheckWorthinessScorer
+
+FIXTURES = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures" / "check_worthiness.json"
+
+RETAINED = [
+    "La Terre est plate",
+    "La terre est plate",
+    "la terre est plate",
+    "Le gouvernement cache la vérité",
+    "Le vaccin modifie l'ADN",
+    "le vaccin modifie l'adn",
+    "Le chômage a baissé de 2% en 2023",
+    "L'OMS a déclaré la pandémie en mars 2020",
+    "l'oms a déclaré la pandémie en mars 2020",
+    "Trop de sucre provoque le diabète",
+    "Les vaccins contiennent vraiment des puces électroniques",
+    "Le vaccin est complètement inefficace contre le variant Omicron",
+]
+
+SKIPPED = [
+    "Je pense que c'est nul",
+    "Franchement j'adore cette vidéo !",
+    "C'est génial non ?",
+    "Abonnez-vous !",
+    "À mon avis le film est trop long",
+    "Moi je trouve ça magnifique",
+    "c'est vraiment trop drôle",
+    "C'est complètement ridicule",
+]
+
+
+@pytest.mark.parametrize("claim", RETAINED)
+def test_factual_claims_are_retained(claim):
+    assert CheckWorthinessScorer().is_checkable(claim)
+
+
+@pytest.mark.parametrize("claim", SKIPPED)
+def test_opinions_are_skipped(claim):
+    assert not CheckWorthinessScorer().is_checkable(claim)
+
+
+def test_entities_do_not_depend_on_case():
+    scorer = CheckWorthinessScorer()
+
+    assert scorer.score("la terre est plate") == scorer.score("La Terre est plate")
+    assert scorer.score("l'oms a déclaré la pandémie") == scorer.score("L'OMS a déclaré la pandémie")
+
+
+def test_weights_fit_the_labelled_fixture():
+    with open(FIXTURES, 'r', encoding='utf-8') as f:
+        fixtures = json.load(f)
+    scorer = CheckWorthinessScorer()
+
+    correct = sum(scorer.is_checkable(fixture['claim']) == fixture['checkable'] for fixture in fixtures)
+
+    assert correct / len(fixtures) >= 0.95
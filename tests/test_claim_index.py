@@ -0,0 +1,60 @@
+"""
+Tests du regroupement des affirmations quasi identiques
+"""
+from src.claim_index import ClaimIndex, normalize_claim, quantities
+
+
+def test_rephrasings_are_merged():
+    clusters = ClaimIndex().cluster([
+        "Le vaccin modifie l'ADN humain",
+        "Le vaccin modifie l ADN humain !",
+    ])
+
+    assert list(clusters.values()) == [["Le vaccin modifie l'ADN humain", "Le vaccin modifie l ADN humain !"]]
+
+
+def test_opposite_claims_are_not_merged():
+    pairs = [
+        ("Le vaccin modifie l ADN humain", "Le vaccin ne modifie pas l ADN humain"),
+        ("Le réchauffement climatique est dû à l homme", "Le réchauffement climatique n est pas dû à l homme"),
+        ("La 5G propage le coronavirus", "La 5G ne propage plus le coronavirus"),
+    ]
+    for claim, negated in pairs:
+        assert len(ClaimIndex().cluster([claim, negated])) == 2
+
+
+def test_normalization_keeps_negations():
+    assert normalize_claim("Le vaccin n'est pas dangereux") == "vaccin n pas dangereux"
+
+
+def test_claims_with_different_numbers_are_not_merged():
+    pairs = [
+        ("La France compte 68 millions d'habitants", "La France compte 86 millions d'habitants"),
+        ("Il faut prendre 5 mg de vitamine D par jour", "Il faut prendre 50 mg de vitamine D par jour"),
+        ("Le vaccin est efficace à 95 %", "Le vaccin est efficace à 59 %"),
+        ("Le chômage a baissé de 2,5 % en 2023", "Le chômage a baissé de 2,5 % en 2022"),
+        ("Le smic augmente de 5 euros", "Le smic augmente de 5 millions"),
+    ]
+    for claim, variant in pairs:
+        assert len(ClaimIndex().cluster([claim, variant])) == 2
+
+
+def test_numeric_variants_stay_separate_in_large_batches():
+    claims = [f"La dette publique atteint {n} milliards d'euros" for n in range(100, 150)]
+
+    assert len(ClaimIndex().cluster(claims)) == 50
+
+
+def test_same_numbers_are_still_merged():
+    clusters = ClaimIndex().cluster([
+        "La France compte 68 millions d'habitants",
+        "La France compte 68 millions d habitants !",
+        "La france compte 68millions d'habitants",
+    ])
+
+    assert len(clusters) == 1
+
+
+def test_quantities_keep_units_and_decimals():
+    assert quantities("Le chômage a baissé de 2,5% en 2023") == {"2.5 %", "2023"}
+    assert quantities("5 mg par jour") == {"5 mg"}
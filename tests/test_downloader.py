@@ -0,0 +1,112 @@
+"""
+Tests du gestionnaire de téléchargement contre un serveur HTTP local servant des médias de test
+"""
+import functools
+import http.server
+import threading
+
+import pytest
+
+from src.downloader import DownloadManifest, TikTokDownloader
+
+VIDEO_IDS = ['v1', 'v2', 'v3']
+
+
+class CountingHandler(http.server.SimpleHTTPRequestHandler):
+    """Sert les fichiers de test et compte les médias demandés"""
+
+    media_requests = []
+
+    def do_GET(self):
+        if self.path.endswith('.mp4'):
+            self.media_requests.append(self.path)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server(tmp_path):
+    pytest.importorskip("yt_dlp")
+    root = tmp_path / "www"
+    for video_id in VIDEO_IDS:
+        page_dir = root / video_id
+        page_dir.mkdir(parents=True)
+        # Toutes les vidéos portent le même titre
+        (page_dir / "index.html").write_text(
+            f'<html><head><title>Même titre</title>'
+            f'<meta property="og:video" content="/{video_id}/clip.mp4"></head>'
+            f'<body><video src="/{video_id}/clip.mp4"></video></body></html>',
+            encoding='utf-8'
+        )
+        (page_dir / "clip.mp4").write_bytes(video_id.encode() * 2000)
+
+    CountingHandler.media_requests = []
+    httpd = http.server.ThreadingHTTPServer(
+        ('127.0.0.1', 0), functools.partial(CountingHandler, directory=str(root)))
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+
+def entries(base_url, ids):
+    return [{'id': video_id, 'url': f"{base_url}/{video_id}/", 'title': ''} for video_id in ids]
+
+
+def test_parallel_downloads_keep_one_file_per_video(server, tmp_path):
+    with TikTokDownloader(output_dir=tmp_path / "videos") as downloader:
+        records = list(downloader.iter_user_videos("compte", entries=entries(server, VIDEO_IDS), max_workers=3))
+
+    paths = {record['id']: record['path'] for record in records}
+    assert sorted(paths) == VIDEO_IDS
+    assert len(set(paths.values())) == len(VIDEO_IDS)
+    for video_id, path in paths.items():
+        assert path.read_bytes() == video_id.encode() * 2000
+
+
+def test_rerun_fetches_only_new_videos(server, tmp_path):
+    with TikTokDownloader(output_dir=tmp_path / "videos") as downloader:
+        list(downloader.iter_user_videos("compte", entries=entries(server, VIDEO_IDS[:2])))
+    assert len(CountingHandler.media_requests) == 2
+
+    with TikTokDownloader(output_dir=tmp_path / "videos") as downloader:
+        records = list(downloader.iter_user_videos("compte", entries=entries(server, VIDEO_IDS)))
+
+    assert sorted(record['id'] for record in records) == VIDEO_IDS
+    assert CountingHandler.media_requests[2:] == ["/v3/clip.mp4"]
+
+
+def test_manifest_entry_from_another_mode_is_a_miss(tmp_path):
+    (tmp_path / "clip [v1].opus").write_bytes(b"audio")
+    manifest = DownloadManifest(tmp_path / "manifest.json")
+    manifest.record('v1', tmp_path / "clip [v1].opus", TikTokDownloader(tmp_path, audio_only=True).mode)
+
+    reloaded = DownloadManifest(tmp_path / "manifest.json")
+
+    assert reloaded.complete_path('v1', "audio:opus") == tmp_path / "clip [v1].opus"
+    assert reloaded.complete_path('v1', TikTokDownloader(tmp_path).mode) is None
+    assert reloaded.complete_path('v1', "audio:wav") is None
+
+
+def test_zero_retries_still_downloads_once(server, tmp_path):
+    with TikTokDownloader(output_dir=tmp_path / "videos") as downloader:
+        records = list(downloader.iter_user_videos("compte", entries=entries(server, VIDEO_IDS[:1]), retries=0))
+
+    assert [record['id'] for record in records] == ['v1']
+    assert CountingHandler.media_requests == ["/v1/clip.mp4"]
+
+
+def test_video_info_does_not_require_an_mp4_format(server, tmp_path):
+    webm_dir = tmp_path / "www" / "webm"
+    webm_dir.mkdir()
+    (webm_dir / "index.html").write_text(
+        '<html><head><title>Sans mp4</title></head>'
+        '<body><video src="/webm/clip.webm"></video></body></html>', encoding='utf-8')
+    (webm_dir / "clip.webm").write_bytes(b"webm" * 2000)
+
+    with TikTokDownloader(output_dir=tmp_path / "videos") as downloader:
+        info = downloader.get_video_info(f"{server}/webm/")
+
+    assert info['title'].startswith("Sans mp4")
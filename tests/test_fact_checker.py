@@ -0,0 +1,127 @@
+"""
+Tests de la vérification des faits avec l'index local et un backend de recherche factice
+"""
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.config import Config
+from src.fact_checker import FactChecker
+from src.local_index import LocalIndexBackend
+from src.search import SearchBackend, SearchEngine
+
+AFP_ARTICLE = {
+    'title': "Non, le vaccin contre la COVID-19 ne modifie pas l'ADN",
+    'url': "https://factuel.afp.com/vaccin-adn",
+    'snippet': "C'est faux: le vaccin contre la COVID-19 ne modifie pas l'ADN humain.",
+    'source': "factuel.afp.com"
+}
+
+
+class RecordingBackend(SearchBackend):
+    """Backend factice: enregistre les requêtes et retourne un résultat fixe"""
+
+    name = "fake"
+    combined_sites = True
+
+    def __init__(self):
+        self.queries = []
+
+    def text(self, query, max_results, timeout=None):
+        self.queries.append(query)
+        url = f"https://factuel.afp.com/resultat-{len(self.queries)}"
+        return [{'title': "Résultat", 'href': url, 'body': "Texte"}]
+
+
+@pytest.fixture
+def checker(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'EVIDENCE_TOP_N', 0)
+    local_index = LocalIndexBackend(tmp_path / "factchecks.sqlite")
+    local_index.ingest([AFP_ARTICLE])
+    backend = RecordingBackend()
+    engine = SearchEngine(backends={backend.name: backend}, max_retries=0)
+    return FactChecker(engine=engine, use_cache=False, local_index=local_index), backend
+
+
+def test_strong_local_match_skips_network(checker):
+    fact_checker, backend = checker
+    claim = "Le vaccin contre la COVID-19 modifie l'ADN"
+
+    result = fact_checker.verify_claims([claim], prefilter=False)[claim]
+
+    assert result['resolved_locally']
+    assert result['verdict'] == 'faux'
+    assert backend.queries == []
+
+
+@pytest.mark.parametrize("claim", [
+    "Le vaccin ARN est efficace à 95% contre la COVID-19 selon Pfizer",
+    "Les masques ne protègent pas contre la COVID-19",
+])
+def test_weak_local_match_searches_network(checker, claim):
+    fact_checker, backend = checker
+
+    result = fact_checker.verify_claims([claim], prefilter=False)[claim]
+
+    assert not result.get('resolved_locally')
+    assert backend.queries
+    # L'article local reste une preuve parmi les résultats de la recherche
+    urls = [r['url'] for r in result['fact_checking_results']]
+    if fact_checker.local_index.text(f"{claim} site:factuel.afp.com", max_results=10):
+        assert AFP_ARTICLE['url'] in urls
+
+
+def test_stale_local_articles_are_ignored(checker, monkeypatch):
+    fact_checker, backend = checker
+    monkeypatch.setattr(Config, 'LOCAL_INDEX_TTL', 3600)
+    fact_checker.local_index._conn.execute("UPDATE articles SET fetched_at = fetched_at - 7200")
+    claim = "Le vaccin contre la COVID-19 modifie l'ADN"
+
+    result = fact_checker.verify_claims([claim], prefilter=False)[claim]
+
+    assert not result.get('resolved_locally')
+    assert backend.queries
+
+
+def test_local_match_requires_the_same_numbers(checker):
+    fact_checker, backend = checker
+    fact_checker.local_index.ingest([{
+        'title': "Non, la France ne compte pas 86 millions d'habitants",
+        'url': "https://factuel.afp.com/population",
+        'snippet': "C'est faux: la France compte 68 millions d'habitants.",
+        'source': "factuel.afp.com"
+    }])
+    claim = "La France compte 68 millions d'habitants"
+
+    result = fact_checker.verify_claims([claim], prefilter=False)[claim]
+
+    assert not result.get('resolved_locally')
+    assert backend.queries
+
+
+class FakeEvidenceFetcher:
+    """Pages lues: texte complet, ou vide si la lecture échoue"""
+
+    def __init__(self, readable=True):
+        self.readable = readable
+
+    def fetch_many(self, urls):
+        return {url: {'text': f"Texte complet de {url}" if self.readable else ''} for url in urls}
+
+
+@pytest.mark.parametrize("readable", [True, False])
+def test_index_stores_fetched_page_text(checker, monkeypatch, readable):
+    fact_checker, backend = checker
+    monkeypatch.setattr(Config, 'EVIDENCE_TOP_N', 3)
+    fact_checker.evidence_fetcher = FakeEvidenceFetcher(readable)
+    claim = "Les éoliennes tuent des millions d'oiseaux"
+
+    result = fact_checker.verify_claims([claim], prefilter=False)[claim]
+
+    rows = dict(fact_checker.local_index._conn.execute("SELECT url, body FROM articles").fetchall())
+    url = result['fact_checking_results'][0]['url']
+    if readable:
+        assert rows[url] == f"Texte complet de {url}"
+    else:
+        # Un résultat dont la page n'a pas été lue n'est pas indexé sur son seul extrait
+        assert set(rows) == {AFP_ARTICLE['url']}
@@ -0,0 +1,80 @@
+"""
+Tests du pipeline en flux avec des étapes factices (mode incrémental)
+"""
+from pathlib import Path
+
+import pytest
+
+from src.config import Config
+from src.pipeline import Pipeline
+
+
+class FakeDownloader:
+    def __init__(self, ids):
+        self.ids = ids
+
+    def list_user_videos(self, username, max_videos):
+        return [{'id': video_id, 'url': '', 'title': video_id} for video_id in self.ids[:max_videos]]
+
+    def iter_user_videos(self, username, max_videos, entries=None):
+        for entry in entries if entries is not None else self.list_user_videos(username, max_videos):
+            yield {'id': entry['id'], 'path': Path(f"{entry['id']}.mp4"), 'metadata': {'title': entry['id']}}
+
+
+class FakeTranscriber:
+    def transcribe_video(self, video_path, language="fr"):
+        return {'text': f"transcription {video_path.stem}", 'segments': []}
+
+
+class FakeAnalyzer:
+    """Analyse en échec (sans exception) pour les vidéos listées dans failing"""
+
+    provider = "fake"
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.analyzed = []
+
+    def analyze_content(self, transcription, video_metadata=None):
+        self.analyzed.append(video_metadata['id'])
+        if video_metadata['id'] in self.failing:
+            return {'provider': self.provider, 'analysis': '', 'error': "JSON invalide"}
+        claims = [{'claim': f"affirmation {video_metadata['id']}"}]
+        return {'provider': self.provider, 'analysis': "ok", 'claims': claims}
+
+
+class FakeFactChecker:
+    def verify_claims(self, claims, language="fr", search_budget=None):
+        return {claim: {'claim': claim, 'credibility_score': 70, 'verdict': 'vrai', 'sources': []}
+                for claim in claims}
+
+
+@pytest.fixture(autouse=True)
+def output_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'OUTPUT_DIR', tmp_path)
+
+
+def make_pipeline(analyzer):
+    return Pipeline(downloader=FakeDownloader(['v1', 'v2', 'v3']), transcriber=FakeTranscriber(),
+                    analyzer=analyzer, fact_checker=FakeFactChecker(), storage=object())
+
+
+def test_analysis_error_is_recorded_as_failure_and_retried():
+    analyzer = FakeAnalyzer(failing={'v2'})
+    pipeline = make_pipeline(analyzer)
+
+    results = pipeline.run_user("compte", 3, incremental=True)
+
+    assert [video['title'] for video in results['videos']] == ['v1', 'v3']
+    video = pipeline.manifest.videos['v2']
+    assert video['status'] == 'failed'
+    assert video['failed_stage'] == 'analyse'
+    assert 'analyse' not in video['stages']
+
+    # Au passage suivant, seule la vidéo en échec est retraitée
+    analyzer = FakeAnalyzer()
+    pipeline = make_pipeline(analyzer)
+    pipeline.run_user("compte", 3, incremental=True)
+
+    assert analyzer.analyzed == ['v2']
+    assert pipeline.manifest.videos['v2']['status'] == 'done'
@@ -0,0 +1,81 @@
+"""
+Tests de la notation en lot des affirmations
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.scoring import EvidenceScorer
+
+FIXTURES = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures" / "fact_checks.json"
+
+
+@pytest.fixture(scope="module")
+def fixtures():
+    with open(FIXTURES, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_reference_verdicts(fixtures):
+    scored = EvidenceScorer().score_many(fixtures)
+
+    assert [result['verdict'] for result in scored] == [fixture['expected'] for fixture in fixtures]
+
+
+def test_shared_scorer_is_thread_safe(fixtures):
+    # Chaque thread note une variante unique, pour que tous étendent le vocabulaire en même temps
+    batches = [
+        [dict(fixture, claim=fixture['claim'] + ''.join(f" mot{thread}x{i}x{k}" for k in range(50)))
+         for i, fixture in enumerate(fixtures)]
+        for thread in range(200)
+    ]
+    expected = [EvidenceScorer().score_many(batch) for batch in batches]
+
+    shared = EvidenceScorer()
+    with ThreadPoolExecutor(max_workers=40) as executor:
+        concurrent = list(executor.map(shared.score_many, batches))
+
+    assert concurrent == expected
+
+
+def test_scores_do_not_depend_on_previous_batches(fixtures):
+    scorer = EvidenceScorer()
+    first = scorer.score_many(fixtures)
+
+    # Longue exécution: des milliers d'affirmations sans rapport sont notées entre-temps
+    for i in range(50):
+        scorer.score_many([dict(fixture, claim=f"sujet{i} sans rapport {fixture['claim']}") for fixture in fixtures])
+
+    assert scorer.score_many(fixtures) == first
+
+
+def test_vocabulary_cache_is_bounded(fixtures):
+    scorer = EvidenceScorer(max_vocabulary=400)
+    expected = EvidenceScorer().score_many(fixtures)
+
+    for i in range(20):
+        scorer.score_many([dict(fixture, claim=f"{fixture['claim']} mot{i}x{k}")
+                           for k, fixture in enumerate(fixtures)])
+        assert len(scorer._vocabulary) <= 400
+
+    assert scorer.score_many(fixtures) == expected
+
+
+def test_bounded_vocabulary_is_thread_safe(fixtures):
+    batches = [
+        [dict(fixture, claim=fixture['claim'] + ''.join(f" mot{thread}x{i}x{k}" for k in range(20)))
+         for i, fixture in enumerate(fixtures)]
+        for thread in range(100)
+    ]
+    expected = [EvidenceScorer().score_many(batch) for batch in batches]
+
+    # Le cache est vidé à de nombreuses reprises pendant que les threads notent
+    shared = EvidenceScorer(max_vocabulary=2000)
+    with ThreadPoolExecutor(max_workers=20) as executor:
+        concurrent = list(executor.map(shared.score_many, batches))
+
+    assert concurrent == expected
@@ -0,0 +1,119 @@
+"""
+Tests du moteur de recherche concurrent avec un backend factice à latence artificielle
+"""
+import threading
+import time
+
+import pytest
+
+from src.search import SearchBackend, SearchEngine, SearchQuery
+
+
+class SlowBackend(SearchBackend):
+    """Backend factice: latence fixe, requêtes simultanées comptées, échecs programmables"""
+
+    name = "fake"
+    combined_sites = True
+
+    def __init__(self, latency=0.05, failures=None):
+        self.latency = latency
+        self.failures = dict(failures or {})
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def text(self, query, max_results, timeout=None):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            failing = self.failures.get(query, 0)
+            if failing:
+                self.failures[query] = failing - 1
+        try:
+            time.sleep(self.latency)
+            if failing:
+                raise ConnectionError("backend indisponible")
+            return [{'title': f"Résultat {query}", 'href': f"https://factuel.afp.com/{i}", 'body': query}
+                    for i in range(max_results)]
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def make_queries(count):
+    return [SearchQuery(f"affirmation {i}", "factuel.afp.com", backend="fake") for i in range(count)]
+
+
+def test_queries_run_concurrently_within_backend_limit():
+    backend = SlowBackend(latency=0.05)
+    engine = SearchEngine(backends={'fake': backend}, concurrency={'fake': 8}, max_workers=16)
+    queries = make_queries(200)
+
+    start = time.perf_counter()
+    outcomes = engine.run(queries)
+    elapsed = time.perf_counter() - start
+
+    # 200 requêtes de 50 ms en série prendraient 10 s
+    assert elapsed < 200 * 0.05 / 4
+    assert backend.max_active == 8
+    assert all(len(outcome) == 3 for outcome in outcomes)
+    assert outcomes[7][0] == {'title': "Résultat affirmation 7", 'url': "https://factuel.afp.com/0",
+                              'snippet': "affirmation 7", 'source': "factuel.afp.com"}
+
+
+def test_transient_errors_are_retried():
+    backend = SlowBackend(latency=0.0, failures={'affirmation 1': 2})
+    engine = SearchEngine(backends={'fake': backend}, max_retries=2, backoff=0.01)
+
+    outcomes = engine.run(make_queries(3))
+
+    assert all(outcome for outcome in outcomes)
+    assert backend.calls == 5
+
+
+def test_failed_and_timed_out_queries_return_none():
+    backend = SlowBackend(latency=0.0, failures={'affirmation 0': 10})
+    engine = SearchEngine(backends={'fake': backend}, max_retries=1, backoff=0.01)
+
+    outcomes = engine.run(make_queries(2))
+
+    assert outcomes[0] is None and outcomes[1]
+    assert engine.failed_queries == 1
+
+    slow = SearchEngine(backends={'fake': SlowBackend(latency=1.0)}, timeout=0.2)
+    start = time.perf_counter()
+    assert slow.run(make_queries(1)) == [None]
+    assert time.perf_counter() - start < 0.8
+
+
+def test_budget_limits_network_calls():
+    backend = SlowBackend(latency=0.0)
+    engine = SearchEngine(backends={'fake': backend}, budget=5)
+
+    outcomes = engine.run(make_queries(8))
+
+    assert backend.calls == 5
+    assert sum(1 for outcome in outcomes if outcome is None) == 3
+
+    # Le budget vaut pour chaque exécution: un moteur réutilisé continue de chercher
+    outcomes = engine.run(make_queries(8))
+
+    assert backend.calls == 10
+    assert sum(1 for outcome in outcomes if outcome is None) == 3
+    assert engine.network_calls == 10
+
+
+@pytest.mark.parametrize("sites, kept", [
+    (("factuel.afp.com",), 3),
+    (("snopes.com",), 0),
+])
+def test_combined_site_query_attributes_results_to_their_site(sites, kept):
+    engine = SearchEngine(backends={'fake': SlowBackend(latency=0.0)})
+    query = SearchQuery("affirmation site:a OR site:b", "fact_checking", backend="fake", sites=sites)
+
+    outcome = engine.run([query])[0]
+
+    assert len(outcome) == kept
+    assert all(result['source'] == sites[0] for result in outcome)
@@ -0,0 +1,34 @@
+"""
+Tests de la transcription avec un modèle Whisper factice
+"""
+import wave
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.transcriber import SAMPLE_RATE, AudioTranscriber
+
+
+class FakeModel:
+    """Comme Whisper: le résultat ne contient pas la durée"""
+
+    def transcribe(self, audio, language, task):
+        return {'text': "Bonjour", 'segments': [{'id': 0, 'start': 0.0, 'end': 1.0, 'text': "Bonjour"}],
+                'language': language}
+
+
+def test_duration_comes_from_decoded_audio(tmp_path):
+    audio_path = tmp_path / "video.wav"
+    with wave.open(str(audio_path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(b'\x00\x00' * SAMPLE_RATE * 3)
+
+    transcriber = AudioTranscriber(use_cache=False)
+    transcriber._model = FakeModel()
+
+    transcription = transcriber.transcribe_video(audio_path)
+
+    assert transcription['duration'] == pytest.approx(3.0)